@@ -1,25 +1,44 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from typing import Dict, Any
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from typing import Dict, Any, Optional
+import asyncio
 import os
 import logging
-from pathlib import Path
+import uuid
 
-from backend.app.services.report_generator import ReportGenerator
-from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.bulk_reports import get_bulk_report_manager
+from backend.app.services.report_index import get_report_index
+from backend.app.services.report_pool import ReportQueueFull, get_report_pool
+from backend.app.services.result_store import get_result_store
+from backend.app.models.posture_result import BulkReportRequest, PostureAnalysisResult
 from backend.app.core.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-report_generator = ReportGenerator()
+report_pool = get_report_pool()
+report_index = get_report_index()
+result_store = get_result_store()
+bulk_reports = get_bulk_report_manager()
 
-@router.post("/generate")
-async def generate_report(analysis_result: PostureAnalysisResult) -> Dict[str, Any]:
-    """Generate a PDF report from analysis results"""
+async def _generate(analysis_result: PostureAnalysisResult, background_tasks: BackgroundTasks,
+                    stream: bool, persist: bool):
     try:
         logger.info("Generating PDF report")
-        report_data = await report_generator.generate_pdf_report(analysis_result)
+        
+        if stream:
+            # Rendered in memory and returned directly; saving is an opt-in background step
+            rendered = await report_pool.render_pdf(analysis_result)
+            headers = {"Content-Disposition": 'inline; filename="posture_report.pdf"'}
+            report_id = rendered.report_id
+            if persist and report_id is None:
+                report_id = str(uuid.uuid4())
+                background_tasks.add_task(report_pool.persist, rendered.content_key, rendered.pdf, report_id)
+            if report_id is not None:
+                headers["X-Report-Id"] = report_id
+            return Response(content=rendered.pdf, media_type="application/pdf", headers=headers)
+        
+        report_data = await report_pool.render(analysis_result)
         
         return {
             "success": True,
@@ -29,6 +48,8 @@ async def generate_report(analysis_result: PostureAnalysisResult) -> Dict[str, A
             "message": "Report generated successfully"
         }
         
+    except ReportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Error generating report: {str(e)}")
         raise HTTPException(
@@ -36,23 +57,102 @@ async def generate_report(analysis_result: PostureAnalysisResult) -> Dict[str, A
             detail=f"Failed to generate report: {str(e)}"
         )
 
+@router.post("/generate")
+async def generate_report(
+    analysis_result: PostureAnalysisResult,
+    background_tasks: BackgroundTasks,
+    stream: bool = Query(False, description="Return the PDF in the response body instead of a download link"),
+    persist: bool = Query(False, description="With stream=true, also save the report for later download")
+):
+    """Generate a PDF report from analysis results"""
+    return await _generate(analysis_result, background_tasks, stream, persist)
+
+@router.post("/bulk")
+async def create_bulk_report(request: BulkReportRequest) -> Dict[str, Any]:
+    """Render reports for many analyses in parallel; poll progress and download them as a zip"""
+    analyses = []
+    missing = []
+    for analysis_id in request.analysis_ids:
+        analysis_result = result_store.get(analysis_id)
+        if analysis_result is None:
+            missing.append(analysis_id)
+        else:
+            analyses.append(analysis_result)
+    
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Analysis not found or expired: {', '.join(missing)}"
+        )
+    
+    analyses.extend(request.analyses)
+    if not analyses:
+        raise HTTPException(status_code=400, detail="No analyses given")
+    if len(analyses) > settings.BULK_REPORT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many analyses ({len(analyses)}); the limit is {settings.BULK_REPORT_MAX_ITEMS}"
+        )
+    
+    names = [
+        f"{i:03d}_posture_report_{analysis_result.analysis_timestamp:%Y%m%d_%H%M%S}.pdf"
+        for i, analysis_result in enumerate(analyses, 1)
+    ]
+    job = bulk_reports.submit(list(zip(names, analyses)))
+    logger.info(f"Bulk report job {job.id} started with {job.total} analyses")
+    return job.status()
+
+@router.get("/bulk/{job_id}")
+async def get_bulk_report(job_id: str) -> Dict[str, Any]:
+    """Bulk report job progress"""
+    job = bulk_reports.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk report job not found")
+    return job.status()
+
+@router.get("/bulk/{job_id}/download")
+async def download_bulk_report(job_id: str):
+    """Stream the bulk report zip (reports still rendering are awaited in order)"""
+    job = bulk_reports.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk report job not found")
+    return StreamingResponse(
+        bulk_reports.stream_zip(job),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="posture_reports_{job_id}.zip"'}
+    )
+
+@router.post("/{analysis_id}")
+async def generate_report_for_analysis(
+    analysis_id: str,
+    background_tasks: BackgroundTasks,
+    stream: bool = Query(False, description="Return the PDF in the response body instead of a download link"),
+    persist: bool = Query(False, description="With stream=true, also save the report for later download")
+):
+    """Generate a PDF report for an analysis kept on the server (analysis_id from /api/analyze)"""
+    analysis_result = result_store.get(analysis_id)
+    if analysis_result is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Analysis not found or expired"
+        )
+    return await _generate(analysis_result, background_tasks, stream, persist)
+
 @router.get("/download/{report_id}")
 async def download_report(report_id: str):
     """Download a generated report by ID"""
     try:
-        # Find the report file
-        report_filename = f"posture_report_{report_id}.pdf"
-        report_path = Path(settings.REPORTS_DIR) / report_filename
+        report = await asyncio.to_thread(report_index.get, report_id)
         
-        if not report_path.exists():
+        if report is None:
             raise HTTPException(
                 status_code=404,
                 detail="Report not found"
             )
         
         return FileResponse(
-            path=str(report_path),
-            filename=report_filename,
+            path=report["path"],
+            filename=report["filename"],
             media_type="application/pdf"
         )
         
@@ -66,35 +166,40 @@ async def download_report(report_id: str):
         )
 
 @router.get("/list")
-async def list_reports() -> Dict[str, Any]:
-    """List all available reports"""
+async def list_reports(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of reports to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    since: Optional[float] = Query(None, description="Only reports created at or after this UNIX time"),
+    until: Optional[float] = Query(None, description="Only reports created before this UNIX time"),
+    analysis: Optional[str] = Query(None, description="Only reports rendered from this analysis content key")
+) -> Dict[str, Any]:
+    """List reports from the report index (newest first, cursor paginated)"""
     try:
-        reports_dir = Path(settings.REPORTS_DIR)
-        
-        if not reports_dir.exists():
-            return {"reports": []}
-        
-        reports = []
-        for report_file in reports_dir.glob("posture_report_*.pdf"):
-            report_id = report_file.stem.replace("posture_report_", "")
-            stat = report_file.stat()
-            
-            reports.append({
-                "id": report_id,
-                "filename": report_file.name,
-                "size": stat.st_size,
-                "created_at": stat.st_mtime,
-                "download_url": f"/api/reports/download/{report_id}"
-            })
+        (rows, next_cursor), total = await asyncio.gather(
+            asyncio.to_thread(report_index.list, limit, cursor, since, until, analysis),
+            asyncio.to_thread(report_index.count, since, until, analysis)
+        )
         
-        # Sort by creation time (newest first)
-        reports.sort(key=lambda x: x["created_at"], reverse=True)
+        reports = [
+            {
+                "id": row["id"],
+                "filename": row["filename"],
+                "size": row["size"],
+                "created_at": row["created_at"],
+                "analysis_key": row["content_key"],
+                "download_url": f"/api/reports/download/{row['id']}"
+            }
+            for row in rows
+        ]
         
         return {
             "reports": reports,
-            "total": len(reports)
+            "total": total,
+            "next_cursor": next_cursor
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing reports: {str(e)}")
         raise HTTPException(
@@ -106,16 +211,19 @@ async def list_reports() -> Dict[str, Any]:
 async def delete_report(report_id: str) -> Dict[str, Any]:
     """Delete a report by ID"""
     try:
-        report_filename = f"posture_report_{report_id}.pdf"
-        report_path = Path(settings.REPORTS_DIR) / report_filename
+        report = await asyncio.to_thread(report_index.get, report_id)
         
-        if not report_path.exists():
+        if report is None:
             raise HTTPException(
                 status_code=404,
                 detail="Report not found"
             )
         
-        os.remove(report_path)
+        try:
+            os.remove(report["path"])
+        except FileNotFoundError:
+            pass
+        await asyncio.to_thread(report_index.remove, report_id)
         
         return {
             "success": True,
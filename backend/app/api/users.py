@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+
+from backend.app.services.history_store import get_history_store
+from backend.app.services.trend_aggregator import get_trend_aggregator
+from backend.app.utils.metric_registry import METRIC_REGISTRY
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+history_store = get_history_store()
+trend_aggregator = get_trend_aggregator()
+
+def _parse_metrics(metrics: Optional[str]):
+    if metrics is None:
+        return None
+    names = [name.strip() for name in metrics.split(",") if name.strip()]
+    unknown = [name for name in names if name not in METRIC_REGISTRY.index]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return names
+
+@router.get("/{user_id}/history")
+async def get_user_history(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    since: Optional[float] = Query(None, description="Only analyses at or after this UNIX time"),
+    until: Optional[float] = Query(None, description="Only analyses before this UNIX time"),
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics for the trend series (default: all)")
+) -> Dict[str, Any]:
+    """Stored analyses of a user (newest first, cursor paginated) with trend series for the range"""
+    try:
+        names = _parse_metrics(metrics)
+        (records, next_cursor), total, series, last_analysis = await asyncio.gather(
+            asyncio.to_thread(history_store.list, user_id, limit, cursor, since, until),
+            asyncio.to_thread(history_store.count, user_id, since, until),
+            asyncio.to_thread(history_store.series, user_id, since, until, names),
+            asyncio.to_thread(history_store.last_analysis, user_id)
+        )
+
+        return {
+            "user_id": user_id,
+            "records": records,
+            "total": total,
+            "next_cursor": next_cursor,
+            "timestamps": series["timestamps"],
+            "trend_data": series["trend_data"],
+            "last_analysis": last_analysis.isoformat() if last_analysis else None
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reading history: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to read history: {str(e)}"
+        )
+
+@router.get("/{user_id}/trends")
+async def get_user_trends(user_id: str) -> Dict[str, Any]:
+    """Incrementally maintained trend summary per metric (no history scan)"""
+    try:
+        summary = await asyncio.to_thread(trend_aggregator.summary, user_id)
+    except Exception as e:
+        logger.error(f"Error reading trends: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to read trends: {str(e)}"
+        )
+
+    if not summary["count"]:
+        raise HTTPException(status_code=404, detail="No analyses recorded for this user")
+    return summary
+
+@router.delete("/{user_id}/history")
+async def delete_user_history(user_id: str) -> Dict[str, Any]:
+    """Delete all stored analyses and trend state of a user"""
+    deleted = await asyncio.to_thread(history_store.delete_user, user_id)
+    trend_aggregator.forget(user_id)
+    return {"success": True, "deleted": deleted}
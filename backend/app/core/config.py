@@ -27,8 +27,45 @@ class Settings(BaseModel):
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "bmp"]
     
     # Storage Settings (for production, use cloud storage)
-    UPLOAD_DIR: str = "uploads"
-    REPORTS_DIR: str = "reports"
+    # 保存先は同名の環境変数で上書きできる（レポート描画ワーカーなどの子プロセスにも引き継がれる）
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    REPORTS_DIR: str = os.getenv("REPORTS_DIR", "reports")
+    REPORT_INDEX_PATH: str = os.getenv("REPORT_INDEX_PATH", "reports/report_index.db")
+    LOGS_DIR: str = os.getenv("LOGS_DIR", "logs")
+    
+    # Static Asset / Compression Settings
+    STATIC_IMMUTABLE_PREFIXES: List[str] = ["assets/", "canvaskit/", "icons/"]
+    STATIC_MAX_AGE: int = 31536000  # 1 year
+    API_GZIP_MIN_SIZE: int = 1024  # bytes
+    
+    # Report Worker Settings
+    REPORT_WORKERS: int = 0  # 0 = CPU コア数
+    REPORT_MAX_CONCURRENCY: int = 0  # 0 = REPORT_WORKERS
+    REPORT_QUEUE_LIMIT: int = 32
+    REPORT_CACHE_SIZE: int = 256  # 内容ハッシュで再利用する描画済みレポート数
+    BULK_REPORT_MAX_ITEMS: int = 500
+    BULK_REPORT_MAX_JOBS: int = 32  # 保持する一括生成ジョブ数
+    REPORT_PRERENDER: bool = False  # 分析成功後に空きワーカーでレポートを事前描画
+    
+    # Analysis Result Store (report generation by analysis_id)
+    ANALYSIS_STORE_SIZE: int = 1000
+    ANALYSIS_STORE_TTL: int = 3600  # seconds
+    
+    # Storage Retention Settings (0 = 制限なし)
+    REPORT_RETENTION_DAYS: float = 30
+    REPORT_MAX_TOTAL_BYTES: int = 1024 * 1024 * 1024  # 1GB
+    REPORT_MAX_PER_ANALYSIS: int = 3
+    LOG_RETENTION_DAYS: float = 14
+    LOG_MAX_TOTAL_BYTES: int = 200 * 1024 * 1024  # 200MB
+    STORAGE_GC_INTERVAL: int = 3600  # seconds (0 = 無効)
+    
+    # Posture History Settings (ユーザーごとの分析履歴)
+    HISTORY_DB_PATH: str = os.getenv("HISTORY_DB_PATH", "data/posture_history.db")
+    HISTORY_POOL_SIZE: int = 4
+    TREND_RECENT_SIZE: int = 30      # メトリクスごとに保持する直近の値の数
+    TREND_EMA_ALPHA: float = 0.2
+    TREND_BASELINE_SIZE: int = 5     # 改善度の基準とする初回からの分析数
+    TREND_CACHE_SIZE: int = 1000     # メモリ上に保持するユーザー数
     
     # Analysis Settings
     AGE_GROUPS: dict = {
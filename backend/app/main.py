@@ -1,19 +1,26 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Request
+from fastapi import BackgroundTasks, FastAPI, File, UploadFile, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 import asyncio
 import time
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from backend.app.services.pose_analyzer import PoseAnalyzer
-from backend.app.services.report_generator import ReportGenerator
+from backend.app.services.analysis_graph import ANALYSIS_SECTIONS, RESULT_FIELDS, parse_fields, parse_include
+from backend.app.services.report_index import get_report_index
+from backend.app.services.report_pool import ReportQueueFull, get_report_pool
+from backend.app.services.report_prerender import get_report_prerenderer
+from backend.app.services.result_store import get_result_store
+from backend.app.services.storage_maintenance import get_storage_maintenance
+from backend.app.services.trend_aggregator import get_trend_aggregator
 from backend.app.models.posture_result import PostureAnalysisResult
 from backend.app.core.config import settings
-from backend.app.api import reports
+from backend.app.api import reports, users
 from backend.app.utils.logger import get_logger
 from backend.app.utils.performance_monitor import get_performance_monitor
+from backend.app.utils.static_assets import APICompressionMiddleware, HtmlPageCache, StaticAssetStore
+from backend.app.utils.result_serializer import LANDMARK_FORMATS, get_result_serializer, negotiate_media_type
 
 logger = get_logger("main_api")
 
@@ -23,6 +30,7 @@ app = FastAPI(
     version="1.0.0"
 )
 
+app.add_middleware(APICompressionMiddleware, minimum_size=settings.API_GZIP_MIN_SIZE)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -33,78 +41,60 @@ app.add_middleware(
 
 # Include routers
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(users.router, prefix="/api/users", tags=["users"])
 
 # Static files setup
 static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
+project_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# Flutter build outputs (precompressed at build time) and in-memory HTML pages
+static_assets = StaticAssetStore(
+    static_dir, settings.STATIC_IMMUTABLE_PREFIXES, settings.STATIC_MAX_AGE
+)
+html_pages = HtmlPageCache()
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve Flutter app or API info"""
-    index_path = os.path.join(static_dir, "index.html")
-    if os.path.exists(index_path):
-        with open(index_path, "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
-    else:
-        return {"message": "Posture Analysis API", "version": "1.0.0", "docs": "/docs", "frontend": "Flutter app loading..."}
-
-# Serve static files
-if os.path.exists(static_dir):
-    app.mount("/assets", StaticFiles(directory=os.path.join(static_dir, "assets")), name="assets")
-    app.mount("/icons", StaticFiles(directory=os.path.join(static_dir, "icons")), name="icons")
-    app.mount("/canvaskit", StaticFiles(directory=os.path.join(static_dir, "canvaskit")), name="canvaskit")
-    
-    @app.get("/flutter.js")
-    async def flutter_js():
-        return FileResponse(os.path.join(static_dir, "flutter.js"))
-    
-    @app.get("/flutter_bootstrap.js")
-    async def flutter_bootstrap_js():
-        return FileResponse(os.path.join(static_dir, "flutter_bootstrap.js"))
-    
-    @app.get("/flutter_service_worker.js")
-    async def flutter_service_worker_js():
-        return FileResponse(os.path.join(static_dir, "flutter_service_worker.js"))
-    
-    @app.get("/main.dart.js")
-    async def main_dart_js():
-        return FileResponse(os.path.join(static_dir, "main.dart.js"))
-    
-    @app.get("/manifest.json")
-    async def manifest_json():
-        return FileResponse(os.path.join(static_dir, "manifest.json"))
-    
-    @app.get("/favicon.png")
-    async def favicon():
-        file_path = os.path.join(static_dir, "favicon.png")
-        if os.path.exists(file_path):
-            return FileResponse(file_path)
-        else:
-            raise HTTPException(status_code=404)
-    
-    @app.get("/favicon.ico")
-    async def favicon_ico():
-        file_path = os.path.join(static_dir, "favicon.png")
-        if os.path.exists(file_path):
-            return FileResponse(file_path)
-        else:
-            raise HTTPException(status_code=404)
-    
-    
+    response = html_pages.response(request.headers, os.path.join(static_dir, "index.html"))
+    if response is not None:
+        return response
+    return {"message": "Posture Analysis API", "version": "1.0.0", "docs": "/docs", "frontend": "Flutter app loading..."}
+
+@app.get("/favicon.ico")
+async def favicon_ico(request: Request):
+    response = static_assets.response(request.headers, "favicon.png")
+    if response is None:
+        raise HTTPException(status_code=404)
+    return response
 
 pose_analyzer = PoseAnalyzer()
-report_generator = ReportGenerator()
+report_pool = get_report_pool()
+report_prerenderer = get_report_prerenderer()
+storage_maintenance = get_storage_maintenance()
+result_store = get_result_store()
+trend_aggregator = get_trend_aggregator()
 performance_monitor = get_performance_monitor()
+result_serializer = get_result_serializer()
 
 @app.on_event("startup")
 async def startup_event():
     """アプリケーション起動時の処理"""
     logger.info("🚀 姿勢分析APIサーバー起動中...")
     logger.log_system_info()
+    await asyncio.to_thread(get_report_index().reconcile, settings.REPORTS_DIR)
+    await report_pool.start()
+    storage_maintenance.start()
     logger.info("✅ 起動完了", 
                app_name="Posture Analysis API",
                version="1.0.0",
                allowed_origins=settings.ALLOWED_ORIGINS)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """アプリケーション終了時の処理"""
+    await storage_maintenance.stop()
+    report_pool.shutdown()
 
 @app.get("/health")
 async def health_check(request: Request):
@@ -125,7 +115,26 @@ async def api_health_check(request: Request):
     return response
 
 @app.post("/api/analyze")
-async def analyze_posture(request: Request, file: UploadFile = File(...)) -> Dict[str, Any]:
+async def analyze_posture(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    include: Optional[str] = Query(
+        None, description=f"Comma-separated optional sections to compute: {', '.join(ANALYSIS_SECTIONS)}"
+    ),
+    landmarks: str = Query(
+        "object", description=f"Landmark encoding: {', '.join(LANDMARK_FORMATS)}"
+    ),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated result fields to return: {', '.join(RESULT_FIELDS)}"
+    ),
+    exclude: Optional[str] = Query(
+        None, description="Comma-separated result fields to omit"
+    ),
+    user_id: Optional[str] = Query(
+        None, description="Record the result in this user's posture history"
+    )
+) -> Response:
     start_time = time.time()
     client_ip = request.client.host
     
@@ -137,6 +146,18 @@ async def analyze_posture(request: Request, file: UploadFile = File(...)) -> Dic
                       client_ip=client_ip)
         raise HTTPException(status_code=400, detail="File must be an image")
     
+    try:
+        sections = parse_include(include)
+        selected_fields = parse_fields(fields, exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if landmarks not in LANDMARK_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown landmark format '{landmarks}'. Valid formats: {', '.join(LANDMARK_FORMATS)}"
+        )
+    
     try:
         image_data = await file.read()
         file_size = len(image_data)
@@ -146,7 +167,8 @@ async def analyze_posture(request: Request, file: UploadFile = File(...)) -> Dic
         
         # 姿勢分析実行
         analysis_timer = logger.start_timer("api_analysis")
-        result = await pose_analyzer.analyze_image(image_data)
+        with report_prerenderer.analysis():
+            result = await pose_analyzer.analyze_image(image_data, include=sections, fields=selected_fields)
         analysis_duration = logger.end_timer(analysis_timer)
         
         if result is None:
@@ -166,7 +188,26 @@ async def analyze_posture(request: Request, file: UploadFile = File(...)) -> Dic
                    overall_score=result.overall_score,
                    client_ip=client_ip)
         
-        return result.dict()
+        # レポートを analysis_id で要求できるよう結果をサーバ側に保持
+        # include / fields 指定時の結果は一部のセクションしか評価していないため保持しない
+        analysis_id = None
+        headers = {"Vary": "Accept"}
+        if sections is None and selected_fields is None:
+            analysis_id = result_store.put(result)
+            headers["X-Analysis-Id"] = analysis_id
+            if report_prerenderer.enabled:
+                # 応答送信後、空きワーカーがあればレポートを事前描画
+                background_tasks.add_task(report_prerenderer.schedule, result)
+        if user_id:
+            # 履歴への記録とトレンド集計の更新は応答送信後に行う（スコアとメトリクスは常に評価される）
+            background_tasks.add_task(trend_aggregator.record, user_id, result, analysis_id)
+        
+        media_type = negotiate_media_type(request.headers.get("accept"))
+        return Response(
+            content=result_serializer.serialize(result, landmarks, media_type, selected_fields, analysis_id),
+            media_type=media_type,
+            headers=headers
+        )
         
     except HTTPException:
         raise  # Re-raise HTTPExceptions as-is
@@ -181,8 +222,10 @@ async def analyze_posture(request: Request, file: UploadFile = File(...)) -> Dic
 @app.post("/generate-report")
 async def generate_report(analysis_result: PostureAnalysisResult):
     try:
-        report_data = await report_generator.generate_pdf_report(analysis_result)
+        report_data = await report_pool.render(analysis_result)
         return {"report_url": report_data["url"], "report_id": report_data["id"]}
+    except ReportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Error generating report: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
@@ -215,27 +258,21 @@ async def get_reference_values():
     }
 
 @app.get("/demo", response_class=HTMLResponse)
-async def demo_page():
+async def demo_page(request: Request):
     """HTML demo page for posture analysis"""
-    import os
     # プロジェクトルートのdemo.htmlを参照
-    demo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "demo.html")
-    try:
-        with open(demo_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
+    response = html_pages.response(request.headers, os.path.join(project_dir, "demo.html"))
+    if response is None:
         return "<h1>Demo page not found</h1><p>Please run: python3 create_demo_page.py</p>"
+    return response
 
 @app.get("/debug", response_class=HTMLResponse)
-async def debug_page():
+async def debug_page(request: Request):
     """Debug page for troubleshooting"""
-    import os
-    debug_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "debug_demo.html")
-    try:
-        with open(debug_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
+    response = html_pages.response(request.headers, os.path.join(project_dir, "debug_demo.html"))
+    if response is None:
         return "<h1>Debug page not found</h1><p>File: debug_demo.html not found</p>"
+    return response
 
 @app.get("/debug/static")
 async def debug_static():
@@ -263,44 +300,31 @@ async def debug_static():
     return info
 
 @app.get("/fixed", response_class=HTMLResponse)
-async def fixed_demo_page():
+async def fixed_demo_page(request: Request):
     """Fixed demo page with improved progress tracking and error handling"""
-    import os
-    fixed_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "fixed_demo.html")
-    try:
-        with open(fixed_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
+    response = html_pages.response(request.headers, os.path.join(project_dir, "fixed_demo.html"))
+    if response is None:
         return "<h1>Fixed demo page not found</h1><p>File: fixed_demo.html not found</p>"
+    return response
 
 @app.get("/test", response_class=HTMLResponse)
-async def user_test_page():
+async def user_test_page(request: Request):
     """User acceptance testing page"""
-    import os
-    test_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "test-demo.html")
-    try:
-        with open(test_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
+    response = html_pages.response(request.headers, os.path.join(project_dir, "test-demo.html"))
+    if response is None:
         return "<h1>Test page not found</h1><p>File: test-demo.html not found</p>"
+    return response
 
 @app.get("/enhanced", response_class=HTMLResponse)
-async def enhanced_demo_page():
+async def enhanced_demo_page(request: Request):
     """Enhanced demo page with performance monitoring and improved UX"""
-    import os
-    # コンテナ内のパスを直接指定
-    enhanced_path = "/app/enhanced_demo_v2.html"
-    try:
-        with open(enhanced_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
-        # フォールバック: 元のファイルを試行
-        fallback_path = "/app/enhanced_demo.html"
-        try:
-            with open(fallback_path, "r", encoding="utf-8") as f:
-                return f.read()
-        except FileNotFoundError:
-            return "<h1>Enhanced demo page not found</h1><p>File: enhanced_demo_v2.html not found</p>"
+    # コンテナ内のパスを直接指定（フォールバック: 元のファイル）
+    response = html_pages.response(
+        request.headers, "/app/enhanced_demo_v2.html", "/app/enhanced_demo.html"
+    )
+    if response is None:
+        return "<h1>Enhanced demo page not found</h1><p>File: enhanced_demo_v2.html not found</p>"
+    return response
 
 @app.get("/api/performance/summary")
 async def get_performance_summary():
@@ -322,6 +346,21 @@ async def get_performance_recommendations():
         logger.error("パフォーマンス推奨事項取得エラー", error=e)
         raise HTTPException(status_code=500, detail=f"Performance recommendations failed: {str(e)}")
 
+@app.get("/api/performance/serialization")
+async def get_serialization_stats():
+    """分析結果シリアライズ統計取得（p50/p95 の時間とペイロードサイズ）"""
+    return result_serializer.summary()
+
+@app.get("/api/performance/reports")
+async def get_report_pool_stats():
+    """レポートワーカープール統計取得（待ち行列・p50/p95 の待ち時間と描画時間）"""
+    return report_pool.summary()
+
+@app.get("/api/performance/storage")
+async def get_storage_stats():
+    """ストレージ保守統計取得（保持ポリシーと回収容量）"""
+    return storage_maintenance.summary()
+
 @app.post("/api/performance/export")
 async def export_performance_data():
     """パフォーマンスデータエクスポート"""
@@ -349,37 +388,20 @@ async def clear_performance_history():
         logger.error("パフォーマンス履歴クリアエラー", error=e)
         raise HTTPException(status_code=500, detail=f"Performance clear failed: {str(e)}")
 
-# Mount specific icon routes before static files
-@app.get("/icons/Icon-192.png")
-async def icon_192():
-    icon_path = os.path.join(static_dir, "icons", "Icon-192.png")
-    if os.path.exists(icon_path):
-        return FileResponse(icon_path, media_type="image/png")
-    raise HTTPException(status_code=404)
-
-@app.get("/icons/Icon-512.png")
-async def icon_512():
-    icon_path = os.path.join(static_dir, "icons", "Icon-512.png")
-    if os.path.exists(icon_path):
-        return FileResponse(icon_path, media_type="image/png")
-    raise HTTPException(status_code=404)
-
-@app.get("/icons/Icon-maskable-192.png")
-async def icon_maskable_192():
-    icon_path = os.path.join(static_dir, "icons", "Icon-maskable-192.png")
-    if os.path.exists(icon_path):
-        return FileResponse(icon_path, media_type="image/png")
-    raise HTTPException(status_code=404)
-
-@app.get("/icons/Icon-maskable-512.png")
-async def icon_maskable_512():
-    icon_path = os.path.join(static_dir, "icons", "Icon-maskable-512.png")
-    if os.path.exists(icon_path):
-        return FileResponse(icon_path, media_type="image/png")
-    raise HTTPException(status_code=404)
-
-# Mount static files after all routes are defined
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+# Static assets: /static/* and the Flutter build served from the root (registered last)
+@app.get("/static/{asset_path:path}")
+async def static_asset(asset_path: str, request: Request):
+    response = static_assets.response(request.headers, asset_path)
+    if response is None:
+        raise HTTPException(status_code=404)
+    return response
+
+@app.get("/{asset_path:path}")
+async def flutter_asset(asset_path: str, request: Request):
+    response = static_assets.response(request.headers, asset_path)
+    if response is None:
+        raise HTTPException(status_code=404)
+    return response
 
 if __name__ == "__main__":
     import uvicorn
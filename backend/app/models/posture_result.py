@@ -14,9 +14,10 @@ class PostureMetrics(BaseModel):
     trunk_lateral_deviation: float = Field(..., description="Trunk lateral deviation in cm")
     
     # 新規追加メトリクス
-    knee_valgus_varus: Optional[Dict[str, float]] = Field(None, description="Knee valgus/varus measurements")
+    knee_valgus_varus: Optional[Dict[str, Any]] = Field(None, description="Knee valgus/varus measurements")
     heel_inclination: Optional[Dict[str, float]] = Field(None, description="Heel inclination measurements")
     seated_metrics: Optional[Dict[str, float]] = Field(None, description="Seated posture specific metrics")
+    registry_metrics: Optional[Dict[str, float]] = Field(None, description="Registry-defined metrics beyond the base fields")
 
 class PostureAnalysisResult(BaseModel):
     """Complete posture analysis result"""
@@ -32,7 +33,7 @@ class PostureAnalysisResult(BaseModel):
     analysis_timestamp: datetime = Field(default_factory=datetime.now)
     
     # 新規追加フィールド
-    posture_type: Optional[Dict[str, str]] = Field(None, description="Posture type classification")
+    posture_type: Optional[Dict[str, Any]] = Field(None, description="Posture type classification")
     color_judgments: Optional[Dict[str, Dict]] = Field(None, description="Color-coded metric judgments")
     overall_color_judgment: Optional[Dict[str, str]] = Field(None, description="Overall color judgment")
     improvement_suggestions: Optional[List[Dict]] = Field(None, description="Posture improvement suggestions")
@@ -72,6 +73,11 @@ class PostureReport(BaseModel):
             datetime: lambda v: v.isoformat()
         }
 
+class BulkReportRequest(BaseModel):
+    """Bulk report generation request (stored analysis IDs and/or full analysis results)"""
+    analysis_ids: List[str] = Field(default_factory=list, description="IDs returned by /api/analyze")
+    analyses: List[PostureAnalysisResult] = Field(default_factory=list, description="Full analysis results")
+
 class UserProfile(BaseModel):
     """User profile for personalized analysis"""
     user_id: str
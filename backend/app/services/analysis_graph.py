@@ -0,0 +1,207 @@
+"""
+遅延評価の分析グラフ
+1枚の画像に対する派生値（方向・検証・メトリクス・分類・判定・改善提案など）を
+初回アクセス時に一度だけ計算する。呼び出し側が要求しない分岐は実行されない。
+"""
+
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.utils.landmark_array import LandmarkArray
+from backend.app.utils.metric_kernel import KernelResult
+
+# include= で選択できる結果セクション（必須項目は常に含まれる）
+ANALYSIS_SECTIONS: Tuple[str, ...] = (
+    'symmetry',
+    'validation',
+    'additional_metrics',
+    'classification',
+    'color_judgments',
+    'suggestions',
+)
+
+
+def parse_include(include: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    カンマ区切りの include 指定を解析
+    未指定（None・空文字）の場合は全セクションを意味する None を返す
+    """
+    if include is None or not include.strip():
+        return None
+
+    sections = frozenset(part.strip() for part in include.split(',') if part.strip())
+    unknown = sections.difference(ANALYSIS_SECTIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown include section(s): {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(ANALYSIS_SECTIONS)}"
+        )
+    return sections
+
+
+# fields= / exclude= で選択できる結果フィールド
+RESULT_FIELDS: Tuple[str, ...] = tuple(PostureAnalysisResult.model_fields)
+
+# 結果フィールド → 評価に必要なセクション
+FIELD_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    'metrics': ('additional_metrics',),
+    'symmetry_scores': ('symmetry',),
+    'validation_results': ('validation',),
+    'posture_type': ('classification',),
+    'color_judgments': ('color_judgments',),
+    'overall_color_judgment': ('color_judgments',),
+    'improvement_suggestions': ('suggestions',),
+}
+
+
+def _split_fields(value: Optional[str], parameter: str) -> FrozenSet[str]:
+    names = frozenset(part.strip() for part in (value or '').split(',') if part.strip())
+    unknown = names.difference(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown {parameter} field(s): {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(RESULT_FIELDS)}"
+        )
+    return names
+
+
+def parse_fields(fields: Optional[str], exclude: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """
+    カンマ区切りの fields / exclude 指定から返却する結果フィールドを決定
+    どちらも未指定の場合は全フィールドを意味する None を返す
+    """
+    selected = _split_fields(fields, 'fields')
+    excluded = _split_fields(exclude, 'exclude')
+    if not selected and not excluded:
+        return None
+    return (selected or frozenset(RESULT_FIELDS)) - excluded
+
+
+def sections_for_fields(fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """結果フィールドの評価に必要なセクション（None は全セクション）"""
+    if fields is None:
+        return frozenset(ANALYSIS_SECTIONS)
+    return frozenset(section for name in fields for section in FIELD_SECTIONS.get(name, ()))
+
+
+class AnalysisGraph:
+    """
+    1姿勢分の分析グラフ
+    各ノードは cached_property で、依存するノードのみを辿って評価される
+    """
+
+    def __init__(self, analyzer, landmarks: LandmarkArray, image_size: Tuple[int, int]):
+        self.analyzer = analyzer
+        self.landmarks = landmarks
+        self.image_size = image_size
+
+    # === 検出系 ===
+
+    @cached_property
+    def orientation(self) -> str:
+        return self.analyzer.pose_detector.detect_pose_orientation(self.landmarks)
+
+    @cached_property
+    def validation_results(self) -> Dict[str, bool]:
+        return self.analyzer.pose_detector.validate_landmark_consistency(self.landmarks)
+
+    @cached_property
+    def pose_quality(self) -> float:
+        return self.analyzer.pose_detector.calculate_pose_quality_score(self.landmarks)
+
+    @cached_property
+    def symmetry_scores(self) -> Dict[str, float]:
+        return self.analyzer.pose_detector.calculate_bilateral_symmetry(self.landmarks)
+
+    # === メトリクス ===
+
+    @cached_property
+    def kernel_result(self) -> KernelResult:
+        return self.analyzer.metric_kernel.evaluate(self.landmarks, self.image_size)
+
+    @cached_property
+    def metrics(self) -> PostureMetrics:
+        return self.kernel_result.posture_metrics(self.orientation)
+
+    @cached_property
+    def is_seated(self) -> bool:
+        return self.analyzer._detect_seated_posture(self.landmarks)
+
+    @cached_property
+    def additional_metrics(self) -> Dict:
+        # 座位メトリクスは座位と判定された場合のみ計算
+        return self.kernel_result.additional_metrics(seated=self.is_seated)
+
+    # === 分類・判定 ===
+
+    @cached_property
+    def posture_type(self) -> Dict[str, str]:
+        return self.analyzer.posture_classifier.classify_posture_type(
+            self.metrics, self.orientation, self.additional_metrics if self.is_seated else None
+        )
+
+    @cached_property
+    def color_judgments(self) -> Dict[str, Mapping[str, str]]:
+        return self.analyzer.posture_classifier.calculate_color_judgment(
+            self.metrics, self.additional_metrics
+        )
+
+    @cached_property
+    def overall_color_judgment(self) -> Mapping[str, str]:
+        return self.analyzer.posture_classifier.get_overall_color_judgment(self.color_judgments)
+
+    @cached_property
+    def improvement_suggestions(self) -> List[Dict]:
+        return self.analyzer.posture_classifier.generate_improvement_suggestions(
+            self.posture_type['primary_type'], self.color_judgments
+        )
+
+    @cached_property
+    def overall_score(self) -> float:
+        return self.analyzer._calculate_enhanced_overall_score(
+            self.metrics, self.pose_quality, self.symmetry_scores
+        )
+
+    # === 結果作成 ===
+
+    def to_result(self, include: Optional[Iterable[str]] = None,
+                  fields: Optional[Iterable[str]] = None) -> PostureAnalysisResult:
+        """
+        要求されたセクションのみを評価して PostureAnalysisResult を作成
+        include=None の場合は従来どおり全セクションを含める。fields 指定時は
+        そのフィールドに必要なセクションだけを評価し、選択されなかったランドマークは変換しない
+        （返却する結果は fields を指定したシリアライズ専用）。
+        各ノードは内部で構築済みのため、モデルの再検証は行わない
+        （値は pickle / model_dump 可能な通常の dict・list のみで構成する）
+        """
+        sections = frozenset(ANALYSIS_SECTIONS if include is None else include) & sections_for_fields(fields)
+        metrics = self.metrics
+
+        if 'additional_metrics' in sections:
+            additional_metrics = self.additional_metrics
+            metrics.knee_valgus_varus = additional_metrics.get('knee_valgus_varus')
+            metrics.heel_inclination = additional_metrics.get('heel_inclination')
+            metrics.seated_metrics = additional_metrics.get('seated_metrics')
+
+        # 判定は共有の読み取り専用マッピングのため、結果には dict に変換して格納する
+        color_judgments = 'color_judgments' in sections
+
+        return PostureAnalysisResult.model_construct(
+            landmarks=self.landmarks.to_dict() if fields is None or 'landmarks' in fields else None,
+            metrics=metrics,
+            overall_score=self.overall_score,
+            image_width=self.image_size[0],
+            image_height=self.image_size[1],
+            confidence=self.pose_quality,
+            pose_orientation=self.orientation,
+            symmetry_scores=self.symmetry_scores if 'symmetry' in sections else None,
+            validation_results=self.validation_results if 'validation' in sections else None,
+            posture_type=self.posture_type if 'classification' in sections else None,
+            color_judgments={
+                name: dict(judgment) for name, judgment in self.color_judgments.items()
+            } if color_judgments else None,
+            overall_color_judgment=dict(self.overall_color_judgment) if color_judgments else None,
+            improvement_suggestions=self.improvement_suggestions if 'suggestions' in sections else None,
+            is_seated_posture=self.is_seated
+        )
@@ -0,0 +1,153 @@
+"""
+一括レポート生成
+複数の分析結果のレポートをレポートワーカープールで並行に描画し、zip として返す。
+ジョブの進捗は描画が完了するごとに更新され、ダウンロードは完了した順ではなく
+要求順に、各レポートの描画完了を待ちながら zip をストリーミングする
+"""
+
+import asyncio
+import io
+import json
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.report_pool import ReportPool, get_report_pool
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("bulk_reports")
+
+
+class BulkReportJob:
+    """一括レポート生成ジョブ"""
+
+    def __init__(self, names: List[str]):
+        self.id = uuid.uuid4().hex
+        self.names = names
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.completed = 0
+        self.failed = 0
+        self.errors: Dict[str, str] = {}
+        loop = asyncio.get_running_loop()
+        self.results: List[asyncio.Future] = [loop.create_future() for _ in names]
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.names)
+
+    @property
+    def done(self) -> bool:
+        return self.completed + self.failed == self.total
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': 'done' if self.done else 'running',
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'progress': round((self.completed + self.failed) / self.total, 3) if self.total else 1.0,
+            'errors': self.errors,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'download_url': f"/api/reports/bulk/{self.id}/download",
+        }
+
+
+class _ZipStream(io.RawIOBase):
+    """zipfile の書き込み先（書き込まれたバイト列を取り出して送信する）"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer.extend(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return chunk
+
+
+class BulkReportManager:
+    """一括レポート生成ジョブの管理"""
+
+    def __init__(self, pool: ReportPool, max_jobs: int = 32):
+        self.pool = pool
+        self.max_jobs = max_jobs
+        self.jobs: 'OrderedDict[str, BulkReportJob]' = OrderedDict()
+
+    def submit(self, analyses: List[Tuple[str, PostureAnalysisResult]]) -> BulkReportJob:
+        """(ファイル名, 分析結果) の一覧からジョブを作成して描画を開始"""
+        job = BulkReportJob([name for name, _ in analyses])
+        job.task = asyncio.create_task(self._run(job, [result for _, result in analyses]))
+        self.jobs[job.id] = job
+        # 古い完了済みジョブから破棄
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].done:
+                del self.jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkReportJob]:
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: BulkReportJob, analyses: List[PostureAnalysisResult]):
+        # ジョブ内の同時描画数をプールの同時実行数までに抑え、待ち行列を溢れさせない
+        semaphore = asyncio.Semaphore(self.pool.max_concurrency)
+        start = time.perf_counter()
+
+        async def render(i: int, analysis_result: PostureAnalysisResult):
+            async with semaphore:
+                try:
+                    rendered = await self.pool.render_pdf(analysis_result)
+                except Exception as e:
+                    job.failed += 1
+                    job.errors[job.names[i]] = str(e)
+                    job.results[i].set_result(None)
+                else:
+                    job.completed += 1
+                    job.results[i].set_result(rendered.pdf)
+
+        await asyncio.gather(*(render(i, analysis_result) for i, analysis_result in enumerate(analyses)))
+        job.finished_at = time.time()
+        logger.info("一括レポート生成完了", job_id=job.id, total=job.total, failed=job.failed,
+                    duration=round(time.perf_counter() - start, 3))
+
+    async def stream_zip(self, job: BulkReportJob) -> AsyncIterator[bytes]:
+        """
+        要求順にレポートを zip に追加しながら送信
+        描画に失敗したレポートは errors.json に記録する
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, result in zip(job.names, job.results):
+                pdf = await result
+                if pdf is not None:
+                    archive.writestr(name, pdf)
+                    yield stream.take()
+            if job.errors:
+                archive.writestr('errors.json', json.dumps(job.errors, ensure_ascii=False, indent=2))
+        yield stream.take()
+
+
+_bulk_report_manager: Optional[BulkReportManager] = None
+
+
+def get_bulk_report_manager() -> BulkReportManager:
+    """一括レポート生成管理のシングルトン取得"""
+    global _bulk_report_manager
+    if _bulk_report_manager is None:
+        _bulk_report_manager = BulkReportManager(get_report_pool(), settings.BULK_REPORT_MAX_JOBS)
+    return _bulk_report_manager
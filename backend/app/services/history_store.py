@@ -0,0 +1,230 @@
+"""
+姿勢分析履歴ストア
+ユーザーごとの分析結果（スコア・メトリクス値のみ、画像やランドマークは保持しない）を
+SQLite（WAL）に記録し、(user_id, timestamp) の索引で期間指定・ページングの取得と
+トレンド系列の作成を行う。接続はプールから貸し出し、読み取りを並行に処理する。
+トレンド集計の状態もユーザーごとに保存する
+"""
+
+import json
+import math
+import os
+import queue
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.report_index import decode_cursor, encode_cursor
+from backend.app.utils.logger import get_logger
+from backend.app.utils.metric_registry import METRIC_REGISTRY, metric_value
+
+logger = get_logger("history_store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    overall_score REAL NOT NULL,
+    confidence REAL NOT NULL,
+    pose_orientation TEXT,
+    metrics TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_user_time ON analyses (user_id, timestamp DESC, id DESC);
+CREATE TABLE IF NOT EXISTS trends (
+    user_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+
+def analysis_metrics(result: PostureAnalysisResult) -> Dict[str, float]:
+    """分析結果から有限値のメトリクスを名前 → 値で取り出す"""
+    values = {}
+    for name in METRIC_REGISTRY.names:
+        value = metric_value(result.metrics, name)
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            values[name] = float(value)
+    return values
+
+
+class HistoryStore:
+    """ユーザーごとの姿勢分析履歴"""
+
+    def __init__(self, db_path: str, pool_size: int = 4):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._pool: 'queue.Queue[sqlite3.Connection]' = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+        with self._connection() as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """プールから接続を借りる（空きがなければ返却を待つ）"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'timestamp': row['timestamp'],
+            'overall_score': row['overall_score'],
+            'confidence': row['confidence'],
+            'pose_orientation': row['pose_orientation'],
+            'metrics': json.loads(row['metrics']),
+        }
+
+    # === 更新 ===
+
+    def add(self, user_id: str, result: PostureAnalysisResult, analysis_id: Optional[str] = None,
+            trend_state: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        分析結果を履歴に記録して ID を返す（同じ ID が記録済みの場合は何もせず None）
+        trend_state を渡すと同じトランザクションで集計状態も保存する
+        """
+        analysis_id = analysis_id or uuid.uuid4().hex
+        with self._connection() as conn, conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO analyses "
+                "(id, user_id, timestamp, overall_score, confidence, pose_orientation, metrics) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (analysis_id, user_id, result.analysis_timestamp.timestamp(), result.overall_score,
+                 result.confidence, result.pose_orientation,
+                 json.dumps(analysis_metrics(result), separators=(',', ':')))
+            ).rowcount
+            if not inserted:
+                return None
+            if trend_state is not None:
+                self._save_trend_state(conn, user_id, trend_state)
+        return analysis_id
+
+    def delete_user(self, user_id: str) -> int:
+        """ユーザーの履歴と集計状態をすべて削除し、削除件数を返す"""
+        with self._connection() as conn, conn:
+            conn.execute("DELETE FROM trends WHERE user_id = ?", (user_id,))
+            return conn.execute("DELETE FROM analyses WHERE user_id = ?", (user_id,)).rowcount
+
+    @staticmethod
+    def _save_trend_state(conn: sqlite3.Connection, user_id: str, state: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO trends (user_id, state) VALUES (?, ?)",
+            (user_id, json.dumps(state, separators=(',', ':')))
+        )
+
+    def save_trend_state(self, user_id: str, state: Dict[str, Any]):
+        with self._connection() as conn, conn:
+            self._save_trend_state(conn, user_id, state)
+
+    # === 参照 ===
+
+    @staticmethod
+    def _filters(user_id: str, since: Optional[float], until: Optional[float]) -> Tuple[List[str], List[Any]]:
+        clauses, params = ["user_id = ?"], [user_id]
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return clauses, params
+
+    def list(self, user_id: str, limit: int = 50, cursor: Optional[str] = None,
+             since: Optional[float] = None, until: Optional[float] = None
+             ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        新しい順に履歴を取得
+        次のページがある場合はそのカーソルを合わせて返す
+        """
+        clauses, params = self._filters(user_id, since, until)
+        if cursor is not None:
+            timestamp, analysis_id = decode_cursor(cursor)
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([timestamp, timestamp, analysis_id])
+
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM analyses WHERE {' AND '.join(clauses)} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit + 1)
+            ).fetchall()
+
+        records = [self._row(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = encode_cursor(last['timestamp'], last['id'])
+        return records, next_cursor
+
+    def count(self, user_id: str, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        clauses, params = self._filters(user_id, since, until)
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM analyses WHERE {' AND '.join(clauses)}", params).fetchone()[0]
+
+    def trend_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """保存済みのトレンド集計状態（未保存なら None）"""
+        with self._connection() as conn:
+            row = conn.execute("SELECT state FROM trends WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def last_analysis(self, user_id: str) -> Optional[datetime]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT MAX(timestamp) FROM analyses WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return datetime.fromtimestamp(row[0]) if row[0] is not None else None
+
+    def series(self, user_id: str, since: Optional[float] = None, until: Optional[float] = None,
+               metrics: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        期間内の履歴を古い順の系列に変換（PostureHistory.trend_data 形式）
+        値がない回は None
+        """
+        names = list(metrics) if metrics is not None else list(METRIC_REGISTRY.names)
+        clauses, params = self._filters(user_id, since, until)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT timestamp, overall_score, metrics FROM analyses WHERE {' AND '.join(clauses)} "
+                "ORDER BY timestamp, id", params
+            ).fetchall()
+
+        trend_data: Dict[str, List[Optional[float]]] = {
+            'overall_score': [row['overall_score'] for row in rows]
+        }
+        values = [json.loads(row['metrics']) for row in rows]
+        for name in names:
+            trend_data[name] = [value.get(name) for value in values]
+        return {'timestamps': [row['timestamp'] for row in rows], 'trend_data': trend_data}
+
+
+_history_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """姿勢分析履歴ストアのシングルトン取得"""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(settings.HISTORY_DB_PATH, settings.HISTORY_POOL_SIZE)
+    return _history_store
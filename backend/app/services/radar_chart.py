@@ -0,0 +1,88 @@
+"""
+レーダーチャート（ReportLab ベクター描画）
+目盛り円・軸・ラベルからなる背景を項目ごとに一度だけ作成してキャッシュし、
+レポートごとにはデータ多角形のみを重ねて描画する
+"""
+
+import math
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, Polygon, String
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+# 日本語ラベル用の CID フォント（PDF ビューア内蔵フォントのため埋め込み不要）
+CHART_FONT = 'HeiseiKakuGo-W5'
+pdfmetrics.registerFont(UnicodeCIDFont(CHART_FONT))
+
+RING_LEVELS = (20, 40, 60, 80, 100)
+MAX_VALUE = 100
+
+GRID_COLOR = colors.HexColor('#BDBDBD')
+LABEL_COLOR = colors.HexColor('#424242')
+LINE_COLOR = colors.HexColor('#2E7D32')
+FILL_COLOR = colors.HexColor('#4CAF50')
+
+
+class RadarChartTemplate:
+    """
+    項目の並びごとのレーダーチャート背景
+    角度は従来の極座標チャートと同じく右（0°）から反時計回り
+    """
+
+    def __init__(self, categories: Sequence[str], size: float = 4 * inch,
+                 label_size: float = 9, label_margin: float = 30):
+        self.categories = tuple(categories)
+        self.size = size
+        self.label_size = label_size
+        self.center = size / 2
+        self.radius = size / 2 - label_margin
+        self.angles = [2 * math.pi * i / len(self.categories) for i in range(len(self.categories))]
+        self.background = self._build_background()
+
+    def point(self, angle: float, value: float) -> Tuple[float, float]:
+        """0-100 の値を角度方向の座標に変換"""
+        r = self.radius * max(0.0, min(value, MAX_VALUE)) / MAX_VALUE
+        return self.center + r * math.cos(angle), self.center + r * math.sin(angle)
+
+    def _build_background(self) -> Group:
+        group = Group()
+        for level in RING_LEVELS:
+            group.add(Circle(self.center, self.center, self.radius * level / MAX_VALUE,
+                             strokeColor=GRID_COLOR, strokeWidth=0.5, fillColor=None))
+            group.add(String(self.center + 2, self.center + self.radius * level / MAX_VALUE + 1, str(level),
+                             fontName='Helvetica', fontSize=self.label_size - 2, fillColor=GRID_COLOR))
+
+        for angle, category in zip(self.angles, self.categories):
+            x, y = self.point(angle, MAX_VALUE)
+            group.add(Line(self.center, self.center, x, y, strokeColor=GRID_COLOR, strokeWidth=0.5))
+
+            # ラベルは軸の外側に、左右の位置に応じて寄せる
+            cos = math.cos(angle)
+            anchor = 'middle' if abs(cos) < 0.3 else ('start' if cos > 0 else 'end')
+            group.add(String(x + 6 * cos, y + 6 * math.sin(angle) - self.label_size / 3, category,
+                             fontName=CHART_FONT, fontSize=self.label_size,
+                             fillColor=LABEL_COLOR, textAnchor=anchor))
+        return group
+
+    def draw(self, values: Sequence[float]) -> Drawing:
+        """背景にデータ多角形を重ねたチャートを作成"""
+        drawing = Drawing(self.size, self.size)
+        drawing.add(self.background)
+
+        points = [self.point(angle, value) for angle, value in zip(self.angles, values)]
+        drawing.add(Polygon([coord for point in points for coord in point],
+                            strokeColor=LINE_COLOR, strokeWidth=2,
+                            fillColor=FILL_COLOR, fillOpacity=0.25))
+        for x, y in points:
+            drawing.add(Circle(x, y, 2.5, strokeColor=LINE_COLOR, fillColor=LINE_COLOR))
+        return drawing
+
+
+@lru_cache(maxsize=8)
+def get_radar_template(categories: Tuple[str, ...]) -> RadarChartTemplate:
+    """項目の並びごとのチャート背景を取得（プロセス内でキャッシュ）"""
+    return RadarChartTemplate(categories)
@@ -1,65 +1,143 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.graphics.shapes import Drawing
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+import asyncio
+import functools
+import hashlib
 import io
+import json
 import base64
 import uuid
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Any
-import numpy as np
+from typing import Dict, List, Any, Optional
 
-from backend.app.models.posture_result import PostureAnalysisResult, PostureReport, PostureRecommendation
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics, PostureReport, PostureRecommendation
 from backend.app.core.config import settings
+from backend.app.services.radar_chart import CHART_FONT, get_radar_template
+from backend.app.utils.metric_registry import METRIC_REGISTRY, metric_value
+from backend.app.utils.suggestion_catalog import get_suggestion_catalog
+
+# The CJK font registered for the radar chart also covers the Japanese report text
+REPORT_FONT = CHART_FONT
+
+METRICS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E3F2FD')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), REPORT_FONT),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDBDBD'))
+])
+
+@functools.lru_cache(maxsize=1)
+def get_report_styles():
+    """Paragraph styles for the report, built once per process"""
+    styles = getSampleStyleSheet()
+    for name in styles.byName:
+        styles[name].fontName = REPORT_FONT
+    
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#2E7D32')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor=colors.HexColor('#1976D2')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='MetricLabel',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#424242')
+    ))
+    return styles
+
+def _warm_up_result() -> PostureAnalysisResult:
+    """Throwaway analysis used to exercise every report section once"""
+    return PostureAnalysisResult(
+        landmarks={},
+        metrics=PostureMetrics(
+            pelvic_tilt=20.0, thoracic_kyphosis=45.0, cervical_lordosis=20.0,
+            shoulder_height_difference=2.0, head_forward_posture=5.0, lumbar_lordosis=30.0,
+            scapular_protraction=3.0, trunk_lateral_deviation=2.0
+        ),
+        overall_score=50.0,
+        image_width=1,
+        image_height=1,
+        confidence=1.0
+    )
 
 class ReportGenerator:
     """Generate PDF and visual reports for posture analysis"""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-        
-    def _setup_custom_styles(self):
-        """Setup custom styles for the report"""
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#2E7D32')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.HexColor('#1976D2')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='MetricLabel',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#424242')
-        ))
+        self.styles = get_report_styles()
+        self.suggestion_catalog = get_suggestion_catalog()
+        self.warmed_up = False
+    
+    def warm_up(self) -> float:
+        """Render a throwaway report so fonts, chart templates and catalogs are loaded before the first request"""
+        start = time.perf_counter()
+        self.render_pdf(_warm_up_result())
+        self.warmed_up = True
+        return time.perf_counter() - start
+    
+    @staticmethod
+    def content_key(analysis_result: PostureAnalysisResult) -> str:
+        """Hash of the canonicalized analysis result (identical analyses render identical reports)"""
+        canonical = json.dumps(analysis_result.model_dump(mode='json', warnings=False), sort_keys=True,
+                               separators=(',', ':'), ensure_ascii=False)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
     
     async def generate_pdf_report(self, analysis_result: PostureAnalysisResult) -> Dict[str, str]:
-        """Generate comprehensive PDF report"""
-        
-        # Generate unique report ID
-        report_id = str(uuid.uuid4())
+        """Generate comprehensive PDF report without blocking the event loop"""
+        return await asyncio.to_thread(self.build_pdf_report, analysis_result)
+    
+    def build_pdf_report(self, analysis_result: PostureAnalysisResult,
+                         reports_dir: Optional[str] = None) -> Dict[str, str]:
+        """Render the PDF report synchronously and save it to the reports directory"""
+        return self.save_pdf(self.render_pdf(analysis_result), reports_dir)
+    
+    @staticmethod
+    def save_pdf(pdf: bytes, reports_dir: Optional[str] = None, report_id: Optional[str] = None) -> Dict[str, str]:
+        """Save rendered PDF bytes as a report file"""
+        report_id = report_id or str(uuid.uuid4())
         filename = f"posture_report_{report_id}.pdf"
-        filepath = os.path.join(settings.REPORTS_DIR, filename)
+        filepath = os.path.join(reports_dir or settings.REPORTS_DIR, filename)
+        
+        with open(filepath, 'wb') as f:
+            f.write(pdf)
+        
+        return {
+            "id": report_id,
+            "filename": filename,
+            "url": f"/reports/{filename}",
+            "path": filepath
+        }
+    
+    def render_pdf(self, analysis_result: PostureAnalysisResult) -> bytes:
+        """Render the PDF report into memory (runs in a report worker)"""
         
         # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=A4, rightMargin=50, leftMargin=50,
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50,
                               topMargin=50, bottomMargin=50)
         
         # Build report content
@@ -92,7 +170,7 @@ class ReportGenerator:
         story.append(Spacer(1, 20))
         
         # Visual chart
-        chart_image = await self._create_radar_chart(analysis_result.metrics)
+        chart_image = self._create_radar_chart(analysis_result.metrics)
         if chart_image:
             story.append(Paragraph("姿勢評価チャート", self.styles['SectionHeader']))
             story.append(chart_image)
@@ -110,12 +188,7 @@ class ReportGenerator:
         # Build PDF
         doc.build(story)
         
-        return {
-            "id": report_id,
-            "filename": filename,
-            "url": f"/reports/{filename}",
-            "path": filepath
-        }
+        return buffer.getvalue()
     
     def _create_metrics_table(self, metrics) -> Table:
         """Create metrics comparison table"""
@@ -124,119 +197,40 @@ class ReportGenerator:
             ['測定項目', '測定値', '正常範囲', '評価'],
         ]
         
-        ref_values = settings.REFERENCE_VALUES
-        
-        # Pelvic tilt
-        pelvic_status = self._evaluate_metric(metrics.pelvic_tilt, ref_values['pelvic_tilt']['normal'])
-        data.append([
-            '骨盤傾斜角',
-            f'{metrics.pelvic_tilt:.1f}°',
-            f'{ref_values["pelvic_tilt"]["normal"][0]}-{ref_values["pelvic_tilt"]["normal"][1]}°',
-            pelvic_status
-        ])
-        
-        # Thoracic kyphosis
-        thoracic_status = self._evaluate_metric(metrics.thoracic_kyphosis, ref_values['thoracic_kyphosis']['normal'])
-        data.append([
-            '胸椎後弯角',
-            f'{metrics.thoracic_kyphosis:.1f}°',
-            f'{ref_values["thoracic_kyphosis"]["normal"][0]}-{ref_values["thoracic_kyphosis"]["normal"][1]}°',
-            thoracic_status
-        ])
-        
-        # Cervical lordosis
-        cervical_status = self._evaluate_metric(metrics.cervical_lordosis, ref_values['cervical_lordosis']['normal'])
-        data.append([
-            '頸椎前弯角',
-            f'{metrics.cervical_lordosis:.1f}°',
-            f'{ref_values["cervical_lordosis"]["normal"][0]}-{ref_values["cervical_lordosis"]["normal"][1]}°',
-            cervical_status
-        ])
-        
-        # Shoulder height difference
-        shoulder_status = self._evaluate_metric(metrics.shoulder_height_difference, ref_values['shoulder_height_diff']['normal'])
-        data.append([
-            '肩の高さの差',
-            f'{metrics.shoulder_height_difference:.1f}cm',
-            f'{ref_values["shoulder_height_diff"]["normal"][0]}-{ref_values["shoulder_height_diff"]["normal"][1]}cm',
-            shoulder_status
-        ])
-        
-        # Head forward posture
-        head_status = self._evaluate_metric(metrics.head_forward_posture, ref_values['head_forward_posture']['normal'])
-        data.append([
-            '頭部前方偏位',
-            f'{metrics.head_forward_posture:.1f}cm',
-            f'{ref_values["head_forward_posture"]["normal"][0]}-{ref_values["head_forward_posture"]["normal"][1]}cm',
-            head_status
-        ])
+        # Rows come from the metric registry (metrics flagged for the report)
+        for definition in METRIC_REGISTRY.report_metrics:
+            value = metric_value(metrics, definition.name)
+            if value is None:
+                continue
+            
+            min_normal, max_normal = definition.normal_range
+            data.append([
+                definition.label,
+                f'{value:.1f}{definition.unit_symbol}',
+                f'{min_normal}-{max_normal}{definition.unit_symbol}',
+                self._evaluate_metric(value, definition.normal_range)
+            ])
         
         table = Table(data, colWidths=[2.5*inch, 1.2*inch, 1.2*inch, 1*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E3F2FD')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDBDBD'))
-        ]))
+        table.setStyle(METRICS_TABLE_STYLE)
         
         return table
     
-    async def _create_radar_chart(self, metrics) -> Image:
-        """Create radar chart for posture metrics"""
+    def _create_radar_chart(self, metrics) -> Optional[Drawing]:
+        """Create radar chart for posture metrics as ReportLab vector graphics"""
         
         try:
-            # Setup the radar chart
-            categories = ['骨盤傾斜', '胸椎後弯', '頸椎前弯', '肩の高さ', '頭部前方', '腰椎前弯']
+            chart_metrics = METRIC_REGISTRY.chart_metrics
+            template = get_radar_template(tuple(definition.short_label for definition in chart_metrics))
             
             # Normalize metrics to 0-100 scale for visualization
             values = [
-                self._normalize_for_chart(metrics.pelvic_tilt, [5, 15]),
-                self._normalize_for_chart(metrics.thoracic_kyphosis, [25, 45]),
-                self._normalize_for_chart(metrics.cervical_lordosis, [15, 35]),
-                self._normalize_for_chart(metrics.shoulder_height_difference, [0, 1.5]),
-                self._normalize_for_chart(metrics.head_forward_posture, [0, 2.5]),
-                self._normalize_for_chart(metrics.lumbar_lordosis, [30, 50])
+                self._normalize_for_chart(metric_value(metrics, definition.name), definition.normal_range)
+                for definition in chart_metrics
             ]
             
-            # Create the radar chart
-            fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
-            
-            # Calculate angles for each category
-            angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-            values += values[:1]  # Complete the circle
-            angles += angles[:1]
-            
-            # Plot the radar chart
-            ax.plot(angles, values, 'o-', linewidth=2, color='#2E7D32')
-            ax.fill(angles, values, alpha=0.25, color='#4CAF50')
-            
-            # Add category labels
-            ax.set_xticks(angles[:-1])
-            ax.set_xticklabels(categories, fontsize=12)
-            
-            # Set y-axis limits and labels
-            ax.set_ylim(0, 100)
-            ax.set_yticks([20, 40, 60, 80, 100])
-            ax.set_yticklabels(['20', '40', '60', '80', '100'], fontsize=10)
-            
-            # Add grid
-            ax.grid(True)
-            
-            # Title
-            plt.title('姿勢評価レーダーチャート', size=16, y=1.08)
-            
-            # Save to bytes
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
-            img_buffer.seek(0)
-            plt.close()
-            
-            # Create ReportLab Image
-            return Image(img_buffer, width=4*inch, height=4*inch)
+            # Only the data polygon is drawn per report; the grid and labels are cached
+            return template.draw(values)
             
         except Exception as e:
             print(f"Error creating radar chart: {e}")
@@ -294,39 +288,13 @@ class ReportGenerator:
     
     def _generate_recommendations(self, metrics) -> List[PostureRecommendation]:
         """Generate personalized recommendations based on metrics"""
-        recommendations = []
-        
-        # Pelvic tilt recommendations
-        if metrics.pelvic_tilt > 15:
-            recommendations.append(PostureRecommendation(
-                category="骨盤矯正",
-                title="骨盤後傾エクササイズ",
-                description="仰向けで膝を立て、骨盤を床に押し付けるようにして腹筋を収縮させます。",
-                difficulty="初級",
-                duration="10回 × 3セット",
-                frequency="毎日"
-            ))
-        
-        # Head forward posture recommendations  
-        if metrics.head_forward_posture > 2.5:
-            recommendations.append(PostureRecommendation(
-                category="首・肩矯正",
-                title="頭部後退エクササイズ",
-                description="顎を軽く引き、頭を後ろに押すように首の深部筋を鍛えます。",
-                difficulty="初級", 
-                duration="10秒保持 × 10回",
-                frequency="1日3回"
-            ))
-        
-        # Shoulder height recommendations
-        if metrics.shoulder_height_difference > 1.5:
-            recommendations.append(PostureRecommendation(
-                category="肩バランス矯正",
-                title="肩甲骨安定化エクササイズ",
-                description="肩甲骨を寄せる動作で背中の筋肉を強化し、肩の位置を整えます。",
-                difficulty="中級",
-                duration="15回 × 3セット", 
-                frequency="週3回"
-            ))
-        
-        return recommendations
\ No newline at end of file
+        return list(self.suggestion_catalog.recommendations_for(metrics))
+
+_report_generator: Optional[ReportGenerator] = None
+
+def get_report_generator() -> ReportGenerator:
+    """Process-wide report generator (one per API process and per report worker)"""
+    global _report_generator
+    if _report_generator is None:
+        _report_generator = ReportGenerator()
+    return _report_generator
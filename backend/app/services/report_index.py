@@ -0,0 +1,215 @@
+"""
+レポート索引
+生成済み PDF レポートのメタデータを SQLite で管理する。
+作成・削除時に更新し、一覧はディレクトリ走査ではなく索引からカーソル方式で取得する。
+起動時に REPORTS_DIR と照合して索引の不整合を修復する
+"""
+
+import base64
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("report_index")
+
+REPORT_PREFIX = "posture_report_"
+REPORT_SUFFIX = ".pdf"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    content_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_content ON reports (content_key, created_at DESC);
+"""
+
+_COLUMNS = ('id', 'filename', 'path', 'size', 'created_at', 'content_key')
+
+
+def report_filename(report_id: str) -> str:
+    return f"{REPORT_PREFIX}{report_id}{REPORT_SUFFIX}"
+
+
+def encode_cursor(created_at: float, report_id: str) -> str:
+    """一覧の続きを示す不透明なカーソル（作成日時・ID）"""
+    return base64.urlsafe_b64encode(f"{created_at!r}|{report_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, report_id = raw.split('|', 1)
+        return float(created_at), report_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class ReportIndex:
+    """生成済みレポートのメタデータ索引"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {name: row[name] for name in _COLUMNS}
+
+    # === 更新 ===
+
+    def add(self, report: Dict[str, Any], content_key: Optional[str] = None):
+        """レポートを登録（report は id / filename / path / size / created_at を含む）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (id, filename, path, size, created_at, content_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (report['id'], report['filename'], report['path'], report['size'],
+                 report['created_at'], content_key)
+            )
+
+    def remove(self, report_id: str) -> bool:
+        """レポートを索引から削除（登録されていた場合 True）"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM reports WHERE id = ?", (report_id,)).rowcount > 0
+
+    def remove_many(self, report_ids: List[str]) -> int:
+        """複数のレポートを索引から削除し、削除件数を返す"""
+        with self._lock, self._conn:
+            return self._conn.executemany(
+                "DELETE FROM reports WHERE id = ?", [(report_id,) for report_id in report_ids]
+            ).rowcount
+
+    # === 参照 ===
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def oldest_first(self) -> List[Dict[str, Any]]:
+        """全レポートを古い順に取得（保持期間・容量管理用）"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM reports ORDER BY created_at, id").fetchall()
+        return [self._row(row) for row in rows]
+
+    def latest_for_content(self, content_key: str) -> Optional[Dict[str, Any]]:
+        """同一内容の分析結果から作成された最新のレポート"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM reports WHERE content_key = ? ORDER BY created_at DESC LIMIT 1", (content_key,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def _filters(self, since: Optional[float], until: Optional[float],
+                 content_key: Optional[str]) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if content_key is not None:
+            clauses.append("content_key = ?")
+            params.append(content_key)
+        return clauses, params
+
+    def list(self, limit: int = 50, cursor: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None, content_key: Optional[str] = None
+             ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        新しい順にレポートを取得
+        次のページがある場合はそのカーソルを合わせて返す
+        """
+        clauses, params = self._filters(since, until, content_key)
+        if cursor is not None:
+            created_at, report_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, report_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM reports {where} ORDER BY created_at DESC, id DESC LIMIT ?", (*params, limit + 1)
+            ).fetchall()
+
+        reports = [self._row(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = reports[-1]
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        return reports, next_cursor
+
+    def count(self, since: Optional[float] = None, until: Optional[float] = None,
+              content_key: Optional[str] = None) -> int:
+        clauses, params = self._filters(since, until, content_key)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+
+    # === 照合 ===
+
+    def reconcile(self, reports_dir: str) -> Dict[str, int]:
+        """
+        REPORTS_DIR と索引を照合
+        索引にないファイルを登録し、ファイルが無くなった索引エントリを削除する
+        """
+        start = time.perf_counter()
+        files = {}
+        if os.path.isdir(reports_dir):
+            with os.scandir(reports_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.startswith(REPORT_PREFIX) and entry.name.endswith(REPORT_SUFFIX):
+                        files[entry.name[len(REPORT_PREFIX):-len(REPORT_SUFFIX)]] = entry
+
+        with self._lock:
+            indexed = {row[0] for row in self._conn.execute("SELECT id FROM reports")}
+
+        missing = [files[report_id] for report_id in files.keys() - indexed]
+        stale = list(indexed - files.keys())
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reports (id, filename, path, size, created_at, content_key) "
+                "VALUES (?, ?, ?, ?, ?, NULL)",
+                [(entry.name[len(REPORT_PREFIX):-len(REPORT_SUFFIX)], entry.name, entry.path,
+                  entry.stat().st_size, entry.stat().st_mtime) for entry in missing]
+            )
+            self._conn.executemany("DELETE FROM reports WHERE id = ?", [(report_id,) for report_id in stale])
+
+        stats = {'files': len(files), 'added': len(missing), 'removed': len(stale)}
+        logger.info("レポート索引照合完了", duration=round(time.perf_counter() - start, 3), **stats)
+        return stats
+
+
+_report_index: Optional[ReportIndex] = None
+
+
+def get_report_index() -> ReportIndex:
+    """レポート索引のシングルトン取得"""
+    global _report_index
+    if _report_index is None:
+        _report_index = ReportIndex(settings.REPORT_INDEX_PATH)
+    return _report_index
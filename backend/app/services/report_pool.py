@@ -0,0 +1,356 @@
+"""
+レポート生成ワーカープール
+PDF レポートの描画（レーダーチャート・ReportLab 文書作成）をイベントループから専用のプロセスプールへ移す。
+同時実行数の上限と待ち行列の長さを管理し、待ち時間・描画時間の統計を公開する。
+同一内容の分析結果は描画済みレポートを再利用し、同時の同一要求は1回の描画にまとめる。
+PDF をメモリ上に描画してそのまま返すモードでは、ファイル保存は任意の後処理となる
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.report_generator import ReportGenerator, get_report_generator
+from backend.app.services.report_index import ReportIndex, get_report_index
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("report_pool")
+
+
+class ReportQueueFull(Exception):
+    """レポート生成の待ち行列が上限に達した"""
+
+
+# === ワーカープロセス側 ===
+
+def _warm_up_worker() -> Tuple[int, float]:
+    """ワーカープロセスを起動し、捨てレポートを1回描画してフォント・チャート背景を読み込んでおく"""
+    generator = get_report_generator()
+    duration = 0.0 if generator.warmed_up else generator.warm_up()
+    return os.getpid(), duration
+
+
+def _with_file_stats(report: Dict[str, Any]) -> Dict[str, Any]:
+    stat = os.stat(report['path'])
+    report.update(size=stat.st_size, created_at=stat.st_mtime)
+    return report
+
+
+def _render_report(analysis_result: PostureAnalysisResult, reports_dir: str) -> Tuple[Dict[str, Any], float]:
+    """ワーカープロセスでレポートを描画・保存し、結果（サイズ・作成日時を含む）と描画時間（秒）を返す"""
+    start = time.perf_counter()
+    report = get_report_generator().build_pdf_report(analysis_result, reports_dir)
+    return _with_file_stats(report), time.perf_counter() - start
+
+
+def _render_pdf(analysis_result: PostureAnalysisResult) -> Tuple[bytes, float]:
+    """ワーカープロセスでレポートをメモリ上に描画し、PDF と描画時間（秒）を返す"""
+    start = time.perf_counter()
+    pdf = get_report_generator().render_pdf(analysis_result)
+    return pdf, time.perf_counter() - start
+
+
+def _read_pdf(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class RenderedPdf(NamedTuple):
+    """メモリ上に描画した PDF（report_id は保存済みレポートがある場合のみ）"""
+    content_key: str
+    pdf: bytes
+    report_id: Optional[str] = None
+
+
+# === イベントループ側 ===
+
+class ReportPoolStats:
+    """直近のレポート生成の待ち時間・描画時間の統計"""
+
+    def __init__(self, max_history_size: int = 1000):
+        self.wait_times = deque(maxlen=max_history_size)
+        self.render_times = deque(maxlen=max_history_size)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.prerendered = 0
+        self.prerender_skipped = 0
+
+    def record(self, wait_time: float, render_time: float):
+        self.completed += 1
+        self.wait_times.append(wait_time)
+        self.render_times.append(render_time)
+
+    def summary(self) -> Dict[str, Any]:
+        """件数と p50 / p95 の待ち時間・描画時間（ms）"""
+        summary = {
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'cache_hits': self.cache_hits,
+            'coalesced': self.coalesced,
+            'prerendered': self.prerendered,
+            'prerender_skipped': self.prerender_skipped,
+        }
+        if self.wait_times:
+            wait_times = np.array(self.wait_times) * 1000
+            render_times = np.array(self.render_times) * 1000
+            summary.update({
+                'wait_p50_ms': round(float(np.percentile(wait_times, 50)), 1),
+                'wait_p95_ms': round(float(np.percentile(wait_times, 95)), 1),
+                'render_p50_ms': round(float(np.percentile(render_times, 50)), 1),
+                'render_p95_ms': round(float(np.percentile(render_times, 95)), 1),
+            })
+        return summary
+
+
+class ReportPool:
+    """
+    レポート生成用のプロセスプール
+    max_concurrency 件まで並行に描画し、それを超える要求は max_queue 件まで待機させる
+    （超過分は ReportQueueFull）
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 max_queue: int = 32, reports_dir: Optional[str] = None, cache_size: int = 256,
+                 index: Optional[ReportIndex] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_queue = max_queue
+        self.reports_dir = reports_dir or settings.REPORTS_DIR
+        self.stats = ReportPoolStats()
+        self.queued = 0
+        self.running = 0
+        self.speculative = 0
+        self.cache_size = cache_size
+        self.index = index
+        self._reports: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # イベントループのスレッド状態を引き継がないよう spawn で起動
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    async def start(self):
+        """ワーカープロセスを起動して初回リクエストの起動待ちをなくす"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        warm_ups = await asyncio.gather(*(
+            loop.run_in_executor(executor, _warm_up_worker) for _ in range(self.max_workers)
+        ))
+        logger.info("レポートワーカー起動完了", workers=len({pid for pid, _ in warm_ups}),
+                    max_concurrency=self.max_concurrency,
+                    warm_up_ms=round(max(duration for _, duration in warm_ups) * 1000, 1))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, analysis_result: PostureAnalysisResult) -> Dict[str, Any]:
+        """
+        レポートを取得
+        同一内容のレポートが描画済みならそれを返し、描画中なら完了を待つ。
+        それ以外はワーカーで描画・保存する（同時実行数の上限まで待機）
+        """
+        key = ReportGenerator.content_key(analysis_result)
+
+        report = await self._cached_report(key)
+        if report is not None:
+            self.stats.cache_hits += 1
+            return dict(report)
+
+        pending = self._coalesce(('file', key), lambda: self._render_and_store(key, analysis_result))
+        return dict(await asyncio.shield(pending))
+
+    def is_idle(self) -> bool:
+        """待ち行列が空で、空きワーカーがある"""
+        return self.queued == 0 and self.running < self.max_concurrency
+
+    async def prerender(self, analysis_result: PostureAnalysisResult) -> bool:
+        """
+        後続のレポート要求に備えて投機的に描画・保存
+        空きワーカーがある場合のみ1件ずつ実行し、待ち行列に要求があれば何もしない。
+        描画した場合 True を返す
+        """
+        if self.speculative or not self.is_idle():
+            self.stats.prerender_skipped += 1
+            return False
+
+        key = ReportGenerator.content_key(analysis_result)
+        if ('file', key) in self._pending or await self._cached_report(key) is not None:
+            return False
+
+        self.speculative += 1
+        try:
+            pending = self._coalesce(('file', key), lambda: self._render_and_store(key, analysis_result))
+            await asyncio.shield(pending)
+        except Exception as e:
+            logger.warning("投機的レポート描画失敗", error=str(e))
+            return False
+        finally:
+            self.speculative -= 1
+
+        self.stats.prerendered += 1
+        return True
+
+    async def render_pdf(self, analysis_result: PostureAnalysisResult) -> RenderedPdf:
+        """
+        レポートを PDF バイト列として取得（ファイルには保存しない）
+        同一内容の保存済みレポートがあればそのファイルを読み込んで返す
+        """
+        key = ReportGenerator.content_key(analysis_result)
+
+        report = await self._cached_report(key)
+        if report is not None:
+            try:
+                pdf = await asyncio.to_thread(_read_pdf, report['path'])
+            except FileNotFoundError:
+                pass
+            else:
+                self.stats.cache_hits += 1
+                return RenderedPdf(key, pdf, report['id'])
+
+        pending = self._coalesce(('pdf', key), lambda: self._run(_render_pdf, analysis_result))
+        return RenderedPdf(key, await asyncio.shield(pending))
+
+    async def persist(self, content_key: str, pdf: bytes, report_id: Optional[str] = None) -> Dict[str, Any]:
+        """メモリ上に描画した PDF を REPORTS_DIR に保存して索引に登録（保存済みなら既存のレポート）"""
+        report = await self._cached_report(content_key)
+        if report is None:
+            report = await asyncio.to_thread(
+                lambda: _with_file_stats(ReportGenerator.save_pdf(pdf, self.reports_dir, report_id))
+            )
+            await self._store(content_key, report)
+        return dict(report)
+
+    def _coalesce(self, key: Tuple[str, str], start: Callable[[], Any]) -> asyncio.Future:
+        """
+        同じキーの処理が実行中ならそれを、無ければ新しく開始したタスクを返す
+        呼び出し側は shield して待つ（待機中の要求がキャンセルされても処理は他の要求のために継続する）
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            return pending
+
+        pending = asyncio.ensure_future(start())
+        pending.add_done_callback(lambda task: self._pending.pop(key, None))
+        self._pending[key] = pending
+        return pending
+
+    async def _render_and_store(self, key: str, analysis_result: PostureAnalysisResult) -> Dict[str, Any]:
+        """ワーカーで描画し、索引への登録まで終えてから結果を返す"""
+        report = await self._run(_render_report, analysis_result, self.reports_dir)
+        await self._store(key, report)
+        return report
+
+    async def _cached_report(self, key: str) -> Optional[Dict[str, Any]]:
+        report = self._reports.get(key)
+        if report is None and self.index is not None:
+            # 再起動前に作成されたレポートは索引から探す（SQLite はイベントループ外で実行）
+            report = await asyncio.to_thread(self.index.latest_for_content, key)
+            if report is not None:
+                report['url'] = f"/reports/{report['filename']}"
+                self._remember(key, report)
+        if report is None:
+            return None
+        if not os.path.exists(report['path']):
+            # 削除済みのレポートは描画し直す
+            self._reports.pop(key, None)
+            if self.index is not None:
+                await asyncio.to_thread(self.index.remove, report['id'])
+            return None
+        self._reports.move_to_end(key)
+        return report
+
+    def _remember(self, key: str, report: Dict[str, Any]):
+        self._reports[key] = report
+        self._reports.move_to_end(key)
+        while len(self._reports) > self.cache_size:
+            self._reports.popitem(last=False)
+
+    async def _store(self, key: str, report: Dict[str, Any]):
+        self._remember(key, report)
+        if self.index is not None:
+            await asyncio.to_thread(self.index.add, report, content_key=key)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """ワーカーで func を実行（同時実行数の上限まで待機、待ち行列が上限なら ReportQueueFull）"""
+        if self.queued >= self.max_queue:
+            self.stats.rejected += 1
+            raise ReportQueueFull(f"Report queue is full ({self.max_queue} pending)")
+
+        enqueued = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        wait_time = time.perf_counter() - enqueued
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, render_time = await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # ワーカーが異常終了した場合は次回の要求でプールを作り直す
+            self.stats.failed += 1
+            self.shutdown()
+            raise
+        except Exception:
+            self.stats.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+        self.stats.record(wait_time, render_time)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """プール構成・現在の待ち行列・統計"""
+        return {
+            'workers': self.max_workers,
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'queued': self.queued,
+            'running': self.running,
+            'speculative': self.speculative,
+            'cached_reports': len(self._reports),
+            **self.stats.summary(),
+        }
+
+
+_report_pool: Optional[ReportPool] = None
+
+
+def get_report_pool() -> ReportPool:
+    """レポートワーカープールのシングルトン取得"""
+    global _report_pool
+    if _report_pool is None:
+        _report_pool = ReportPool(
+            max_workers=settings.REPORT_WORKERS,
+            max_concurrency=settings.REPORT_MAX_CONCURRENCY,
+            max_queue=settings.REPORT_QUEUE_LIMIT,
+            cache_size=settings.REPORT_CACHE_SIZE,
+            index=get_report_index(),
+        )
+    return _report_pool
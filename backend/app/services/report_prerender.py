@@ -0,0 +1,50 @@
+"""
+レポートの投機的事前描画
+分析成功後、後続のレポート要求に備えて空きワーカーで低優先度の描画を行う（REPORT_PRERENDER で有効化）。
+対話的な分析が実行中、またはレポートの待ち行列に要求がある間は描画しない
+"""
+
+from contextlib import contextmanager
+from typing import Optional
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.report_pool import ReportPool, get_report_pool
+
+
+class ReportPrerenderer:
+    """分析後のレポート事前描画ポリシー"""
+
+    def __init__(self, pool: ReportPool, enabled: bool = False):
+        self.pool = pool
+        self.enabled = enabled
+        self.active_analyses = 0
+
+    @contextmanager
+    def analysis(self):
+        """対話的な分析処理の実行中を示す（この間は事前描画しない）"""
+        self.active_analyses += 1
+        try:
+            yield
+        finally:
+            self.active_analyses -= 1
+
+    async def schedule(self, analysis_result: PostureAnalysisResult) -> bool:
+        """分析応答の送信後に呼び出され、条件を満たせば事前描画する"""
+        if not self.enabled:
+            return False
+        if self.active_analyses:
+            self.pool.stats.prerender_skipped += 1
+            return False
+        return await self.pool.prerender(analysis_result)
+
+
+_report_prerenderer: Optional[ReportPrerenderer] = None
+
+
+def get_report_prerenderer() -> ReportPrerenderer:
+    """レポート事前描画ポリシーのシングルトン取得"""
+    global _report_prerenderer
+    if _report_prerenderer is None:
+        _report_prerenderer = ReportPrerenderer(get_report_pool(), settings.REPORT_PRERENDER)
+    return _report_prerenderer
@@ -0,0 +1,67 @@
+"""
+分析結果ストア
+/api/analyze の結果を analysis_id でサーバ側に保持し、レポート生成時に
+クライアントが結果全体を送り返さなくてもよいようにする（件数上限と有効期限つき）
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+
+
+class ResultStore:
+    """分析結果の LRU ストア（ttl 秒を過ぎた結果は取得できない）"""
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._results: 'OrderedDict[str, Tuple[float, PostureAnalysisResult]]' = OrderedDict()
+
+    def put(self, result: PostureAnalysisResult) -> str:
+        """結果を保存して analysis_id を返す"""
+        analysis_id = uuid.uuid4().hex
+        self._results[analysis_id] = (time.monotonic(), result)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+        return analysis_id
+
+    def get(self, analysis_id: str) -> Optional[PostureAnalysisResult]:
+        """analysis_id の結果（存在しない・期限切れは None）"""
+        entry = self._results.get(analysis_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._results[analysis_id]
+            self.misses += 1
+            return None
+        self._results.move_to_end(analysis_id)
+        self.hits += 1
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'stored': len(self._results),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+_result_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    """分析結果ストアのシングルトン取得"""
+    global _result_store
+    if _result_store is None:
+        _result_store = ResultStore(settings.ANALYSIS_STORE_SIZE, settings.ANALYSIS_STORE_TTL)
+    return _result_store
@@ -0,0 +1,240 @@
+"""
+ストレージ保守
+REPORTS_DIR と logs/ を保持期間・合計容量・分析ごとの件数で定期的に整理する。
+削除は古いものから順に行い、処理はスレッドで実行してリクエスト処理を妨げない。
+回収した容量は統計として公開する
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from backend.app.core.config import settings
+from backend.app.services.report_index import ReportIndex, get_report_index
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("storage_maintenance")
+
+LOG_EXTENSIONS = ('.log', '.jsonl')
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """保持ポリシー（None の項目は制限なし）"""
+    max_age_days: Optional[float] = None
+    max_total_bytes: Optional[int] = None
+    max_per_analysis: Optional[int] = None
+
+    def expired_before(self, now: float) -> Optional[float]:
+        return now - self.max_age_days * 86400 if self.max_age_days else None
+
+
+def select_evictions(entries: List[Dict[str, Any]], policy: RetentionPolicy, now: float,
+                     group_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    古い順に並んだ entries（size / created_at を持つ）から削除対象を選択
+    保持期間切れ → グループごとの件数超過（新しいものを残す）→ 合計容量超過の順に適用する
+    """
+    evicted: Set[int] = set()
+
+    cutoff = policy.expired_before(now)
+    if cutoff is not None:
+        evicted.update(i for i, entry in enumerate(entries) if entry['created_at'] < cutoff)
+
+    if policy.max_per_analysis and group_key:
+        groups = defaultdict(list)
+        for i, entry in enumerate(entries):
+            if i not in evicted and entry.get(group_key):
+                groups[entry[group_key]].append(i)
+        for indices in groups.values():
+            evicted.update(indices[:-policy.max_per_analysis])
+
+    if policy.max_total_bytes is not None:
+        total = sum(entry['size'] for i, entry in enumerate(entries) if i not in evicted)
+        for i, entry in enumerate(entries):
+            if total <= policy.max_total_bytes:
+                break
+            if i not in evicted:
+                evicted.add(i)
+                total -= entry['size']
+
+    return [entries[i] for i in sorted(evicted)]
+
+
+def _active_log_files() -> Set[str]:
+    """このプロセスのロガーが書き込み中のファイル（削除対象外）"""
+    active = set()
+    loggers = [logging.getLogger()] + [
+        item for item in logging.Logger.manager.loggerDict.values() if isinstance(item, logging.Logger)
+    ]
+    for item in loggers:
+        for handler in item.handlers:
+            if isinstance(handler, logging.FileHandler):
+                active.add(os.path.abspath(handler.baseFilename))
+    return active
+
+
+class StorageStats:
+    """保守処理の累計統計"""
+
+    def __init__(self):
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.reclaimed_bytes = {'reports': 0, 'logs': 0}
+        self.removed_files = {'reports': 0, 'logs': 0}
+
+    def record(self, category: str, removed: int, reclaimed: int):
+        self.removed_files[category] += removed
+        self.reclaimed_bytes[category] += reclaimed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'runs': self.runs,
+            'last_run': self.last_run,
+            'last_duration_ms': round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            'reclaimed_bytes': {**self.reclaimed_bytes, 'total': sum(self.reclaimed_bytes.values())},
+            'removed_files': dict(self.removed_files),
+        }
+
+
+class StorageMaintenance:
+    """レポート・ログの保持期間と容量を管理するバックグラウンド処理"""
+
+    def __init__(self, logs_dir: str, index: Optional[ReportIndex],
+                 report_policy: RetentionPolicy, log_policy: RetentionPolicy, interval: float = 3600):
+        self.logs_dir = logs_dir
+        self.index = index
+        self.report_policy = report_policy
+        self.log_policy = log_policy
+        self.interval = interval
+        self.stats = StorageStats()
+        self._task: Optional[asyncio.Task] = None
+
+    # === 整理処理（スレッドで実行） ===
+
+    def collect_reports(self, now: Optional[float] = None) -> Dict[str, int]:
+        """索引上のレポートをポリシーに従って削除"""
+        if self.index is None:
+            return {'removed': 0, 'reclaimed_bytes': 0}
+
+        now = now if now is not None else time.time()
+        evictions = select_evictions(self.index.oldest_first(), self.report_policy, now, group_key='content_key')
+
+        reclaimed = 0
+        for report in evictions:
+            try:
+                os.remove(report['path'])
+                reclaimed += report['size']
+            except FileNotFoundError:
+                pass
+        self.index.remove_many([report['id'] for report in evictions])
+
+        self.stats.record('reports', len(evictions), reclaimed)
+        return {'removed': len(evictions), 'reclaimed_bytes': reclaimed}
+
+    def collect_logs(self, now: Optional[float] = None) -> Dict[str, int]:
+        """書き込み中でないログファイルをポリシーに従って削除"""
+        if not os.path.isdir(self.logs_dir):
+            return {'removed': 0, 'reclaimed_bytes': 0}
+
+        now = now if now is not None else time.time()
+        active = _active_log_files()
+        entries = []
+        with os.scandir(self.logs_dir) as items:
+            for item in items:
+                if item.is_file() and item.name.endswith(LOG_EXTENSIONS) and os.path.abspath(item.path) not in active:
+                    stat = item.stat()
+                    entries.append({'path': item.path, 'size': stat.st_size, 'created_at': stat.st_mtime})
+        entries.sort(key=lambda entry: entry['created_at'])
+
+        removed, reclaimed = 0, 0
+        for entry in select_evictions(entries, self.log_policy, now):
+            try:
+                os.remove(entry['path'])
+            except FileNotFoundError:
+                continue
+            removed += 1
+            reclaimed += entry['size']
+
+        self.stats.record('logs', removed, reclaimed)
+        return {'removed': removed, 'reclaimed_bytes': reclaimed}
+
+    def run_once(self, now: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """レポートとログを1回整理"""
+        start = time.perf_counter()
+        result = {'reports': self.collect_reports(now), 'logs': self.collect_logs(now)}
+        self.stats.runs += 1
+        self.stats.last_run = time.time()
+        self.stats.last_duration = time.perf_counter() - start
+        if result['reports']['removed'] or result['logs']['removed']:
+            logger.info("ストレージ整理完了", duration=round(self.stats.last_duration, 3), **{
+                f"{category}_{name}": value for category, values in result.items() for name, value in values.items()
+            })
+        return result
+
+    # === バックグラウンド実行 ===
+
+    def start(self):
+        """定期実行タスクを開始（interval が 0 以下なら何もしない）"""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_periodically(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error("ストレージ整理エラー", error=e)
+            await asyncio.sleep(self.interval)
+
+    def summary(self) -> Dict[str, Any]:
+        """ポリシーと回収容量の統計"""
+        return {
+            'interval_seconds': self.interval,
+            'report_policy': self.report_policy.__dict__,
+            'log_policy': self.log_policy.__dict__,
+            **self.stats.summary(),
+        }
+
+
+_storage_maintenance: Optional[StorageMaintenance] = None
+
+
+def _limit(value):
+    # 設定値 0 は制限なし
+    return value or None
+
+
+def get_storage_maintenance() -> StorageMaintenance:
+    """ストレージ保守のシングルトン取得"""
+    global _storage_maintenance
+    if _storage_maintenance is None:
+        _storage_maintenance = StorageMaintenance(
+            logs_dir=settings.LOGS_DIR,
+            index=get_report_index(),
+            report_policy=RetentionPolicy(
+                max_age_days=_limit(settings.REPORT_RETENTION_DAYS),
+                max_total_bytes=_limit(settings.REPORT_MAX_TOTAL_BYTES),
+                max_per_analysis=_limit(settings.REPORT_MAX_PER_ANALYSIS),
+            ),
+            log_policy=RetentionPolicy(
+                max_age_days=_limit(settings.LOG_RETENTION_DAYS),
+                max_total_bytes=_limit(settings.LOG_MAX_TOTAL_BYTES),
+            ),
+            interval=settings.STORAGE_GC_INTERVAL,
+        )
+    return _storage_maintenance
@@ -0,0 +1,249 @@
+"""
+姿勢トレンド集計
+ユーザー・メトリクスごとに件数・平均・分散（Welford 法）・指数移動平均・最小/最大と
+直近 N 回のリングバッファを保持し、分析1回ごとに O(1) で更新する。
+集計状態は履歴と同じトランザクションで保存するため、表示時に履歴を走査しない
+"""
+
+import math
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.history_store import HistoryStore, analysis_metrics, get_history_store
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("trend_aggregator")
+
+OVERALL_SCORE = 'overall_score'
+
+
+class RunningStats:
+    """1系列の逐次統計"""
+
+    __slots__ = ('count', 'mean', 'm2', 'ema', 'min', 'max', 'recent')
+
+    def __init__(self, recent_size: int):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ema: Optional[float] = None
+        self.min = math.inf
+        self.max = -math.inf
+        self.recent: deque = deque(maxlen=recent_size)
+
+    def update(self, value: float, alpha: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.ema = value if self.ema is None else alpha * value + (1 - alpha) * self.ema
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    @property
+    def variance(self) -> float:
+        """標本分散（2件未満は 0）"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 3),
+            'std': round(math.sqrt(self.variance), 3),
+            'ema': round(self.ema, 3) if self.ema is not None else None,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'recent': list(self.recent),
+        }
+
+    def to_state(self) -> list:
+        return [self.count, self.mean, self.m2, self.ema, self.min, self.max, list(self.recent)]
+
+    @classmethod
+    def from_state(cls, state: list, recent_size: int) -> 'RunningStats':
+        stats = cls(recent_size)
+        stats.count, stats.mean, stats.m2, stats.ema, stats.min, stats.max, recent = state
+        stats.recent.extend(recent)
+        return stats
+
+
+class UserTrend:
+    """ユーザー1人分の集計（メトリクス名 → RunningStats）"""
+
+    def __init__(self, recent_size: int, baseline_size: int):
+        self.recent_size = recent_size
+        self.baseline_size = baseline_size
+        self.metrics: Dict[str, RunningStats] = {}
+        self.first_analysis: Optional[float] = None
+        self.last_analysis: Optional[float] = None
+        # 最初の baseline_size 回の総合スコア平均を改善度の基準にする
+        self.baseline_sum = 0.0
+        self.baseline_count = 0
+
+    def update(self, timestamp: float, values: Dict[str, float], alpha: float):
+        if self.first_analysis is None or timestamp < self.first_analysis:
+            self.first_analysis = timestamp
+        if self.last_analysis is None or timestamp > self.last_analysis:
+            self.last_analysis = timestamp
+
+        for name, value in values.items():
+            stats = self.metrics.get(name)
+            if stats is None:
+                stats = self.metrics[name] = RunningStats(self.recent_size)
+            stats.update(value, alpha)
+
+        if self.baseline_count < self.baseline_size and OVERALL_SCORE in values:
+            self.baseline_sum += values[OVERALL_SCORE]
+            self.baseline_count += 1
+
+    @property
+    def count(self) -> int:
+        stats = self.metrics.get(OVERALL_SCORE)
+        return stats.count if stats else 0
+
+    @property
+    def improvement_score(self) -> float:
+        """総合スコアの EMA と初期基準の差（正なら改善）"""
+        stats = self.metrics.get(OVERALL_SCORE)
+        if stats is None or not self.baseline_count:
+            return 0.0
+        return round(stats.ema - self.baseline_sum / self.baseline_count, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'first_analysis': datetime.fromtimestamp(self.first_analysis).isoformat() if self.first_analysis else None,
+            'last_analysis': datetime.fromtimestamp(self.last_analysis).isoformat() if self.last_analysis else None,
+            'improvement_score': self.improvement_score,
+            'metrics': {name: stats.summary() for name, stats in self.metrics.items()},
+            # PostureHistory.trend_data 形式（直近 N 回）
+            'trend_data': {name: list(stats.recent) for name, stats in self.metrics.items()},
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'first_analysis': self.first_analysis,
+            'last_analysis': self.last_analysis,
+            'baseline': [self.baseline_sum, self.baseline_count],
+            'metrics': {name: stats.to_state() for name, stats in self.metrics.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], recent_size: int, baseline_size: int) -> 'UserTrend':
+        trend = cls(recent_size, baseline_size)
+        trend.first_analysis = state['first_analysis']
+        trend.last_analysis = state['last_analysis']
+        trend.baseline_sum, trend.baseline_count = state['baseline']
+        trend.metrics = {
+            name: RunningStats.from_state(values, recent_size) for name, values in state['metrics'].items()
+        }
+        return trend
+
+
+class TrendAggregator:
+    """ユーザーごとのトレンド集計（メモリ上の LRU と履歴 DB 上の保存状態）"""
+
+    def __init__(self, history: HistoryStore, recent_size: int = 30, ema_alpha: float = 0.2,
+                 baseline_size: int = 5, cache_size: int = 1000):
+        self.history = history
+        self.recent_size = recent_size
+        self.ema_alpha = ema_alpha
+        self.baseline_size = baseline_size
+        self.cache_size = cache_size
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+        self._trends: 'OrderedDict[str, UserTrend]' = OrderedDict()
+
+    def _new_trend(self) -> UserTrend:
+        return UserTrend(self.recent_size, self.baseline_size)
+
+    def _load(self, user_id: str) -> UserTrend:
+        """キャッシュ → 保存状態 → 履歴の再集計（この機能以前の履歴のみ）の順に取得"""
+        trend = self._trends.get(user_id)
+        if trend is not None:
+            self._trends.move_to_end(user_id)
+            return trend
+
+        state = self.history.trend_state(user_id)
+        if state is not None:
+            trend = UserTrend.from_state(state, self.recent_size, self.baseline_size)
+        else:
+            trend = self._rebuild(user_id)
+
+        self._trends[user_id] = trend
+        while len(self._trends) > self.cache_size:
+            self._trends.popitem(last=False)
+        return trend
+
+    def _rebuild(self, user_id: str) -> UserTrend:
+        trend = self._new_trend()
+        if self.history.count(user_id):
+            for timestamp, values in self._history_values(user_id):
+                trend.update(timestamp, values, self.ema_alpha)
+            self.history.save_trend_state(user_id, trend.to_state())
+            self.rebuilds += 1
+            logger.info("トレンド集計を履歴から再構築", user_id=user_id, count=trend.count)
+        return trend
+
+    def _history_values(self, user_id: str) -> Iterable[Tuple[float, Dict[str, float]]]:
+        series = self.history.series(user_id)
+        trend_data = series['trend_data']
+        for i, timestamp in enumerate(series['timestamps']):
+            yield timestamp, {name: values[i] for name, values in trend_data.items() if values[i] is not None}
+
+    def record(self, user_id: str, result: PostureAnalysisResult, analysis_id: Optional[str] = None) -> str:
+        """
+        分析結果を履歴に記録し、集計を O(1) で更新（集計状態は同じトランザクションで保存）
+        キャッシュの集計は記録の確定後に差し替え、記録済みの analysis_id は集計しない
+        """
+        values = {OVERALL_SCORE: result.overall_score, **analysis_metrics(result)}
+        with self._lock:
+            current = self._load(user_id)
+            trend = UserTrend.from_state(current.to_state(), self.recent_size, self.baseline_size)
+            trend.update(result.analysis_timestamp.timestamp(), values, self.ema_alpha)
+            recorded = self.history.add(user_id, result, analysis_id, trend_state=trend.to_state())
+            if recorded is None:
+                logger.info("記録済みの分析のため集計をスキップ", user_id=user_id, analysis_id=analysis_id)
+                return analysis_id
+            self._trends[user_id] = trend
+            return recorded
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        """ユーザーのトレンド概要（履歴は走査しない）"""
+        with self._lock:
+            return {'user_id': user_id, **self._load(user_id).summary()}
+
+    def forget(self, user_id: str):
+        with self._lock:
+            self._trends.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'cached_users': len(self._trends),
+            'cache_size': self.cache_size,
+            'recent_size': self.recent_size,
+            'ema_alpha': self.ema_alpha,
+            'rebuilds': self.rebuilds,
+        }
+
+
+_trend_aggregator: Optional[TrendAggregator] = None
+
+
+def get_trend_aggregator() -> TrendAggregator:
+    """トレンド集計のシングルトン取得"""
+    global _trend_aggregator
+    if _trend_aggregator is None:
+        _trend_aggregator = TrendAggregator(
+            get_history_store(),
+            recent_size=settings.TREND_RECENT_SIZE,
+            ema_alpha=settings.TREND_EMA_ALPHA,
+            baseline_size=settings.TREND_BASELINE_SIZE,
+            cache_size=settings.TREND_CACHE_SIZE,
+        )
+    return _trend_aggregator
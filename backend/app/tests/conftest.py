@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+# 保存先の設定はモジュールの import 時（ロガー・レポート索引など）や描画ワーカーの
+# 起動時にも参照されるため、backend を import する前にセッション用の一時ディレクトリへ向ける
+_STORAGE_PATHS = {
+    'UPLOAD_DIR': 'uploads',
+    'REPORTS_DIR': 'reports',
+    'REPORT_INDEX_PATH': os.path.join('reports', 'report_index.db'),
+    'HISTORY_DB_PATH': os.path.join('data', 'posture_history.db'),
+    'LOGS_DIR': 'logs',
+}
+_session_root = tempfile.mkdtemp(prefix='posture-tests-')
+os.environ.update({name: os.path.join(_session_root, path) for name, path in _STORAGE_PATHS.items()})
+
+import pytest
+from unittest.mock import Mock
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.analysis_graph import AnalysisGraph
+from backend.app.utils.landmark_array import LandmarkArray
+from backend.app.utils.metric_kernel import MetricKernel
+from backend.app.utils.pose_detector import PoseDetector
+from backend.app.utils.posture_classifier import PostureClassifier
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_session_root, ignore_errors=True)
+
+@pytest.fixture(autouse=True)
+def storage_root(tmp_path_factory, monkeypatch):
+    """Each test writes reports, indexes, history and logs below its own temporary directory"""
+    root = tmp_path_factory.mktemp('storage')
+    for name, path in _STORAGE_PATHS.items():
+        monkeypatch.setattr(settings, name, str(root / path))
+    (root / 'reports').mkdir()
+    return root
+
+@pytest.fixture
+def graph_result() -> PostureAnalysisResult:
+    """A result as /api/analyze stores it (built by AnalysisGraph without re-validation)"""
+    landmarks = LandmarkArray.from_dict({
+        'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9},
+        'left_ear': {'x': 0.42, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+        'right_ear': {'x': 0.55, 'y': 0.12, 'z': 0.0, 'visibility': 0.8},
+        'left_shoulder': {'x': 0.3, 'y': 0.22, 'z': 0.0, 'visibility': 0.95},
+        'right_shoulder': {'x': 0.7, 'y': 0.28, 'z': 0.0, 'visibility': 0.95},
+        'left_elbow': {'x': 0.25, 'y': 0.38, 'z': 0.0, 'visibility': 0.9},
+        'right_elbow': {'x': 0.75, 'y': 0.4, 'z': 0.0, 'visibility': 0.9},
+        'left_hip': {'x': 0.4, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+        'right_hip': {'x': 0.65, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+    })
+    analyzer = Mock()
+    analyzer.pose_detector = PoseDetector()
+    analyzer.posture_classifier = PostureClassifier()
+    analyzer.metric_kernel = MetricKernel()
+    analyzer._detect_seated_posture.return_value = False
+    analyzer._calculate_enhanced_overall_score.return_value = 80.0
+    return AnalysisGraph(analyzer, landmarks, (640, 480)).to_result()
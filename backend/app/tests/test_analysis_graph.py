@@ -0,0 +1,134 @@
+import json
+import pickle
+import pytest
+from unittest.mock import Mock
+
+from backend.app.services.analysis_graph import (
+    ANALYSIS_SECTIONS, RESULT_FIELDS, AnalysisGraph, parse_fields, parse_include
+)
+from backend.app.utils.landmark_array import LandmarkArray
+from backend.app.utils.metric_kernel import MetricKernel
+from backend.app.utils.pose_detector import PoseDetector
+from backend.app.utils.posture_classifier import METRIC_JUDGMENTS, PostureClassifier
+from backend.app.utils.result_serializer import ResultSerializer
+
+class TestAnalysisGraph:
+
+    def setup_method(self):
+        self.landmarks = LandmarkArray.from_dict({
+            'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9},
+            'left_ear': {'x': 0.45, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+            'right_ear': {'x': 0.55, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+            'left_shoulder': {'x': 0.3, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'right_shoulder': {'x': 0.7, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'left_elbow': {'x': 0.25, 'y': 0.35, 'z': 0.0, 'visibility': 0.9},
+            'right_elbow': {'x': 0.75, 'y': 0.35, 'z': 0.0, 'visibility': 0.9},
+            'left_hip': {'x': 0.35, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+            'right_hip': {'x': 0.65, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+        })
+
+    def create_graph(self, is_seated=False):
+        analyzer = Mock()
+        analyzer.pose_detector = Mock(wraps=PoseDetector())
+        analyzer.posture_classifier = Mock(wraps=PostureClassifier())
+        analyzer.metric_kernel = MetricKernel()
+        analyzer._detect_seated_posture.return_value = is_seated
+        analyzer._calculate_enhanced_overall_score.return_value = 80.0
+        return AnalysisGraph(analyzer, self.landmarks, (640, 480))
+
+    def test_parse_include(self):
+        """Test include parsing, including the all-sections default"""
+        assert parse_include(None) is None
+        assert parse_include('') is None
+        assert parse_include('symmetry, suggestions') == {'symmetry', 'suggestions'}
+
+        with pytest.raises(ValueError):
+            parse_include('symmetry,landmark_images')
+
+    def test_full_result_by_default(self):
+        """Test that include=None keeps every section in the result"""
+        result = self.create_graph().to_result()
+
+        assert result.symmetry_scores is not None
+        assert result.validation_results is not None
+        assert result.posture_type is not None
+        assert result.color_judgments is not None
+        assert result.overall_color_judgment is not None
+        assert result.improvement_suggestions is not None
+
+    def test_result_is_serializable(self):
+        """Test that the unvalidated result holds plain containers (picklable, JSON dumpable)"""
+        result = self.create_graph().to_result()
+        shared = {id(judgment) for judgment in METRIC_JUDGMENTS}
+
+        assert result.color_judgments
+        assert all(type(j) is dict and id(j) not in shared for j in result.color_judgments.values())
+        assert type(result.overall_color_judgment) is dict
+        assert pickle.loads(pickle.dumps(result)) == result
+        assert json.loads(json.dumps(result.model_dump(mode='json')))['color_judgments'] == result.color_judgments
+
+    def test_unrequested_sections_are_not_evaluated(self):
+        """Test that classification, judgments and suggestions never run when not requested"""
+        graph = self.create_graph()
+
+        result = graph.to_result(include=set())
+        classifier = graph.analyzer.posture_classifier
+
+        assert result.overall_score == 80.0
+        assert result.posture_type is None
+        assert result.improvement_suggestions is None
+        assert result.validation_results is None
+        classifier.classify_posture_type.assert_not_called()
+        classifier.calculate_color_judgment.assert_not_called()
+        classifier.generate_improvement_suggestions.assert_not_called()
+        graph.analyzer.pose_detector.validate_landmark_consistency.assert_not_called()
+
+    def test_seated_metrics_only_for_seated_posture(self):
+        """Test that seated metrics are computed only when the posture is seated"""
+        standing = self.create_graph(is_seated=False)
+        seated = self.create_graph(is_seated=True)
+
+        standing_result = standing.to_result(include=['additional_metrics'])
+        seated_result = seated.to_result(include=['additional_metrics'])
+
+        assert standing_result.metrics.seated_metrics is None
+        assert 'seated_metrics' not in vars(standing.kernel_result)
+        assert seated_result.metrics.seated_metrics is not None
+
+    def test_nodes_are_evaluated_once(self):
+        """Test that shared nodes are cached across dependent sections"""
+        graph = self.create_graph()
+
+        graph.to_result(include=ANALYSIS_SECTIONS)
+
+        graph.analyzer.pose_detector.detect_pose_orientation.assert_called_once()
+        graph.analyzer.posture_classifier.calculate_color_judgment.assert_called_once()
+
+    def test_parse_fields(self):
+        """Test fields / exclude parsing"""
+        assert parse_fields(None, None) is None
+        assert parse_fields('overall_score, metrics') == {'overall_score', 'metrics'}
+        assert parse_fields(None, 'landmarks') == set(RESULT_FIELDS) - {'landmarks'}
+        assert parse_fields('metrics,landmarks', 'landmarks') == {'metrics'}
+
+        with pytest.raises(ValueError):
+            parse_fields('overall_score,landmark_images')
+        with pytest.raises(ValueError):
+            parse_fields(None, 'suggestions')
+
+    def test_field_selection_limits_evaluation(self):
+        """Test that unselected fields are neither evaluated nor serialized"""
+        graph = self.create_graph()
+        fields = parse_fields('overall_score,posture_type,metrics')
+
+        result = graph.to_result(fields=fields)
+        payload = json.loads(ResultSerializer().serialize(result, fields=fields))
+        classifier = graph.analyzer.posture_classifier
+
+        assert set(payload) == {'overall_score', 'posture_type', 'metrics'}
+        assert payload['posture_type'] == graph.posture_type
+        assert result.landmarks is None
+        classifier.classify_posture_type.assert_called_once()
+        classifier.calculate_color_judgment.assert_not_called()
+        classifier.generate_improvement_suggestions.assert_not_called()
+        graph.analyzer.pose_detector.validate_landmark_consistency.assert_not_called()
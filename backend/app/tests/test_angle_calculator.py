@@ -1,6 +1,8 @@
 import pytest
 import math
-from backend.app.utils.angle_calculator import AngleCalculator
+import numpy as np
+from backend.app.utils.angle_calculator import AngleCalculator, BatchAngleCalculator
+from backend.app.utils.landmark_array import LANDMARK_INDEX, NUM_LANDMARKS
 
 class TestAngleCalculator:
     
@@ -179,4 +181,104 @@ class TestAngleCalculator:
     def test_pelvic_tilt_scenarios(self, left_hip, right_hip, expected_range):
         """Test pelvic tilt calculation with various scenarios"""
         tilt = self.calc.calculate_pelvic_tilt(left_hip, right_hip)
-        assert expected_range[0] <= tilt <= expected_range[1]
\ No newline at end of file
+        assert expected_range[0] <= tilt <= expected_range[1]
+
+class TestBatchAngleCalculator:
+    
+    def setup_method(self):
+        self.calc = AngleCalculator()
+        self.batch_calc = BatchAngleCalculator()
+        rng = np.random.default_rng(0)
+        self.poses = rng.uniform(0.1, 0.9, size=(16, NUM_LANDMARKS, 3))
+    
+    def points(self, pose, *names):
+        """Pick named landmarks of one pose as scalar-API dicts"""
+        return [{'x': pose[LANDMARK_INDEX[name], 0], 'y': pose[LANDMARK_INDEX[name], 1]} for name in names]
+    
+    def test_primitives_match_scalar(self):
+        """Test vectorized angle/distance/midpoint against the scalar versions"""
+        p1, p2, p3 = self.poses[:, 0, :2], self.poses[:, 1, :2], self.poses[:, 2, :2]
+        
+        angles = self.batch_calc.angle(p1, p2, p3)
+        distances = self.batch_calc.distance(p1, p2)
+        midpoints = self.batch_calc.midpoint(p1, p2)
+        
+        for i, pose in enumerate(self.poses):
+            a, b, c = ({'x': pose[j, 0], 'y': pose[j, 1]} for j in range(3))
+            assert angles[i] == pytest.approx(self.calc.calculate_angle(a, b, c))
+            assert distances[i] == pytest.approx(self.calc.calculate_distance(a, b))
+            assert midpoints[i, 0] == pytest.approx(self.calc.calculate_midpoint(a, b)['x'])
+    
+    def test_standing_metrics_match_scalar(self):
+        """Test every standing metric against the per-pose implementation"""
+        image_size = (640, 480)
+        results = self.batch_calc.calculate_all(self.poses, image_size)
+        
+        for i, pose in enumerate(self.poses):
+            ls, rs, lh, rh, nose, le, re, lel, rel = self.points(
+                pose, 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+                'nose', 'left_ear', 'right_ear', 'left_elbow', 'right_elbow'
+            )
+            expected = {
+                'pelvic_tilt': self.calc.calculate_pelvic_tilt(lh, rh),
+                'thoracic_kyphosis': self.calc.calculate_thoracic_kyphosis(ls, rs, lh, rh),
+                'cervical_lordosis': self.calc.calculate_cervical_lordosis(nose, le, re, ls, rs),
+                'shoulder_height_difference': self.calc.calculate_shoulder_height_difference(ls, rs, image_size),
+                'head_forward_posture': self.calc.calculate_head_forward_posture(nose, le, re, ls, rs),
+                'lumbar_lordosis': self.calc.calculate_lumbar_lordosis(ls, rs, lh, rh),
+                'scapular_protraction': self.calc.calculate_scapular_protraction(ls, rs, lel, rel),
+                'trunk_lateral_deviation': self.calc.calculate_trunk_lateral_deviation(nose, lh, rh),
+            }
+            for name, value in expected.items():
+                assert results[name][i] == pytest.approx(value), name
+    
+    def test_lower_limb_metrics_match_scalar(self):
+        """Test knee and heel metrics against the per-pose implementation"""
+        knee = self.batch_calc.calculate_knee_valgus_varus_enhanced(self.poses)
+        heel = self.batch_calc.calculate_heel_inclination(self.poses)
+        
+        for i, pose in enumerate(self.poses):
+            legs = self.points(pose, 'left_hip', 'left_knee', 'left_ankle',
+                               'right_hip', 'right_knee', 'right_ankle')
+            feet = self.points(pose, 'left_heel', 'left_ankle', 'left_foot_index',
+                               'right_heel', 'right_ankle', 'right_foot_index')
+            
+            for key, value in self.calc.calculate_knee_valgus_varus_enhanced(*legs).items():
+                if key.endswith('_type'):
+                    assert knee[key][i] == value
+                else:
+                    assert knee[key][i] == pytest.approx(value), key
+            for key, value in self.calc.calculate_heel_inclination(*feet).items():
+                assert heel[key][i] == pytest.approx(value), key
+    
+    def test_seated_metrics_match_scalar(self):
+        """Test seated metrics, including the missing-ear fallback"""
+        poses = self.poses.copy()
+        poses[0, [LANDMARK_INDEX['left_ear'], LANDMARK_INDEX['right_ear']]] = np.nan
+        
+        results = self.batch_calc.calculate_seated_posture_metrics(poses)
+        
+        for i, pose in enumerate(poses):
+            landmarks = {
+                name: {'x': pose[idx, 0], 'y': pose[idx, 1], 'z': pose[idx, 2]}
+                for name, idx in LANDMARK_INDEX.items() if not np.isnan(pose[idx, 0])
+            }
+            for key, value in self.calc.calculate_seated_posture_metrics(landmarks).items():
+                assert results[key][i] == pytest.approx(value, rel=1e-5), key
+    
+    def test_missing_landmarks_give_nan(self):
+        """Test that undetected landmarks propagate as NaN instead of raising"""
+        poses = self.poses.copy()
+        poses[3, LANDMARK_INDEX['left_hip']] = np.nan
+        
+        tilt = self.batch_calc.calculate_pelvic_tilt(poses)
+        
+        assert np.isnan(tilt[3])
+        assert not np.isnan(np.delete(tilt, 3)).any()
+    
+    def test_single_pose_and_invalid_shape(self):
+        """Test that a single (33, 3) pose is promoted and bad shapes are rejected"""
+        assert self.batch_calc.calculate_pelvic_tilt(self.poses[0]).shape == (1,)
+        
+        with pytest.raises(ValueError):
+            self.batch_calc.calculate_pelvic_tilt(np.zeros((4, 17, 3)))
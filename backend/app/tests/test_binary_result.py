@@ -0,0 +1,131 @@
+import json
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.analysis_graph import AnalysisGraph
+from backend.app.utils.binary_result import BINARY_MEDIA_TYPE, decode_result, encode_result
+from backend.app.utils.landmark_array import LANDMARK_NAMES, LandmarkArray
+from backend.app.utils.metric_kernel import MetricKernel
+from backend.app.utils.pose_detector import PoseDetector
+from backend.app.utils.posture_classifier import PostureClassifier
+from backend.app.utils.result_serializer import (
+    JSON_MEDIA_TYPE, ResultSerializer, encode_json, negotiate_media_type, result_payload
+)
+
+class TestBinaryResult:
+
+    def create_result(self, is_seated=False):
+        rng = np.random.default_rng(1)
+        landmarks = LandmarkArray.from_dict({
+            name: {'x': rng.random(), 'y': rng.random(), 'z': rng.random() - 0.5, 'visibility': rng.random()}
+            for name in LANDMARK_NAMES
+        })
+        analyzer = Mock()
+        analyzer.pose_detector = PoseDetector()
+        analyzer.posture_classifier = PostureClassifier()
+        analyzer.metric_kernel = MetricKernel()
+        analyzer._detect_seated_posture.return_value = is_seated
+        analyzer._calculate_enhanced_overall_score.return_value = 80.0
+        return AnalysisGraph(analyzer, landmarks, (640, 480)).to_result()
+
+    def assert_equivalent(self, expected, actual, path=''):
+        """Compare decoded values within float32 / quantization tolerance"""
+        if isinstance(expected, dict):
+            assert set(expected) == set(actual), path
+            for key in expected:
+                self.assert_equivalent(expected[key], actual[key], f"{path}.{key}")
+        elif isinstance(expected, list):
+            assert len(expected) == len(actual), path
+            for i, (e, a) in enumerate(zip(expected, actual)):
+                self.assert_equivalent(e, a, f"{path}[{i}]")
+        elif isinstance(expected, float):
+            tolerance = 0.5 / 254 if path.endswith('visibility') else 1e-4 * max(1.0, abs(expected))
+            assert actual == pytest.approx(expected, abs=tolerance), path
+        else:
+            assert expected == actual, path
+
+    @pytest.mark.parametrize("is_seated", [False, True])
+    def test_round_trip(self, is_seated):
+        """Test that decoding reproduces the JSON document within quantization tolerance"""
+        result = self.create_result(is_seated)
+        data = encode_result(result)
+        decoded = decode_result(data)
+
+        expected = json.loads(encode_json(result_payload(result)))
+        actual = json.loads(encode_json(decoded))
+        self.assert_equivalent(expected, actual)
+        assert len(data) < len(encode_json(result_payload(result, 'compact'))) / 5
+        assert PostureAnalysisResult.model_validate(decoded).is_seated_posture == is_seated
+
+    def test_sparse_and_custom_sections(self):
+        """Test omitted sections and values outside the code tables"""
+        result = PostureAnalysisResult(
+            landmarks={'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0}},
+            metrics=PostureMetrics(
+                pelvic_tilt=10.0, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+                shoulder_height_difference=1.0, head_forward_posture=2.0, lumbar_lordosis=40.0,
+                scapular_protraction=1.5, trunk_lateral_deviation=0.5, seated_metrics={'custom_metric': 1.5},
+                registry_metrics={'hip_width': 21.5}
+            ),
+            overall_score=78.5, image_width=640, image_height=480, confidence=0.85,
+            posture_type={'primary_type': 'custom', 'classifications': []},
+            improvement_suggestions=[{'title': 'カスタム提案', 'exercises': ['a']}],
+        )
+
+        decoded = decode_result(encode_result(result), landmark_format='array')
+
+        assert isinstance(decoded['landmarks'], LandmarkArray) and list(decoded['landmarks']) == ['nose']
+        assert 'visibility' not in decoded['landmarks']['nose']
+        assert decoded['metrics']['seated_metrics'] == {'custom_metric': 1.5}
+        assert decoded['metrics']['registry_metrics'] == {'hip_width': 21.5}
+        assert decoded['posture_type'] == {'primary_type': 'custom', 'classifications': []}
+        assert decoded['improvement_suggestions'] == [{'title': 'カスタム提案', 'exercises': ['a']}]
+        assert decoded['symmetry_scores'] is None and decoded['color_judgments'] is None
+        assert decoded['analysis_timestamp'] == result.analysis_timestamp
+        with pytest.raises(ValueError):
+            decode_result(b'JSON' + encode_result(result)[4:])
+
+    def test_excluded_landmarks_differ_from_none_detected(self):
+        """Test that landmarks left out by fields decode as None, not as an empty set"""
+        result = self.create_result()
+        omitted = result.model_copy(update={'landmarks': None})
+
+        assert decode_result(encode_result(omitted))['landmarks'] is None
+        assert decode_result(encode_result(result.model_copy(update={'landmarks': {}})))['landmarks'] == {}
+        assert len(encode_result(omitted)) < len(encode_result(result))
+
+    def test_large_collections(self):
+        """Test lists and maps beyond 255 entries"""
+        result = self.create_result()
+        seated = {f'custom_{i}': float(i) for i in range(300)}
+        suggestions = [{'title': f'提案{i}'} for i in range(300)]
+        result.metrics.seated_metrics = seated
+        result.improvement_suggestions = suggestions
+
+        decoded = decode_result(encode_result(result))
+
+        assert decoded['metrics']['seated_metrics'] == seated
+        assert decoded['improvement_suggestions'] == suggestions
+
+    @pytest.mark.parametrize("accept, expected", [
+        (None, JSON_MEDIA_TYPE),
+        ('*/*', JSON_MEDIA_TYPE),
+        (BINARY_MEDIA_TYPE, BINARY_MEDIA_TYPE),
+        (f'application/json;q=0.5, {BINARY_MEDIA_TYPE}', BINARY_MEDIA_TYPE),
+        (f'{BINARY_MEDIA_TYPE};q=0.2, application/json', JSON_MEDIA_TYPE),
+        (f'{BINARY_MEDIA_TYPE};q=0', JSON_MEDIA_TYPE),
+    ])
+    def test_negotiation(self, accept, expected):
+        """Test Accept header negotiation between JSON and the binary format"""
+        assert negotiate_media_type(accept) == expected
+
+    def test_serializer_records_binary_stats(self):
+        """Test that binary responses are measured separately"""
+        serializer = ResultSerializer()
+        body = serializer.serialize(self.create_result(), media_type=BINARY_MEDIA_TYPE)
+
+        summary = serializer.summary()
+        assert summary['count'] == 0
+        assert summary['binary']['count'] == 1 and summary['binary']['p50_bytes'] == len(body)
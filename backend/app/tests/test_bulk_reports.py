@@ -0,0 +1,108 @@
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import backend.app.api.reports as reports_api
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.bulk_reports import BulkReportManager
+from backend.app.services.report_pool import ReportPool
+from backend.app.services.result_store import ResultStore
+
+def _result(score: float) -> PostureAnalysisResult:
+    return PostureAnalysisResult(
+        landmarks={'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9}},
+        metrics=PostureMetrics(
+            pelvic_tilt=20.0, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+            shoulder_height_difference=2.0, head_forward_posture=3.0, lumbar_lordosis=40.0,
+            scapular_protraction=1.0, trunk_lateral_deviation=0.5
+        ),
+        overall_score=score,
+        image_width=640,
+        image_height=480,
+        confidence=0.9
+    )
+
+class TestBulkReports:
+
+    @pytest.fixture(autouse=True)
+    def setup_pool(self, tmp_path):
+        self.pool = ReportPool(max_workers=1, reports_dir=str(tmp_path))
+        yield
+        self.pool.shutdown()
+
+    async def _download(self, manager: BulkReportManager, job) -> zipfile.ZipFile:
+        content = b''.join([chunk async for chunk in manager.stream_zip(job)])
+        return zipfile.ZipFile(io.BytesIO(content))
+
+    @pytest.mark.asyncio
+    async def test_bulk_job_renders_all_reports(self):
+        """Every analysis ends up in the zip, in request order"""
+        manager = BulkReportManager(self.pool)
+        names = ['001_a.pdf', '002_b.pdf', '003_c.pdf']
+        job = manager.submit([(name, _result(60.0 + i)) for i, name in enumerate(names)])
+
+        assert manager.get(job.id) is job
+        archive = await self._download(manager, job)
+        await job.task
+
+        assert archive.namelist() == names
+        assert all(archive.read(name).startswith(b'%PDF') for name in names)
+
+        status = job.status()
+        assert status['status'] == 'done'
+        assert status['completed'] == 3
+        assert status['progress'] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_failed_reports_are_listed(self):
+        """A failing render does not abort the job and is recorded in errors.json"""
+        manager = BulkReportManager(self.pool)
+        render_pdf = self.pool.render_pdf
+
+        async def flaky_render(analysis_result):
+            if analysis_result.overall_score == 0:
+                raise ValueError("broken analysis")
+            return await render_pdf(analysis_result)
+
+        self.pool.render_pdf = flaky_render
+        job = manager.submit([('001_ok.pdf', _result(70.0)), ('002_bad.pdf', _result(0.0))])
+        archive = await self._download(manager, job)
+
+        assert archive.namelist() == ['001_ok.pdf', 'errors.json']
+        assert json.loads(archive.read('errors.json')) == {'002_bad.pdf': 'broken analysis'}
+        assert job.status()['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_old_finished_jobs_are_evicted(self):
+        """Only max_jobs jobs are kept once earlier ones are done"""
+        manager = BulkReportManager(self.pool, max_jobs=1)
+        first = manager.submit([('001_a.pdf', _result(70.0))])
+        await first.task
+        second = manager.submit([('001_b.pdf', _result(70.0))])
+        await second.task
+
+        assert manager.get(first.id) is None
+        assert manager.get(second.id) is second
+
+    def test_bulk_request_by_analysis_id(self, monkeypatch, graph_result):
+        """Results stored by /api/analyze are rendered when requested by analysis_id"""
+        store = ResultStore()
+        monkeypatch.setattr(reports_api, 'result_store', store)
+        monkeypatch.setattr(reports_api, 'bulk_reports', BulkReportManager(self.pool))
+        app = FastAPI()
+        app.include_router(reports_api.router, prefix="/api/reports")
+        analysis_ids = [store.put(graph_result), store.put(graph_result)]
+
+        with TestClient(app) as client:
+            job = client.post('/api/reports/bulk', json={'analysis_ids': analysis_ids}).json()
+            download = client.get(f"/api/reports/bulk/{job['job_id']}/download")
+            status = client.get(f"/api/reports/bulk/{job['job_id']}").json()
+
+        archive = zipfile.ZipFile(io.BytesIO(download.content))
+        assert len(archive.namelist()) == 2
+        assert all(archive.read(name).startswith(b'%PDF') for name in archive.namelist())
+        assert status['completed'] == 2 and status['failed'] == 0
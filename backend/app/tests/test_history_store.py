@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.history_store import HistoryStore
+
+def _result(timestamp: float, score: float, pelvic_tilt: float = 10.0) -> PostureAnalysisResult:
+    return PostureAnalysisResult(
+        landmarks={'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9}},
+        metrics=PostureMetrics(
+            pelvic_tilt=pelvic_tilt, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+            shoulder_height_difference=2.0, head_forward_posture=3.0, lumbar_lordosis=40.0,
+            scapular_protraction=1.0, trunk_lateral_deviation=0.5
+        ),
+        overall_score=score,
+        image_width=640,
+        image_height=480,
+        confidence=0.9,
+        analysis_timestamp=datetime.fromtimestamp(timestamp)
+    )
+
+class TestHistoryStore:
+
+    @pytest.fixture(autouse=True)
+    def setup_store(self, tmp_path):
+        self.store = HistoryStore(str(tmp_path / 'history.db'), pool_size=2)
+        yield
+        self.store.close()
+
+    def test_records_keep_metrics_only(self):
+        """Records hold scores and metric values but no landmarks"""
+        analysis_id = self.store.add('alice', _result(1000.0, 70.0), analysis_id='a1')
+
+        records, _ = self.store.list('alice')
+        assert analysis_id == 'a1'
+        assert records[0]['id'] == 'a1'
+        assert records[0]['overall_score'] == 70.0
+        assert records[0]['metrics']['pelvic_tilt'] == 10.0
+        assert 'landmarks' not in records[0]
+
+        # 記録済みの ID は上書きしない
+        assert self.store.add('alice', _result(1001.0, 20.0), analysis_id='a1') is None
+        assert self.store.list('alice')[0][0]['overall_score'] == 70.0
+
+    def test_pagination_and_range(self):
+        """Users are isolated, pages follow the cursor and since/until bound the range"""
+        for i in range(7):
+            self.store.add('alice', _result(1000.0 + i, 60.0 + i), analysis_id=f'a{i}')
+        self.store.add('bob', _result(1003.0, 90.0), analysis_id='b0')
+
+        ids, cursor = [], None
+        while True:
+            page, cursor = self.store.list('alice', limit=3, cursor=cursor)
+            ids.extend(record['id'] for record in page)
+            if cursor is None:
+                break
+
+        assert ids == ['a6', 'a5', 'a4', 'a3', 'a2', 'a1', 'a0']
+        assert self.store.count('alice') == 7
+        assert self.store.count('alice', since=1002.0, until=1005.0) == 3
+        assert [r['id'] for r in self.store.list('alice', since=1002.0, until=1005.0)[0]] == ['a4', 'a3', 'a2']
+        assert self.store.count('bob') == 1
+
+    def test_trend_series(self):
+        """Series are ordered oldest first with one value per analysis"""
+        for i, tilt in enumerate([8.0, 12.0, 16.0]):
+            self.store.add('alice', _result(1000.0 + i, 50.0 + 10 * i, pelvic_tilt=tilt))
+
+        series = self.store.series('alice', metrics=['pelvic_tilt'])
+
+        assert series['timestamps'] == [1000.0, 1001.0, 1002.0]
+        assert series['trend_data'] == {'overall_score': [50.0, 60.0, 70.0], 'pelvic_tilt': [8.0, 12.0, 16.0]}
+        assert self.store.last_analysis('alice') == datetime.fromtimestamp(1002.0)
+        assert self.store.last_analysis('nobody') is None
+
+    def test_concurrent_access(self):
+        """Pooled connections serve concurrent writers and readers"""
+        def work(i):
+            self.store.add(f'user{i % 3}', _result(1000.0 + i, 50.0))
+            return self.store.count(f'user{i % 3}')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(work, range(30)))
+
+        assert sum(self.store.count(f'user{i}') for i in range(3)) == 30
+        assert self.store.delete_user('user0') == 10
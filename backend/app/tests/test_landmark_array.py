@@ -0,0 +1,147 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from backend.app.utils.landmark_array import (
+    LandmarkArray, LANDMARK_NAMES, LANDMARK_INDEX, NUM_LANDMARKS, VISIBILITY
+)
+from backend.app.utils.pose_detector import PoseDetector
+from backend.app.utils.pose_validation import PoseValidation
+
+class TestLandmarkArray:
+
+    def create_landmark_dict(self):
+        """Create dict-of-dicts landmarks for a standing frontal pose"""
+        return {
+            'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9},
+            'left_ear': {'x': 0.45, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+            'right_ear': {'x': 0.55, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+            'left_shoulder': {'x': 0.3, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'right_shoulder': {'x': 0.7, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'left_hip': {'x': 0.35, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+            'right_hip': {'x': 0.65, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+            'left_knee': {'x': 0.37, 'y': 0.75, 'z': 0.0, 'visibility': 0.85},
+            'right_knee': {'x': 0.63, 'y': 0.75, 'z': 0.0, 'visibility': 0.85},
+        }
+
+    def create_mock_pose_landmarks(self, count=33):
+        """Create a mock MediaPipe NormalizedLandmarkList"""
+        landmarks = []
+        for i in range(count):
+            landmark = MagicMock()
+            landmark.x = i / 100
+            landmark.y = i / 50
+            landmark.z = 0.0
+            landmark.visibility = 0.9
+            landmarks.append(landmark)
+
+        pose_landmarks = MagicMock()
+        pose_landmarks.landmark = landmarks
+        return pose_landmarks
+
+    def test_from_mediapipe_layout(self):
+        """Test that MediaPipe output is packed into a (33, 4) float32 array"""
+        landmarks = LandmarkArray.from_mediapipe(self.create_mock_pose_landmarks())
+
+        assert landmarks.data.shape == (NUM_LANDMARKS, 4)
+        assert landmarks.data.dtype == np.float32
+        assert len(landmarks) == NUM_LANDMARKS
+        assert landmarks.xy('left_shoulder')[0] == pytest.approx(LANDMARK_INDEX['left_shoulder'] / 100)
+
+    def test_from_mediapipe_partial(self):
+        """Test that missing trailing landmarks are marked as undetected"""
+        landmarks = LandmarkArray.from_mediapipe(self.create_mock_pose_landmarks(count=25))
+
+        assert len(landmarks) == 25
+        assert 'right_hip' in landmarks
+        assert 'left_knee' not in landmarks
+        assert not landmarks.has('left_hip', 'left_knee')
+
+    def test_from_array_is_zero_copy(self):
+        """Test that a float32 (33, 4) array is wrapped without copying"""
+        data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        landmarks = LandmarkArray.from_array(data)
+
+        assert landmarks.data is data
+
+    def test_invalid_shape_rejected(self):
+        """Test that arrays with the wrong layout are rejected"""
+        with pytest.raises(ValueError):
+            LandmarkArray(np.zeros((33, 3), dtype=np.float32))
+
+    def test_dict_round_trip(self):
+        """Test dict -> LandmarkArray -> dict conversion"""
+        source = self.create_landmark_dict()
+        landmarks = LandmarkArray.from_dict(source)
+
+        result = landmarks.to_dict()
+
+        assert set(result.keys()) == set(source.keys())
+        for name, landmark in source.items():
+            for field, value in landmark.items():
+                assert result[name][field] == pytest.approx(value, abs=1e-6)
+
+    def test_mapping_view(self):
+        """Test dict-compatible access used by existing callers"""
+        landmarks = LandmarkArray.from_dict(self.create_landmark_dict())
+
+        assert landmarks['nose']['y'] == pytest.approx(0.1)
+        assert landmarks.get('left_ankle') is None
+        assert 'left_ankle' not in landmarks
+        assert list(landmarks)[0] == 'nose'
+
+        with pytest.raises(KeyError):
+            landmarks['left_ankle']
+
+    def test_missing_visibility_is_omitted(self):
+        """Test that landmarks without visibility keep that shape in the view"""
+        landmarks = LandmarkArray.from_dict({'nose': {'x': 0.5, 'y': 0.1}})
+
+        assert 'visibility' not in landmarks['nose']
+        assert landmarks.visibility('nose') == 0.0
+
+    def test_midpoint(self):
+        """Test midpoint calculation on array rows"""
+        landmarks = LandmarkArray.from_dict(self.create_landmark_dict())
+
+        midpoint = landmarks.midpoint('left_shoulder', 'right_shoulder')
+
+        assert midpoint.dtype == np.float64
+        assert midpoint[0] == pytest.approx(0.5)
+        assert midpoint[1] == pytest.approx(0.25)
+
+    def test_stack(self):
+        """Test stacking several poses into a batch tensor"""
+        landmarks = LandmarkArray.from_dict(self.create_landmark_dict())
+
+        batch = LandmarkArray.stack([landmarks, landmarks, landmarks])
+
+        assert batch.shape == (3, NUM_LANDMARKS, 4)
+
+    def test_detector_accepts_array_and_dict(self):
+        """Test that PoseDetector gives the same answers for both representations"""
+        detector = PoseDetector()
+        source = self.create_landmark_dict()
+        landmarks = LandmarkArray.from_dict(source)
+
+        assert detector.detect_pose_orientation(landmarks) == detector.detect_pose_orientation(source)
+        assert detector.calculate_pose_quality_score(landmarks) == pytest.approx(
+            detector.calculate_pose_quality_score(source)
+        )
+        assert detector.validate_landmark_consistency(landmarks) == detector.validate_landmark_consistency(source)
+        assert detector.calculate_bilateral_symmetry(landmarks) == pytest.approx(
+            detector.calculate_bilateral_symmetry(source)
+        )
+
+    def test_filter_noisy_landmarks_array(self):
+        """Test that noisy rows are masked out of a LandmarkArray"""
+        source = self.create_landmark_dict()
+        source['nose']['visibility'] = 0.1
+        landmarks = LandmarkArray.from_dict(source)
+
+        filtered = PoseValidation.filter_noisy_landmarks(landmarks, min_visibility=0.5)
+
+        assert isinstance(filtered, LandmarkArray)
+        assert 'nose' not in filtered
+        assert 'left_shoulder' in filtered
+        assert 'nose' in landmarks  # Original is untouched
@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+
+from backend.app.utils.angle_calculator import AngleCalculator
+from backend.app.utils.landmark_array import LandmarkArray, LANDMARK_NAMES, NUM_LANDMARKS
+from backend.app.utils.metric_kernel import MetricKernel, POSTURE_METRIC_NAMES
+
+class TestMetricKernel:
+
+    def setup_method(self):
+        self.kernel = MetricKernel()
+        self.calc = AngleCalculator()
+        rng = np.random.default_rng(0)
+        self.poses = rng.uniform(0.1, 0.9, size=(8, NUM_LANDMARKS, 4)).astype(np.float32)
+
+    def create_landmark_dict(self, pose):
+        return {
+            name: {'x': float(row[0]), 'y': float(row[1]), 'z': float(row[2]), 'visibility': float(row[3])}
+            for name, row in zip(LANDMARK_NAMES, pose)
+        }
+
+    def test_orientation_views(self):
+        """Test that each orientation maps to its metric set"""
+        result = self.kernel.evaluate(self.poses, (640, 480))
+
+        assert result.orientation_metrics('sagittal') is result.sagittal
+        assert result.orientation_metrics('posterior') is result.frontal
+        assert result.orientation_metrics('oblique') is result.combined
+        assert result.orientation_metrics('unknown') is result.combined
+
+    def test_combined_reuses_sagittal_and_frontal(self):
+        """Test that combined metrics are assembled from the other two views"""
+        result = self.kernel.evaluate(self.poses, (640, 480))
+
+        np.testing.assert_allclose(
+            result.combined['pelvic_tilt'],
+            (result.sagittal['pelvic_tilt'] + result.frontal['pelvic_tilt']) / 2
+        )
+        np.testing.assert_array_equal(result.combined['thoracic_kyphosis'], result.sagittal['thoracic_kyphosis'])
+        np.testing.assert_array_equal(
+            result.combined['trunk_lateral_deviation'], result.frontal['trunk_lateral_deviation']
+        )
+
+    def test_batch_matches_single_pose(self):
+        """Test that batched evaluation gives the same numbers as pose-by-pose evaluation"""
+        batch = self.kernel.evaluate(self.poses, (640, 480))
+
+        for i, pose in enumerate(self.poses):
+            single = self.kernel.evaluate(LandmarkArray(pose), (640, 480))
+            assert single.posture_metrics('oblique') == batch.posture_metrics('oblique', i)
+            assert single.additional_metrics() == batch.additional_metrics(i)
+
+    def test_additional_metrics_match_angle_calculator(self):
+        """Test knee, heel and seated metrics against AngleCalculator"""
+        for pose in self.poses:
+            landmarks = self.create_landmark_dict(pose)
+            additional = self.kernel.evaluate(landmarks, (1, 1)).additional_metrics()
+
+            knee = self.calc.calculate_knee_valgus_varus_enhanced(
+                landmarks['left_hip'], landmarks['left_knee'], landmarks['left_ankle'],
+                landmarks['right_hip'], landmarks['right_knee'], landmarks['right_ankle']
+            )
+            heel = self.calc.calculate_heel_inclination(
+                landmarks['left_heel'], landmarks['left_ankle'], landmarks['left_foot_index'],
+                landmarks['right_heel'], landmarks['right_ankle'], landmarks['right_foot_index']
+            )
+            seated = self.calc.calculate_seated_posture_metrics(landmarks)
+
+            for expected, actual in ((knee, additional['knee_valgus_varus']),
+                                     (heel, additional['heel_inclination']),
+                                     (seated, additional['seated_metrics'])):
+                assert set(expected) == set(actual)
+                for key, value in expected.items():
+                    assert actual[key] == (value if isinstance(value, str) else pytest.approx(value, rel=1e-6))
+
+    def test_missing_landmarks_use_defaults(self):
+        """Test fallback values when landmarks are not detected"""
+        landmarks = LandmarkArray.from_dict({
+            'nose': {'x': 0.5, 'y': 0.1, 'visibility': 0.9},
+            'left_shoulder': {'x': 0.3, 'y': 0.25, 'visibility': 0.9},
+            'right_shoulder': {'x': 0.7, 'y': 0.25, 'visibility': 0.9},
+            'left_elbow': {'x': 0.2, 'y': 0.4, 'visibility': 0.9},
+            'right_elbow': {'x': 0.8, 'y': 0.4, 'visibility': 0.9},
+            'left_hip': {'x': 0.35, 'y': 0.55, 'visibility': 0.9},
+            'right_hip': {'x': 0.65, 'y': 0.55, 'visibility': 0.9},
+        })
+
+        result = self.kernel.evaluate(landmarks, (640, 480))
+        sagittal = result.posture_metrics('sagittal')
+
+        assert sagittal.cervical_lordosis == 25.0
+        assert sagittal.head_forward_posture == 2.0
+        assert sagittal.lumbar_lordosis == 40.0
+        assert sagittal.scapular_protraction == pytest.approx(7.0)
+        assert set(result.additional_metrics()) == {'seated_metrics'}
+
+    @pytest.mark.parametrize("missing", ['nose', 'left_shoulder', 'right_hip', 'left_elbow'])
+    def test_missing_required_landmarks_raise(self, missing):
+        """Test that metrics without a fallback fail like the dict-based calculation instead of returning NaN"""
+        landmarks = self.create_landmark_dict(self.poses[0])
+        del landmarks[missing]
+        result = self.kernel.evaluate(LandmarkArray.from_dict(landmarks), (640, 480))
+
+        with pytest.raises(KeyError):
+            result.posture_metrics('sagittal')
+        frontal = result.posture_metrics('frontal')
+        assert all(np.isfinite(getattr(frontal, name)) for name in POSTURE_METRIC_NAMES)
+
+    def test_scapular_protraction_default_for_coincident_shoulders(self):
+        """Test that an undefined elbow/shoulder ratio falls back to 0 like the dict-based calculation"""
+        landmarks = self.create_landmark_dict(self.poses[0])
+        landmarks['right_shoulder'] = dict(landmarks['left_shoulder'])
+        metrics = self.kernel.evaluate(LandmarkArray.from_dict(landmarks), (640, 480)).posture_metrics('sagittal')
+
+        assert metrics.scapular_protraction == 0.0
+
+    def test_posture_metrics_are_python_floats(self):
+        """Test that PostureMetrics fields are plain floats for serialization"""
+        metrics = self.kernel.evaluate(LandmarkArray(self.poses[0]), (640, 480)).posture_metrics('sagittal')
+
+        for name in POSTURE_METRIC_NAMES:
+            assert type(getattr(metrics, name)) is float
@@ -0,0 +1,118 @@
+import pytest
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureMetrics
+from backend.app.services import report_generator
+from backend.app.services.report_generator import ReportGenerator
+from backend.app.utils.angle_calculator import AngleCalculator
+from backend.app.utils.landmark_array import LANDMARK_INDEX, NUM_LANDMARKS
+from backend.app.utils.metric_kernel import MetricKernel
+from backend.app.utils.metric_registry import (
+    CompiledMetricRegistry, MetricDefinition, METRIC_REGISTRY, metric_value
+)
+from backend.app.utils.posture_classifier import PostureClassifier
+from backend.app.utils.scoring_engine import ScoringEngine, WeightProfile
+
+class TestMetricRegistry:
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.poses = rng.uniform(0.1, 0.9, size=(6, NUM_LANDMARKS, 4))
+
+    def test_core_metrics_match_posture_model(self):
+        """Test that core registry metrics are exactly the PostureMetrics base fields"""
+        core_names = list(METRIC_REGISTRY.core_names)
+
+        assert core_names == list(PostureMetrics.model_fields)[:len(core_names)]
+
+    def test_core_ranges_match_reference_values(self):
+        """Test that registry normal ranges agree with the configured reference values"""
+        reference = settings.REFERENCE_VALUES
+
+        for name in METRIC_REGISTRY.core_names:
+            key = 'shoulder_height_diff' if name == 'shoulder_height_difference' else name
+            assert list(METRIC_REGISTRY.by_name[name].normal_range) == reference[key]['normal']
+
+    def test_evaluate_shape_and_defaults(self):
+        """Test batched evaluation and default values for undetected landmarks"""
+        poses = self.poses.copy()
+        poses[1, LANDMARK_INDEX['nose']] = np.nan
+
+        values = METRIC_REGISTRY.evaluate(poses)
+
+        assert values.shape == (len(poses), len(METRIC_REGISTRY))
+        assert values[1, METRIC_REGISTRY.index['thoracic_kyphosis']] == 35.0
+        assert values[1, METRIC_REGISTRY.index['head_forward_posture']] == 2.0
+        assert np.isnan(values[1, METRIC_REGISTRY.index['trunk_lateral_deviation']])
+        assert not np.isnan(values[0]).any()
+
+    def test_custom_metric_definition(self):
+        """Test that a new metric only needs a declaration to be evaluated in batch"""
+        registry = CompiledMetricRegistry([
+            MetricDefinition(
+                name='left_elbow_angle', label='左肘角度', short_label='左肘',
+                op='angle', points=('left_shoulder', 'left_elbow', 'left_wrist'),
+                clamp=(0, 170), normal_range=(150, 180)
+            ),
+            MetricDefinition(
+                name='hip_width', label='骨盤幅', short_label='骨盤幅',
+                op='offset', points=('left_hip', 'right_hip'), scale=100.0,
+                normal_range=(10, 30), unit='cm'
+            ),
+        ])
+        calc = AngleCalculator()
+
+        values = registry.evaluate(self.poses)
+
+        for i, pose in enumerate(self.poses):
+            point = lambda name: {'x': pose[LANDMARK_INDEX[name], 0], 'y': pose[LANDMARK_INDEX[name], 1]}
+            angle = calc.calculate_angle(point('left_shoulder'), point('left_elbow'), point('left_wrist'))
+            assert values[i, 0] == pytest.approx(min(170, angle))
+            assert values[i, 1] == pytest.approx(abs(point('left_hip')['x'] - point('right_hip')['x']) * 100)
+
+    def test_extended_metric_reaches_judgment_scoring_and_reports(self, monkeypatch):
+        """Test that a non-core definition is carried in registry_metrics and judged, scored and reported"""
+        hip_width = MetricDefinition(
+            name='hip_width', label='骨盤幅', short_label='骨盤幅',
+            op='offset', points=('left_hip', 'right_hip'), scale=100.0,
+            normal_range=(10, 30), unit='cm', in_report=True
+        )
+        registry = CompiledMetricRegistry(METRIC_REGISTRY.definitions + (hip_width,))
+        pose = self.poses[0].copy()
+        pose[LANDMARK_INDEX['left_hip'], 0], pose[LANDMARK_INDEX['right_hip'], 0] = 0.35, 0.75
+
+        metrics = MetricKernel(registry).evaluate(pose, (640, 480)).posture_metrics('sagittal')
+        assert metrics.registry_metrics == {'hip_width': pytest.approx(40.0)}
+        assert metric_value(metrics, 'hip_width') == metrics.registry_metrics['hip_width']
+
+        judgments = PostureClassifier(registry).calculate_color_judgment(metrics)
+        assert judgments['hip_width']['status'] == 'moderate_deviation'
+
+        profile = WeightProfile('hips', weights={'hip_width': 1.0})
+        engine = ScoringEngine(profile, registry=registry)
+        assert engine.score_metrics(metrics) == pytest.approx(100.0 - 10.0 * profile.penalty_per_unit)
+
+        monkeypatch.setattr(report_generator, 'METRIC_REGISTRY', registry)
+        table = ReportGenerator()._create_metrics_table(metrics)
+        assert ['骨盤幅', '40.0cm', '10-30cm'] in [row[:3] for row in table._cellvalues]
+
+    def test_core_metrics_have_no_registry_carrier(self):
+        """Test that the default registry leaves registry_metrics unset"""
+        metrics = MetricKernel().evaluate(self.poses[0], (640, 480)).posture_metrics('sagittal')
+
+        assert METRIC_REGISTRY.extended_names == ()
+        assert metrics.registry_metrics is None
+
+    @pytest.mark.parametrize("kwargs", [
+        {'op': 'curvature', 'points': ('nose', 'left_hip')},
+        {'op': 'angle', 'points': ('nose', 'left_hip')},
+    ])
+    def test_invalid_definitions_rejected(self, kwargs):
+        """Test that unknown operations and wrong point counts fail at compile time"""
+        with pytest.raises(ValueError):
+            CompiledMetricRegistry([
+                MetricDefinition(name='broken', label='broken', short_label='broken',
+                                 normal_range=(0, 1), **kwargs)
+            ])
+
@@ -5,8 +5,10 @@ import numpy as np
 from PIL import Image
 import io
 
+from backend.app.services.analysis_graph import AnalysisGraph
 from backend.app.services.pose_analyzer import PoseAnalyzer
 from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.utils.landmark_array import LandmarkArray
 
 class TestPoseAnalyzer:
     
@@ -142,7 +144,9 @@ class TestPoseAnalyzer:
         landmarks = self.create_mock_landmarks()
         image_size = (640, 480)
         
-        metrics = self.analyzer._calculate_posture_metrics(landmarks, image_size)
+        metrics = self.analyzer._calculate_enhanced_posture_metrics(
+            LandmarkArray.coerce(landmarks), image_size, 'front'
+        )
         
         # Verify metrics structure
         assert isinstance(metrics, PostureMetrics)
@@ -199,24 +203,47 @@ class TestPoseAnalyzer:
     
     def test_score_metric(self):
         """Test individual metric scoring"""
+        scoring_engine = self.analyzer.scoring_engine
         # Test metric within normal range
         normal_value = 12.0
         normal_range = [5.0, 15.0]
-        normal_score = self.analyzer._score_metric(normal_value, normal_range)
+        normal_score = scoring_engine.metric_scores(normal_value, *normal_range)
         assert normal_score == 100.0
         
         # Test metric outside normal range (too high)
         high_value = 25.0
-        high_score = self.analyzer._score_metric(high_value, normal_range)
+        high_score = scoring_engine.metric_scores(high_value, *normal_range)
         assert high_score < 100.0
         assert high_score >= 0.0
         
         # Test metric outside normal range (too low)
         low_value = 0.0
-        low_score = self.analyzer._score_metric(low_value, normal_range)
+        low_score = scoring_engine.metric_scores(low_value, *normal_range)
         assert low_score < 100.0
         assert low_score >= 0.0
     
+    @pytest.mark.parametrize("hidden", [(), ('left_ankle', 'right_ankle')])
+    def test_standing_pose_is_not_seated(self, hidden):
+        """A standing pose is never detected or classified as seated, even with the ankles out of frame"""
+        landmarks = self.create_mock_landmarks()
+        for name in hidden:
+            landmarks[name]['visibility'] = 0.1
+        landmarks = LandmarkArray.coerce(landmarks)
+        
+        assert self.analyzer._detect_seated_posture(landmarks) is False
+        
+        result = AnalysisGraph(self.analyzer, landmarks, (640, 480)).to_result()
+        assert result.is_seated_posture is False
+        assert not result.posture_type['primary_type'].startswith('seated')
+    
+    def test_seated_pose_is_detected(self):
+        """Knees level with the hips (thighs near horizontal) are detected as seated"""
+        landmarks = self.create_mock_landmarks()
+        landmarks['left_knee'].update(x=0.25, y=0.58)
+        landmarks['right_knee'].update(x=0.75, y=0.58)
+        
+        assert self.analyzer._detect_seated_posture(LandmarkArray.coerce(landmarks)) is True
+    
     def test_calculate_confidence(self):
         """Test confidence calculation"""
         # Create mock pose landmarks with varying visibility
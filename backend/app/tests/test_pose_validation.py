@@ -1,6 +1,8 @@
 import pytest
 import numpy as np
-from backend.app.utils.pose_validation import PoseValidation
+from backend.app.utils.landmark_array import LandmarkArray, NUM_LANDMARKS
+from backend.app.utils.pose_detector import ORIENTATION_CODES, SYMMETRY_PAIRS, VALIDATION_CHECKS, PoseDetector
+from backend.app.utils.pose_validation import CONSISTENCY_ISSUES, QUALITY_COLUMNS, PoseValidation
 
 class TestPoseValidation:
     
@@ -248,4 +250,68 @@ class TestPoseValidation:
             'left_hip': {'x': 0, 'y': 0},  # Same position
         }
         scale = PoseValidation.estimate_body_scale(extreme_landmarks)
-        # Should handle division by zero gracefully
\ No newline at end of file
+        # Should handle division by zero gracefully
+
+class TestBatchPoseChecks:
+
+    def setup_method(self):
+        self.detector = PoseDetector()
+        rng = np.random.default_rng(0)
+        self.poses = rng.uniform(0.0, 1.0, size=(40, NUM_LANDMARKS, 4)).astype(np.float32)
+        # Drop a few landmarks per pose so that unavailable checks are exercised
+        for i, pose in enumerate(self.poses):
+            pose[rng.choice(NUM_LANDMARKS, size=i % 6, replace=False)] = np.nan
+        self.landmarks = [LandmarkArray(pose) for pose in self.poses]
+
+    def test_detector_batch_matches_single_pose(self):
+        """Test batch orientation, quality, validation and symmetry against the per-pose methods"""
+        codes = self.detector.detect_pose_orientation_batch(self.poses)
+        quality = self.detector.calculate_pose_quality_score_batch(self.poses)
+        checked, passed = self.detector.validate_landmark_consistency_batch(self.poses)
+        symmetry = self.detector.calculate_bilateral_symmetry_batch(self.poses)
+
+        for i, landmarks in enumerate(self.landmarks):
+            assert ORIENTATION_CODES[codes[i]] == self.detector.detect_pose_orientation(landmarks)
+            assert quality[i] == pytest.approx(self.detector.calculate_pose_quality_score(landmarks))
+
+            validation = self.detector.validate_landmark_consistency(landmarks)
+            for bit, name in enumerate(VALIDATION_CHECKS):
+                assert bool(checked[i] >> bit & 1) == (name in validation)
+                if name in validation:
+                    assert bool(passed[i] >> bit & 1) == validation[name]
+
+            scores = self.detector.calculate_bilateral_symmetry(landmarks)
+            for j, (left, right) in enumerate(SYMMETRY_PAIRS):
+                key = f"{left}_{right}_symmetry"
+                if key in scores:
+                    assert symmetry[i, j] == pytest.approx(scores[key])
+                else:
+                    assert np.isnan(symmetry[i, j])
+
+    def test_validation_batch_matches_single_pose(self):
+        """Test batch quality, consistency and filtering against the per-pose methods"""
+        quality = PoseValidation.check_pose_quality_batch(self.poses)
+        issues = PoseValidation.check_measurement_consistency_batch(self.poses)
+        filtered = PoseValidation.filter_noisy_landmarks_batch(self.poses, min_visibility=0.4)
+
+        for i, landmarks in enumerate(self.landmarks):
+            expected = PoseValidation.check_pose_quality(landmarks)
+            for j, name in enumerate(QUALITY_COLUMNS):
+                if name in expected:
+                    assert quality[i, j] == pytest.approx(expected[name])
+                else:
+                    assert np.isnan(quality[i, j])
+
+            expected_issues = PoseValidation.check_measurement_consistency(landmarks.to_dict())
+            assert [msg for bit, msg in enumerate(CONSISTENCY_ISSUES) if issues[i] >> bit & 1] == expected_issues
+
+            single = PoseValidation.filter_noisy_landmarks(landmarks, min_visibility=0.4)
+            np.testing.assert_array_equal(filtered[i], single.data)
+
+    def test_batch_accepts_single_pose_and_rejects_bad_shape(self):
+        """Test that a single pose is promoted to a batch and malformed tensors are rejected"""
+        assert self.detector.detect_pose_orientation_batch(self.landmarks[0]).shape == (1,)
+        assert PoseValidation.check_pose_quality_batch(self.poses[0]).shape == (1, len(QUALITY_COLUMNS))
+
+        with pytest.raises(ValueError):
+            self.detector.calculate_bilateral_symmetry_batch(np.zeros((2, NUM_LANDMARKS, 2)))
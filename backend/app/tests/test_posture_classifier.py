@@ -0,0 +1,144 @@
+import json
+import pytest
+import numpy as np
+
+from backend.app.models.posture_result import PostureMetrics
+from backend.app.utils.metric_registry import METRIC_REGISTRY
+from backend.app.utils.posture_classifier import (
+    METRIC_JUDGMENTS, POSTURE_TYPES, STANDING_RULES, PostureClassifier
+)
+from backend.app.utils.suggestion_catalog import get_suggestion_catalog
+
+class TestPostureClassifier:
+
+    def setup_method(self):
+        self.classifier = PostureClassifier()
+        self.normal = {
+            'pelvic_tilt': 10, 'thoracic_kyphosis': 35, 'cervical_lordosis': 25,
+            'shoulder_height_difference': 1, 'head_forward_posture': 2, 'lumbar_lordosis': 40,
+            'scapular_protraction': 1, 'trunk_lateral_deviation': 0.5
+        }
+
+    def create_metrics(self, **overrides):
+        return PostureMetrics(**{**self.normal, **overrides})
+
+    @pytest.mark.parametrize("value, expected", [
+        (25, 'normal'), (45, 'normal'), (50, 'slight_deviation'),
+        (60, 'moderate_deviation'), (70, 'significant_deviation'), (80, 'critical_deviation'),
+    ])
+    def test_deviation_bands(self, value, expected):
+        """Test judgment band edges (deviation percent <= 20 / 40 / 60)"""
+        judgments = self.classifier.calculate_color_judgment(self.create_metrics(thoracic_kyphosis=value))
+
+        assert judgments['thoracic_kyphosis']['status'] == expected
+
+    def test_judgments_are_shared_and_immutable(self):
+        """Test that judgments are interned read-only mappings that callers cannot mutate"""
+        first = self.classifier.calculate_color_judgment(self.create_metrics())
+        second = self.classifier.calculate_color_judgment(self.create_metrics())
+
+        assert first['pelvic_tilt'] is second['pelvic_tilt'] is METRIC_JUDGMENTS[0]
+        with pytest.raises(TypeError):
+            first['pelvic_tilt']['color'] = 'changed'
+        with pytest.raises(TypeError):
+            self.classifier.get_overall_color_judgment({})['message'] = 'changed'
+        assert METRIC_JUDGMENTS[0]['color'] == 'excellent'
+
+    def test_standing_classification(self):
+        """Test rule priority and orientation-specific rules"""
+        metrics = self.create_metrics(
+            head_forward_posture=6, thoracic_kyphosis=55, lumbar_lordosis=60, trunk_lateral_deviation=3
+        )
+
+        oblique = self.classifier.classify_posture_type(metrics, 'oblique')
+        frontal = self.classifier.classify_posture_type(metrics, 'frontal')
+
+        assert oblique['primary_type'] == 'kyphosis_lordosis'
+        assert oblique['classifications'] == ['forward_head', 'kyphosis_lordosis', 'lateral_deviation']
+        assert frontal['primary_type'] == 'lateral_deviation'
+        assert self.classifier.classify_posture_type(self.create_metrics(), 'sagittal')['classifications'] == ['ideal']
+
+    def test_batch_matches_single_classification(self):
+        """Test that batch classification agrees with per-analysis classification"""
+        rng = np.random.default_rng(0)
+        values = np.array([self.normal[name] for name in METRIC_REGISTRY.core_names])
+        values = values * rng.choice([0.3, 1.0, 1.6, 2.5], size=(200, len(values)))
+        orientations = rng.choice(['sagittal', 'frontal', 'posterior', 'oblique', 'unknown'], size=200)
+
+        primary, matched, ideal = self.classifier.classify_posture_type_batch(values, orientations)
+
+        for i, orientation in enumerate(orientations):
+            single = self.classifier.classify_posture_type(
+                PostureMetrics(**dict(zip(METRIC_REGISTRY.core_names, values[i]))), orientation
+            )
+            assert single['primary_type'] == POSTURE_TYPES[primary[i]].value
+            expected = ['ideal'] if ideal[i] else [
+                rule.posture_type.value for rule, hit in zip(STANDING_RULES.rules, matched[i]) if hit
+            ]
+            assert single['classifications'] == expected
+
+    def test_dict_additional_metrics_use_representative_value(self):
+        """Test that knee and heel metrics are judged on their representative value"""
+        additional_metrics = {'knee_valgus_varus': {'average_deviation': 13.0, 'left_knee_type': 'valgus'}}
+
+        judgments = self.classifier.calculate_color_judgment(self.create_metrics(), additional_metrics)
+
+        assert judgments['knee_valgus_varus']['status'] == 'moderate_deviation'
+
+    def test_seated_metrics_from_additional_metrics(self):
+        """Test that nested seated metrics select seated classification and are judged"""
+        seated = {'seated_pelvic_tilt': 5, 'head_neck_position': 9, 'trunk_forward_lean': 35,
+                  'trunk_backward_lean': 0, 'lateral_lean': 2, 'shoulder_elevation': 0.5}
+        additional_metrics = {'knee_valgus_varus': None, 'heel_inclination': None, 'seated_metrics': seated}
+
+        posture_type = self.classifier.classify_posture_type(self.create_metrics(), 'sagittal', additional_metrics)
+        judgments = self.classifier.calculate_color_judgment(self.create_metrics(), additional_metrics)
+
+        assert posture_type['primary_type'] == 'seated_slumped'
+        assert judgments['trunk_forward_lean']['status'] == 'critical_deviation'
+        assert judgments['seated_pelvic_tilt']['status'] == 'normal'
+        assert 'seated_metrics' not in judgments
+
+    def test_flat_seated_metrics_still_classified(self):
+        """Test that seated metrics passed at the top level keep working"""
+        seated = {'seated_pelvic_tilt': 5, 'head_neck_position': 9, 'trunk_forward_lean': 10,
+                  'trunk_backward_lean': 0, 'lateral_lean': 2, 'shoulder_elevation': 0.5}
+
+        posture_type = self.classifier.classify_posture_type(self.create_metrics(), 'sagittal', seated)
+
+        assert posture_type['primary_type'] == 'seated_upright'
+
+    def test_standing_analysis_without_seated_metrics(self):
+        """Test that an empty seated_metrics entry falls back to standing classification"""
+        additional_metrics = {'knee_valgus_varus': None, 'heel_inclination': None, 'seated_metrics': None}
+
+        posture_type = self.classifier.classify_posture_type(self.create_metrics(), 'sagittal', additional_metrics)
+
+        assert posture_type['primary_type'] == 'ideal'
+
+    def test_overall_judgment_batch(self):
+        """Test overall judgment levels from a judgment level matrix"""
+        levels = self.classifier.calculate_color_judgment_batch(
+            [[10, 35], [16, 80], [np.nan, np.nan]], ['pelvic_tilt', 'thoracic_kyphosis']
+        )
+
+        np.testing.assert_array_equal(levels, [[0, 0], [1, 4], [-1, -1]])
+        np.testing.assert_array_equal(self.classifier.get_overall_color_judgment_batch(levels), [0, 2, -1])
+
+    def test_improvement_suggestions_from_catalog(self):
+        """Test that suggestions come from the shared catalog keyed by type and poor metrics"""
+        color_judgments = {
+            'pelvic_tilt': METRIC_JUDGMENTS[4],
+            'trunk_lateral_deviation': METRIC_JUDGMENTS[3],
+            'shoulder_height_difference': METRIC_JUDGMENTS[1],
+        }
+
+        suggestions = self.classifier.generate_improvement_suggestions('forward_head', color_judgments)
+        entry = get_suggestion_catalog().suggestions_for('forward_head', color_judgments)
+
+        assert [s['title'] for s in suggestions] == ['頭部前方偏位の改善', '体幹の左右偏位の改善']
+        assert suggestions[1] == self.classifier._get_metric_specific_suggestion('trunk_lateral_deviation')
+        assert suggestions[1] is not entry.suggestions[1]
+        assert suggestions.json is entry.json
+        assert json.loads(entry.json) == suggestions
+        assert self.classifier.generate_improvement_suggestions('ideal', {}) == []
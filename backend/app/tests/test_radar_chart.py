@@ -0,0 +1,37 @@
+import math
+import pytest
+from reportlab.graphics.shapes import Drawing, Polygon
+
+from backend.app.services.radar_chart import RadarChartTemplate, get_radar_template
+
+class TestRadarChart:
+
+    def setup_method(self):
+        self.categories = ('骨盤傾斜', '胸椎後弯', '頸椎前弯', '肩の高さ', '頭部前方', '腰椎前弯')
+        self.template = RadarChartTemplate(self.categories)
+
+    def test_point_geometry(self):
+        """Values map onto the radius along each axis, counter-clockwise from 0°"""
+        t = self.template
+        assert t.point(0.0, 100) == pytest.approx((t.center + t.radius, t.center))
+        assert t.point(math.pi / 2, 50) == pytest.approx((t.center, t.center + t.radius / 2))
+        # 範囲外の値はクリップする
+        assert t.point(0.0, 150) == pytest.approx(t.point(0.0, 100))
+        assert t.point(0.0, -10) == pytest.approx((t.center, t.center))
+
+    def test_draw_overlays_data_on_cached_background(self):
+        """Each chart reuses the template background and adds one data polygon"""
+        first = self.template.draw([100, 80, 60, 100, 40, 90])
+        second = self.template.draw([50] * 6)
+
+        assert isinstance(first, Drawing)
+        assert first.contents[0] is self.template.background
+        assert second.contents[0] is self.template.background
+
+        polygon = next(shape for shape in first.contents if isinstance(shape, Polygon))
+        assert len(polygon.points) == 2 * len(self.categories)
+
+    def test_template_cache(self):
+        """Templates are cached per category sequence"""
+        assert get_radar_template(self.categories) is get_radar_template(self.categories)
+        assert get_radar_template(self.categories) is not get_radar_template(self.categories[:5])
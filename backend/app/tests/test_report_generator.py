@@ -0,0 +1,29 @@
+from backend.app.services.report_generator import (
+    REPORT_FONT, ReportGenerator, _warm_up_result, get_report_generator
+)
+
+class TestReportGenerator:
+
+    def test_shared_generator_and_styles(self):
+        """The process-wide generator is reused and every instance shares one stylesheet"""
+        assert get_report_generator() is get_report_generator()
+        assert ReportGenerator().styles is get_report_generator().styles
+
+    def test_styles_use_cjk_font(self):
+        """Paragraph styles render Japanese text with the CJK font"""
+        styles = get_report_generator().styles
+
+        for name in ('Normal', 'CustomTitle', 'SectionHeader', 'MetricLabel'):
+            assert styles[name].fontName == REPORT_FONT
+
+    def test_warm_up_renders_report(self):
+        """Warm-up renders a throwaway report that embeds the CJK font"""
+        generator = ReportGenerator()
+
+        assert generator.warm_up() >= 0
+        assert generator.warmed_up
+
+        pdf = generator.render_pdf(_warm_up_result())
+        assert pdf.startswith(b'%PDF')
+        assert REPORT_FONT.encode() in pdf
+        assert b'Helvetica-Bold' not in pdf
@@ -0,0 +1,81 @@
+import os
+import pytest
+
+from backend.app.services.report_index import ReportIndex, report_filename
+
+class TestReportIndex:
+
+    @pytest.fixture(autouse=True)
+    def setup_index(self, tmp_path):
+        self.reports_dir = tmp_path / 'reports'
+        self.reports_dir.mkdir()
+        self.index = ReportIndex(str(tmp_path / 'index.db'))
+        yield
+        self.index.close()
+
+    def add_report(self, report_id, created_at, content_key=None, size=100):
+        filename = report_filename(report_id)
+        path = self.reports_dir / filename
+        path.write_bytes(b'%PDF-' + b'x' * (size - 5))
+        report = {'id': report_id, 'filename': filename, 'path': str(path), 'size': size, 'created_at': created_at}
+        self.index.add(report, content_key=content_key)
+        return report
+
+    def test_cursor_pagination(self):
+        """Reports are listed newest first and pages follow the cursor without gaps"""
+        for i in range(7):
+            self.add_report(f'r{i}', created_at=1000.0 + i)
+        # 同じ作成日時でも ID で順序が決まる
+        self.add_report('r7', created_at=1006.0)
+
+        ids, cursor = [], None
+        while True:
+            page, cursor = self.index.list(limit=3, cursor=cursor)
+            ids.extend(report['id'] for report in page)
+            if cursor is None:
+                break
+
+        assert ids == ['r7', 'r6', 'r5', 'r4', 'r3', 'r2', 'r1', 'r0']
+        assert self.index.count() == 8
+
+    def test_filters(self):
+        """Reports can be filtered by creation time and analysis content key"""
+        self.add_report('a', created_at=100.0, content_key='k1')
+        self.add_report('b', created_at=200.0, content_key='k2')
+        self.add_report('c', created_at=300.0, content_key='k1')
+
+        assert [r['id'] for r in self.index.list(since=150.0)[0]] == ['c', 'b']
+        assert [r['id'] for r in self.index.list(until=250.0)[0]] == ['b', 'a']
+        assert [r['id'] for r in self.index.list(content_key='k1')[0]] == ['c', 'a']
+        assert self.index.count(content_key='k1') == 2
+        assert self.index.latest_for_content('k1')['id'] == 'c'
+        assert self.index.latest_for_content('missing') is None
+
+    def test_remove_and_get(self):
+        """Removed reports are no longer returned"""
+        self.add_report('a', created_at=100.0)
+
+        assert self.index.get('a')['filename'] == report_filename('a')
+        assert self.index.remove('a') is True
+        assert self.index.remove('a') is False
+        assert self.index.get('a') is None
+
+    def test_invalid_cursor(self):
+        """Malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            self.index.list(cursor='not-a-cursor')
+
+    def test_reconcile(self):
+        """Reconcile indexes unknown files and drops entries whose files are gone"""
+        kept = self.add_report('kept', created_at=100.0)
+        gone = self.add_report('gone', created_at=200.0)
+        os.remove(gone['path'])
+        (self.reports_dir / report_filename('orphan')).write_bytes(b'%PDF-orphan')
+        (self.reports_dir / 'notes.txt').write_text('ignored')
+
+        stats = self.index.reconcile(str(self.reports_dir))
+
+        assert stats == {'files': 2, 'added': 1, 'removed': 1}
+        assert self.index.get('gone') is None
+        assert self.index.get('kept') == {**kept, 'content_key': None}
+        assert self.index.get('orphan')['size'] == len(b'%PDF-orphan')
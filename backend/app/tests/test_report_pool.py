@@ -0,0 +1,174 @@
+import asyncio
+import os
+import threading
+import pytest
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.report_generator import ReportGenerator
+from backend.app.services.report_index import ReportIndex, report_filename
+from backend.app.services.report_pool import ReportPool, ReportQueueFull
+
+class TestReportPool:
+
+    def setup_method(self):
+        self.result = PostureAnalysisResult(
+            landmarks={'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9}},
+            metrics=PostureMetrics(
+                pelvic_tilt=20.0, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+                shoulder_height_difference=2.0, head_forward_posture=3.0, lumbar_lordosis=40.0,
+                scapular_protraction=1.0, trunk_lateral_deviation=0.5
+            ),
+            overall_score=72.5,
+            image_width=640,
+            image_height=480,
+            confidence=0.9
+        )
+
+    @pytest.mark.asyncio
+    async def test_render_in_worker_process(self, tmp_path):
+        """Reports are rendered by a worker process into the configured directory"""
+        pool = ReportPool(max_workers=1, reports_dir=str(tmp_path))
+        try:
+            report = await pool.render(self.result)
+        finally:
+            pool.shutdown()
+
+        assert os.path.dirname(report['path']) == str(tmp_path)
+        with open(report['path'], 'rb') as f:
+            assert f.read(5) == b'%PDF-'
+
+        summary = pool.summary()
+        assert summary['completed'] == 1
+        assert summary['queued'] == 0 and summary['running'] == 0
+        assert summary['render_p50_ms'] > 0
+
+    @pytest.mark.asyncio
+    async def test_render_analysis_graph_result(self, tmp_path, graph_result):
+        """Results stored by /api/analyze are keyed and rendered like validated ones"""
+        result = graph_result
+        assert result.color_judgments and result.improvement_suggestions
+        pool = ReportPool(max_workers=1, reports_dir=str(tmp_path))
+        try:
+            report = await pool.render(result)
+            rendered = await pool.render_pdf(result)
+        finally:
+            pool.shutdown()
+
+        with open(report['path'], 'rb') as f:
+            assert f.read(5) == b'%PDF-'
+        assert rendered.report_id == report['id']
+        assert ReportGenerator.content_key(result) == rendered.content_key
+
+    def test_content_key(self):
+        """The content key is stable and changes with the analysis content"""
+        same = self.result.model_copy(deep=True)
+        changed = self.result.model_copy(update={'overall_score': 60.0})
+
+        assert ReportGenerator.content_key(self.result) == ReportGenerator.content_key(same)
+        assert ReportGenerator.content_key(self.result) != ReportGenerator.content_key(changed)
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_identical_reports(self, tmp_path):
+        """Identical concurrent requests share one render and later ones hit the cache"""
+        pool = ReportPool(max_workers=1, reports_dir=str(tmp_path))
+        try:
+            reports = await asyncio.gather(*(pool.render(self.result) for _ in range(3)))
+            assert len({report['id'] for report in reports}) == 1
+            assert pool.summary()['completed'] == 1
+            assert pool.summary()['coalesced'] == 2
+
+            cached = await pool.render(self.result.model_copy(deep=True))
+            assert cached['id'] == reports[0]['id']
+            assert pool.summary()['cache_hits'] == 1
+
+            # 削除されたレポートは描画し直す
+            os.remove(cached['path'])
+            rerendered = await pool.render(self.result)
+            assert rerendered['id'] != cached['id']
+            assert pool.summary()['completed'] == 2
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_render_pdf_in_memory_and_persist(self, tmp_path):
+        """In-memory rendering writes nothing until the PDF is explicitly persisted"""
+        index = ReportIndex(str(tmp_path / 'index.db'))
+        reports_dir = tmp_path / 'reports'
+        reports_dir.mkdir()
+        pool = ReportPool(max_workers=1, reports_dir=str(reports_dir), index=index)
+        try:
+            rendered = await pool.render_pdf(self.result)
+            assert rendered.pdf.startswith(b'%PDF-')
+            assert rendered.report_id is None
+            assert os.listdir(reports_dir) == []
+
+            report = await pool.persist(rendered.content_key, rendered.pdf, 'saved')
+            assert report['id'] == 'saved'
+            assert index.get('saved')['size'] == len(rendered.pdf)
+
+            # 保存後は同一内容の要求がそのレポートを再利用する
+            assert (await pool.render(self.result))['id'] == 'saved'
+            again = await pool.render_pdf(self.result)
+            assert again.report_id == 'saved' and again.pdf == rendered.pdf
+            assert pool.summary()['completed'] == 1
+        finally:
+            pool.shutdown()
+            index.close()
+
+    @pytest.mark.asyncio
+    async def test_reuses_indexed_report(self, tmp_path):
+        """Reports indexed before a restart are found by content key without rendering"""
+        path = tmp_path / report_filename('previous')
+        path.write_bytes(b'%PDF-previous')
+        index = ReportIndex(str(tmp_path / 'index.db'))
+        index.add({'id': 'previous', 'filename': path.name, 'path': str(path), 'size': 13, 'created_at': 1.0},
+                  content_key=ReportGenerator.content_key(self.result))
+        pool = ReportPool(max_workers=1, reports_dir=str(tmp_path), index=index)
+
+        report = await pool.render(self.result)
+
+        assert report['id'] == 'previous'
+        assert report['url'] == f'/reports/{path.name}'
+        assert pool.summary()['cache_hits'] == 1
+        assert pool._executor is None
+        index.close()
+
+    @pytest.mark.asyncio
+    async def test_index_is_queried_off_the_event_loop(self, tmp_path):
+        """Index lookups, removals and inserts run in worker threads, not on the event loop"""
+        index = ReportIndex(str(tmp_path / 'index.db'))
+        content_key = ReportGenerator.content_key(self.result)
+        index.add({'id': 'missing', 'filename': report_filename('missing'), 'path': str(tmp_path / 'gone.pdf'),
+                   'size': 13, 'created_at': 1.0}, content_key=content_key)
+        pool = ReportPool(max_workers=1, reports_dir=str(tmp_path), index=index)
+        loop_thread = threading.get_ident()
+        calls = []
+
+        def recording(method):
+            def wrapper(*args, **kwargs):
+                calls.append((method.__name__, threading.get_ident()))
+                return method(*args, **kwargs)
+            return wrapper
+
+        for name in ('latest_for_content', 'remove', 'add'):
+            setattr(index, name, recording(getattr(index, name)))
+        try:
+            rendered = await pool.render_pdf(self.result)
+            await pool.persist(rendered.content_key, rendered.pdf, 'saved')
+        finally:
+            pool.shutdown()
+            index.close()
+
+        assert {name for name, _ in calls} == {'latest_for_content', 'remove', 'add'}
+        assert all(thread != loop_thread for _, thread in calls)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self, tmp_path):
+        """Requests beyond the queue limit are rejected without starting a worker"""
+        pool = ReportPool(max_workers=1, max_queue=0, reports_dir=str(tmp_path))
+
+        with pytest.raises(ReportQueueFull):
+            await pool.render(self.result)
+
+        assert pool.summary()['rejected'] == 1
+        assert pool._executor is None
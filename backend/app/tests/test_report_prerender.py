@@ -0,0 +1,79 @@
+import os
+import pytest
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.report_pool import ReportPool
+from backend.app.services.report_prerender import ReportPrerenderer
+
+class TestReportPrerender:
+
+    @pytest.fixture(autouse=True)
+    def setup_pool(self, tmp_path):
+        self.pool = ReportPool(max_workers=1, reports_dir=str(tmp_path))
+        self.result = PostureAnalysisResult(
+            landmarks={'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9}},
+            metrics=PostureMetrics(
+                pelvic_tilt=20.0, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+                shoulder_height_difference=2.0, head_forward_posture=3.0, lumbar_lordosis=40.0,
+                scapular_protraction=1.0, trunk_lateral_deviation=0.5
+            ),
+            overall_score=72.5,
+            image_width=640,
+            image_height=480,
+            confidence=0.9
+        )
+        yield
+        self.pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """Nothing is rendered unless the policy is enabled"""
+        prerenderer = ReportPrerenderer(self.pool)
+
+        assert await prerenderer.schedule(self.result) is False
+        assert self.pool._executor is None
+
+    @pytest.mark.asyncio
+    async def test_yields_to_interactive_work(self):
+        """Pre-rendering is skipped while analyses run or report requests are queued"""
+        prerenderer = ReportPrerenderer(self.pool, enabled=True)
+
+        with prerenderer.analysis():
+            assert await prerenderer.schedule(self.result) is False
+
+        self.pool.queued = 1
+        assert await prerenderer.schedule(self.result) is False
+        self.pool.queued = 0
+
+        assert self.pool.summary()['prerender_skipped'] == 2
+        assert self.pool._executor is None
+
+    @pytest.mark.asyncio
+    async def test_prerendered_report_is_reused(self):
+        """A pre-rendered report turns the later request into a cache hit"""
+        prerenderer = ReportPrerenderer(self.pool, enabled=True)
+
+        assert await prerenderer.schedule(self.result) is True
+        report = await self.pool.render(self.result)
+
+        summary = self.pool.summary()
+        assert summary['prerendered'] == 1
+        assert summary['cache_hits'] == 1
+        assert summary['completed'] == 1
+        assert report['path'].endswith('.pdf')
+
+        # 描画済みの内容は再度事前描画しない
+        assert await prerenderer.schedule(self.result) is False
+
+    @pytest.mark.asyncio
+    async def test_prerenders_stored_analysis_result(self, graph_result):
+        """A result as stored by /api/analyze is actually rendered to a report file"""
+        prerenderer = ReportPrerenderer(self.pool, enabled=True)
+
+        assert await prerenderer.schedule(graph_result) is True
+
+        assert self.pool.summary()['prerendered'] == 1
+        assert len(os.listdir(self.pool.reports_dir)) == 1
+        report = await self.pool.render(graph_result)
+        assert os.path.exists(report['path'])
+        assert self.pool.summary()['cache_hits'] == 1
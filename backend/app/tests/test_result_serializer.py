@@ -0,0 +1,101 @@
+import json
+import pytest
+from unittest.mock import Mock
+
+import backend.app.utils.result_serializer as result_serializer
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.services.analysis_graph import AnalysisGraph
+from backend.app.utils.landmark_array import LandmarkArray
+from backend.app.utils.metric_kernel import MetricKernel
+from backend.app.utils.pose_detector import PoseDetector
+from backend.app.utils.posture_classifier import PostureClassifier
+from backend.app.utils.result_serializer import ResultSerializer, compact_landmarks, encode_json
+from backend.app.utils.suggestion_catalog import SuggestionList, get_suggestion_catalog
+
+class TestResultSerializer:
+
+    def setup_method(self):
+        landmarks = LandmarkArray.from_dict({
+            'nose': {'x': 0.5, 'y': 0.1, 'z': 0.0, 'visibility': 0.9},
+            'left_ear': {'x': 0.45, 'y': 0.15, 'z': 0.0, 'visibility': 0.8},
+            'right_ear': {'x': 0.55, 'y': 0.15, 'z': 0.0},
+            'left_shoulder': {'x': 0.3, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'right_shoulder': {'x': 0.7, 'y': 0.25, 'z': 0.0, 'visibility': 0.95},
+            'left_elbow': {'x': 0.25, 'y': 0.35, 'z': 0.0, 'visibility': 0.9},
+            'right_elbow': {'x': 0.75, 'y': 0.35, 'z': 0.0, 'visibility': 0.9},
+            'left_hip': {'x': 0.35, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+            'right_hip': {'x': 0.65, 'y': 0.55, 'z': 0.0, 'visibility': 0.9},
+        })
+        analyzer = Mock()
+        analyzer.pose_detector = PoseDetector()
+        analyzer.posture_classifier = PostureClassifier()
+        analyzer.metric_kernel = MetricKernel()
+        analyzer._detect_seated_posture.return_value = False
+        analyzer._calculate_enhanced_overall_score.return_value = 80.0
+        self.result = AnalysisGraph(analyzer, landmarks, (640, 480)).to_result()
+        self.serializer = ResultSerializer()
+
+    def expected(self):
+        """Reference encoding through the validating pydantic path"""
+        validated = PostureAnalysisResult.model_validate(self.result.model_dump(warnings=False))
+        return json.loads(validated.model_dump_json())
+
+    def test_matches_pydantic_encoding(self):
+        """Test that the fast path produces the same document as model validation and dumping"""
+        assert json.loads(self.serializer.serialize(self.result)) == self.expected()
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test that the json fallback produces the same document when orjson is unavailable"""
+        monkeypatch.setattr(result_serializer, 'ORJSON_AVAILABLE', False)
+
+        assert json.loads(self.serializer.serialize(self.result)) == self.expected()
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_suggestion_fragment_is_spliced(self, monkeypatch, orjson_available):
+        """Test that catalog suggestions are written from their pre-encoded JSON fragment"""
+        if orjson_available and not result_serializer.ORJSON_AVAILABLE:
+            pytest.skip("orjson is not installed")
+        monkeypatch.setattr(result_serializer, 'ORJSON_AVAILABLE', orjson_available)
+        suggestions = get_suggestion_catalog().lookup('forward_head', ('trunk_lateral_deviation',)).as_list()
+        self.result.improvement_suggestions = suggestions
+
+        body = self.serializer.serialize(self.result)
+
+        assert b'"improvement_suggestions":' + suggestions.json in body
+        assert body == encode_json(result_serializer.result_payload(self.result))
+        assert json.loads(body) == self.expected()
+
+        # 断片が使われていることを、内容と異なる断片で確認
+        self.result.improvement_suggestions = SuggestionList(suggestions, b'["spliced"]')
+        assert json.loads(self.serializer.serialize(self.result))['improvement_suggestions'] == ['spliced']
+
+    def test_compact_landmarks(self):
+        """Test the compact landmark array encoding"""
+        data = json.loads(self.serializer.serialize(self.result, 'compact'))
+        compact = data['landmarks']
+
+        assert compact == compact_landmarks(self.result.landmarks)
+        assert compact['fields'] == ['x', 'y', 'z', 'visibility']
+        row = compact['values'][compact['names'].index('right_ear')]
+        assert row[:2] == pytest.approx([0.55, 0.15]) and row[3] is None
+        with pytest.raises(ValueError):
+            self.serializer.serialize(self.result, 'binary')
+
+    def test_analysis_id(self):
+        """Test that the analysis_id is included first in the JSON document"""
+        data = json.loads(self.serializer.serialize(self.result, analysis_id='abc123'))
+
+        assert next(iter(data)) == 'analysis_id'
+        assert data.pop('analysis_id') == 'abc123'
+        assert data == self.expected()
+
+    def test_stats(self):
+        """Test that p50 serialization time and payload size are recorded"""
+        assert self.serializer.stats.summary()['count'] == 0
+
+        sizes = [len(self.serializer.serialize(self.result, fmt)) for fmt in ('object', 'compact', 'compact')]
+        summary = self.serializer.stats.summary()
+
+        assert summary['count'] == 3
+        assert summary['p50_bytes'] == sorted(sizes)[1] < sizes[0]
+        assert summary['p50_ms'] >= 0
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.result_store import ResultStore
+
+class TestResultStore:
+
+    def setup_method(self):
+        self.result = PostureAnalysisResult(
+            landmarks={},
+            metrics=PostureMetrics(
+                pelvic_tilt=10.0, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+                shoulder_height_difference=1.0, head_forward_posture=2.0, lumbar_lordosis=40.0,
+                scapular_protraction=1.0, trunk_lateral_deviation=0.5
+            ),
+            overall_score=85.0,
+            image_width=640,
+            image_height=480,
+            confidence=0.9
+        )
+
+    def test_put_and_get(self):
+        """Stored results are returned by their analysis_id"""
+        store = ResultStore()
+        analysis_id = store.put(self.result)
+
+        assert store.get(analysis_id) is self.result
+        assert store.get('unknown') is None
+        assert store.summary()['hits'] == 1
+        assert store.summary()['misses'] == 1
+
+    def test_evicts_least_recently_used(self):
+        """The store keeps at most max_size results"""
+        store = ResultStore(max_size=2)
+        first = store.put(self.result)
+        second = store.put(self.result)
+        store.get(first)
+        store.put(self.result)
+
+        assert len(store) == 2
+        assert store.get(first) is not None
+        assert store.get(second) is None
+
+    def test_expires_after_ttl(self):
+        """Results older than the TTL are no longer available"""
+        store = ResultStore(ttl=60)
+        with patch('backend.app.services.result_store.time.monotonic', return_value=1000.0):
+            analysis_id = store.put(self.result)
+        with patch('backend.app.services.result_store.time.monotonic', return_value=1059.0):
+            assert store.get(analysis_id) is self.result
+        with patch('backend.app.services.result_store.time.monotonic', return_value=1061.0):
+            assert store.get(analysis_id) is None
+        assert len(store) == 0
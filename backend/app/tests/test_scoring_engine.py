@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+
+from backend.app.core.config import settings
+from backend.app.models.posture_result import PostureMetrics
+from backend.app.utils.scoring_engine import (
+    DEFAULT_PROFILE, SYMMETRY_KEYS, ScoringEngine, WeightProfile, age_group_for
+)
+
+def reference_score(metrics, pose_quality=1.0, symmetry_scores=None):
+    """Per-metric formula the engine replaces"""
+    ref = settings.REFERENCE_VALUES
+    weighted = [
+        (metrics.pelvic_tilt, ref['pelvic_tilt'], 0.15),
+        (metrics.thoracic_kyphosis, ref['thoracic_kyphosis'], 0.20),
+        (metrics.cervical_lordosis, ref['cervical_lordosis'], 0.15),
+        (metrics.shoulder_height_difference, ref['shoulder_height_diff'], 0.15),
+        (metrics.head_forward_posture, ref['head_forward_posture'], 0.20),
+        (metrics.lumbar_lordosis, ref['lumbar_lordosis'], 0.15),
+    ]
+    base = 0.0
+    for value, reference, weight in weighted:
+        low, high = reference['normal']
+        deviation = 0 if low <= value <= high else (low - value if value < low else value - high)
+        base += max(0.0, 100.0 - min(100, deviation * 5)) * weight
+    bonus = sum(symmetry_scores.values()) / len(symmetry_scores) * 5 if symmetry_scores else 0
+    return min(100.0, max(0.0, base * pose_quality + bonus))
+
+class TestScoringEngine:
+
+    def setup_method(self):
+        self.engine = ScoringEngine()
+        rng = np.random.default_rng(0)
+        self.matrix = rng.uniform(-20, 80, size=(100, len(self.engine.metric_names)))
+        self.metrics = [PostureMetrics(**dict(zip(self.engine.metric_names, row))) for row in self.matrix]
+        self.quality = rng.uniform(0, 1, size=100)
+        self.symmetry = [dict(zip(SYMMETRY_KEYS, rng.uniform(0, 1, size=4))) for _ in range(100)]
+
+    def test_matches_reference_formula(self):
+        """Test that batch scores match the per-metric weighted formula"""
+        scores = self.engine.score(self.metrics, self.quality, self.engine.symmetry_matrix(self.symmetry))
+
+        expected = [reference_score(m, q, s) for m, q, s in zip(self.metrics, self.quality, self.symmetry)]
+        np.testing.assert_allclose(scores, expected)
+        np.testing.assert_allclose(self.engine.score(self.matrix), [reference_score(m) for m in self.metrics])
+
+    def test_single_matches_batch(self):
+        """Test that single-result scoring agrees with the batch pass"""
+        batch = self.engine.score(self.matrix, self.quality, self.engine.symmetry_matrix(self.symmetry))
+
+        for i in range(10):
+            assert self.engine.score_metrics(self.metrics[i], self.quality[i], self.symmetry[i]) == pytest.approx(batch[i])
+
+    def test_missing_metric_scores_zero(self):
+        """Test that NaN metrics receive the maximum penalty"""
+        scores = ScoringEngine.metric_scores(np.array([np.nan, 10.0, 30.0]), 0.0, 15.0)
+
+        np.testing.assert_array_equal(scores, [0.0, 100.0, 25.0])
+
+    def test_profile_swap(self):
+        """Test runtime weight profile selection and validation"""
+        default = self.engine.score(self.matrix)
+
+        profile = self.engine.set_profile(self.engine.profile_for_age(70))
+        elderly = self.engine.score(self.matrix)
+
+        assert age_group_for(70) == 'elderly' and profile.name == 'elderly'
+        assert np.all(elderly >= default)
+        self.engine.set_profile(WeightProfile('head_only', weights={'head_forward_posture': 1.0}))
+        assert self.engine.score(self.metrics[:1])[0] == pytest.approx(
+            ScoringEngine.metric_scores(self.metrics[0].head_forward_posture, 0.0, 2.5)
+        )
+        with pytest.raises(ValueError):
+            self.engine.set_profile('unknown')
+        with pytest.raises(ValueError):
+            self.engine.set_profile(WeightProfile('bad', weights={'unknown_metric': 1.0}))
+
+    def test_rescore_stored_results(self):
+        """Test bulk rescoring of stored results under another profile"""
+        results = [
+            SimpleNamespace(metrics=m, confidence=q, symmetry_scores=s)
+            for m, q, s in zip(self.metrics, self.quality, self.symmetry)
+        ]
+        results[0].symmetry_scores = None
+
+        scores = self.engine.rescore(results)
+        child = self.engine.rescore(results, 'child')
+
+        assert scores[0] == pytest.approx(reference_score(self.metrics[0], self.quality[0]))
+        assert scores[1] == pytest.approx(reference_score(self.metrics[1], self.quality[1], self.symmetry[1]))
+        assert np.all(child <= scores + 1e-9)
+        assert self.engine.profile is DEFAULT_PROFILE
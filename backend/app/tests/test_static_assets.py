@@ -0,0 +1,114 @@
+import gzip
+import os
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.app.utils.static_assets import (
+    APICompressionMiddleware,
+    HtmlPageCache,
+    StaticAssetStore,
+    _choose_encoding,
+    precompress_directory,
+)
+
+class TestStaticAssets:
+
+    @pytest.fixture(autouse=True)
+    def setup_bundle(self, tmp_path):
+        self.root = tmp_path
+        (tmp_path / 'assets').mkdir()
+        (tmp_path / 'index.html').write_text('<html>' + 'flutter ' * 500 + '</html>')
+        (tmp_path / 'main.dart.js').write_text('var x = 1;\n' * 500)
+        (tmp_path / 'assets' / 'app.json').write_text('{"a": 1}' * 300)
+        (tmp_path / 'small.js').write_text('var y;')
+
+    def test_precompress_directory(self):
+        """Compressible files above the threshold get a smaller .gz variant"""
+        stats = precompress_directory(str(self.root))
+
+        assert stats['files'] == 3
+        assert os.path.exists(self.root / 'main.dart.js.gz')
+        assert not os.path.exists(self.root / 'small.js.gz')
+        with gzip.open(self.root / 'main.dart.js.gz', 'rb') as f:
+            assert f.read() == (self.root / 'main.dart.js').read_bytes()
+
+        # 圧縮ファイルが最新なら再作成しない
+        assert precompress_directory(str(self.root))['written'] == 0
+
+    def test_choose_encoding(self):
+        """Highest q-value wins, ties prefer brotli, q=0 disables an encoding"""
+        available = {'br': 'x.br', 'gzip': 'x.gz'}
+        assert _choose_encoding('gzip, deflate, br', available) == 'br'
+        assert _choose_encoding('br;q=0.5, gzip', available) == 'gzip'
+        assert _choose_encoding('gzip', {'br': 'x.br'}) is None
+        assert _choose_encoding('*', available) == 'br'
+        assert _choose_encoding('gzip;q=0', {'gzip': 'x.gz'}) is None
+        assert _choose_encoding(None, available) is None
+
+    def test_asset_response_headers(self):
+        """Hashed bundle paths are immutable, entry points revalidate"""
+        precompress_directory(str(self.root))
+        store = StaticAssetStore(str(self.root), immutable_prefixes=('assets/',), max_age=600)
+
+        asset = store.response(Headers({'accept-encoding': 'gzip'}), 'assets/app.json')
+        assert asset.headers['cache-control'] == 'public, max-age=600, immutable'
+        assert asset.headers['content-encoding'] == 'gzip'
+        assert asset.headers['etag'].endswith('-gz"')
+
+        entry = store.response(Headers({}), 'main.dart.js')
+        assert entry.headers['cache-control'] == 'no-cache'
+        assert 'content-encoding' not in entry.headers
+        assert entry.headers['vary'] == 'Accept-Encoding'
+
+        assert store.response(Headers({}), 'missing.js') is None
+        assert store.response(Headers({}), 'main.dart.js.gz') is None
+
+    def test_asset_not_modified(self):
+        """If-None-Match with the representation's ETag returns 304"""
+        precompress_directory(str(self.root))
+        store = StaticAssetStore(str(self.root))
+
+        etag = store.response(Headers({'accept-encoding': 'gzip'}), 'main.dart.js').headers['etag']
+        revalidated = store.response(Headers({'accept-encoding': 'gzip', 'if-none-match': etag}), 'main.dart.js')
+        assert revalidated.status_code == 304
+
+        # 別の表現（非圧縮）には一致しない
+        identity = store.response(Headers({'if-none-match': etag}), 'main.dart.js')
+        assert identity.status_code == 200
+
+    def test_html_page_cache(self):
+        """Pages are read once, served gzipped from memory and revalidated"""
+        cache = HtmlPageCache()
+        index = str(self.root / 'index.html')
+
+        response = cache.response(Headers({'accept-encoding': 'gzip'}), str(self.root / 'none.html'), index)
+        assert response.headers['content-encoding'] == 'gzip'
+        assert gzip.decompress(response.body) == (self.root / 'index.html').read_bytes()
+
+        os.remove(index)
+        cached = cache.response(Headers({'if-none-match': response.headers['etag'], 'accept-encoding': 'gzip'}), index)
+        assert cached.status_code == 304
+        assert cache.response(Headers({}), str(self.root / 'none.html')) is None
+
+    def test_api_compression_middleware(self):
+        """Large JSON responses are gzipped, small and non-JSON ones pass through"""
+        app = Starlette(routes=[
+            Route('/large', lambda request: JSONResponse({'values': list(range(1000))})),
+            Route('/small', lambda request: JSONResponse({'ok': True})),
+            Route('/text', lambda request: PlainTextResponse('x' * 5000)),
+        ])
+        app.add_middleware(APICompressionMiddleware, minimum_size=1024)
+        client = TestClient(app)
+
+        large = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        assert large.headers['content-encoding'] == 'gzip'
+        assert large.headers['vary'] == 'Accept-Encoding'
+        assert large.json()['values'][-1] == 999
+
+        assert 'content-encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'content-encoding' not in client.get('/text', headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'content-encoding' not in client.get('/large', headers={'Accept-Encoding': 'identity'}).headers
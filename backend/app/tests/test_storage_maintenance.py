@@ -0,0 +1,106 @@
+import logging
+import os
+import pytest
+
+from backend.app.services.report_index import ReportIndex, report_filename
+from backend.app.services.storage_maintenance import RetentionPolicy, StorageMaintenance, select_evictions
+
+DAY = 86400.0
+NOW = 100 * DAY
+
+class TestStorageMaintenance:
+
+    @pytest.fixture(autouse=True)
+    def setup_storage(self, tmp_path):
+        self.reports_dir = tmp_path / 'reports'
+        self.logs_dir = tmp_path / 'logs'
+        self.reports_dir.mkdir()
+        self.logs_dir.mkdir()
+        self.index = ReportIndex(str(tmp_path / 'index.db'))
+        yield
+        self.index.close()
+
+    def add_report(self, report_id, age_days, size=100, content_key=None):
+        path = self.reports_dir / report_filename(report_id)
+        path.write_bytes(b'x' * size)
+        self.index.add({'id': report_id, 'filename': path.name, 'path': str(path), 'size': size,
+                        'created_at': NOW - age_days * DAY}, content_key=content_key)
+        return path
+
+    def add_log(self, name, age_days, size=100):
+        path = self.logs_dir / name
+        path.write_bytes(b'x' * size)
+        os.utime(path, (NOW - age_days * DAY, NOW - age_days * DAY))
+        return path
+
+    def maintenance(self, report_policy=RetentionPolicy(), log_policy=RetentionPolicy()):
+        return StorageMaintenance(str(self.logs_dir), self.index, report_policy, log_policy)
+
+    def test_select_evictions(self):
+        """Age, per-group count and total quota are applied oldest first"""
+        entries = [
+            {'id': 'old', 'size': 10, 'created_at': NOW - 40 * DAY, 'key': 'a'},
+            {'id': 'a1', 'size': 10, 'created_at': NOW - 5 * DAY, 'key': 'a'},
+            {'id': 'a2', 'size': 10, 'created_at': NOW - 4 * DAY, 'key': 'a'},
+            {'id': 'b1', 'size': 10, 'created_at': NOW - 3 * DAY, 'key': 'b'},
+            {'id': 'a3', 'size': 10, 'created_at': NOW - 2 * DAY, 'key': 'a'},
+            {'id': 'c1', 'size': 10, 'created_at': NOW - 1 * DAY, 'key': None},
+        ]
+
+        def ids(policy):
+            return [entry['id'] for entry in select_evictions(entries, policy, NOW, group_key='key')]
+
+        assert ids(RetentionPolicy()) == []
+        assert ids(RetentionPolicy(max_age_days=30)) == ['old']
+        assert ids(RetentionPolicy(max_per_analysis=2)) == ['old', 'a1']
+        assert ids(RetentionPolicy(max_total_bytes=35)) == ['old', 'a1', 'a2']
+        assert ids(RetentionPolicy(max_age_days=30, max_per_analysis=1, max_total_bytes=15)) == \
+            ['old', 'a1', 'a2', 'b1', 'a3']
+
+    def test_collect_reports(self):
+        """Evicted reports are deleted from disk and the index"""
+        old = self.add_report('old', age_days=40, size=300)
+        kept = self.add_report('kept', age_days=1, size=200)
+
+        result = self.maintenance(RetentionPolicy(max_age_days=30)).collect_reports(now=NOW)
+
+        assert result == {'removed': 1, 'reclaimed_bytes': 300}
+        assert not old.exists() and kept.exists()
+        assert self.index.get('old') is None
+        assert self.index.get('kept') is not None
+
+    def test_collect_logs_skips_active_files(self):
+        """Old log files are removed except those the process is still writing"""
+        stale = self.add_log('posture_analysis_old.log', age_days=30, size=500)
+        recent = self.add_log('errors_recent.log', age_days=1)
+        other = self.add_log('notes.txt', age_days=30)
+        active = self.add_log('structured_active.jsonl', age_days=30)
+
+        handler = logging.FileHandler(active)
+        test_logger = logging.getLogger('test_storage_maintenance')
+        test_logger.addHandler(handler)
+        try:
+            maintenance = self.maintenance(log_policy=RetentionPolicy(max_age_days=14))
+            result = maintenance.collect_logs(now=NOW)
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+
+        assert result == {'removed': 1, 'reclaimed_bytes': 500}
+        assert not stale.exists()
+        assert recent.exists() and other.exists() and active.exists()
+
+    def test_reclaimed_bytes_metric(self):
+        """Reclaimed space accumulates across runs"""
+        self.add_report('r1', age_days=40, size=100)
+        self.add_log('old.log', age_days=40, size=50)
+        maintenance = self.maintenance(RetentionPolicy(max_age_days=30), RetentionPolicy(max_age_days=30))
+
+        maintenance.run_once(now=NOW)
+        self.add_report('r2', age_days=40, size=25)
+        maintenance.run_once(now=NOW)
+
+        summary = maintenance.summary()
+        assert summary['runs'] == 2
+        assert summary['reclaimed_bytes'] == {'reports': 125, 'logs': 50, 'total': 175}
+        assert summary['removed_files'] == {'reports': 2, 'logs': 1}
@@ -0,0 +1,134 @@
+import math
+import statistics
+from datetime import datetime
+
+import pytest
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.services.history_store import HistoryStore
+from backend.app.services.trend_aggregator import RunningStats, TrendAggregator
+
+def _result(timestamp: float, score: float, pelvic_tilt: float = 10.0) -> PostureAnalysisResult:
+    return PostureAnalysisResult(
+        landmarks={},
+        metrics=PostureMetrics(
+            pelvic_tilt=pelvic_tilt, thoracic_kyphosis=35.0, cervical_lordosis=25.0,
+            shoulder_height_difference=2.0, head_forward_posture=3.0, lumbar_lordosis=40.0,
+            scapular_protraction=1.0, trunk_lateral_deviation=0.5
+        ),
+        overall_score=score,
+        image_width=640,
+        image_height=480,
+        confidence=0.9,
+        analysis_timestamp=datetime.fromtimestamp(timestamp)
+    )
+
+class TestRunningStats:
+
+    def test_matches_batch_statistics(self):
+        """Welford mean/variance, EMA and min/max agree with a full recomputation"""
+        values = [3.0, 7.5, 1.25, 9.0, 4.0, 6.5]
+        stats = RunningStats(recent_size=3)
+        for value in values:
+            stats.update(value, alpha=0.5)
+
+        ema = values[0]
+        for value in values[1:]:
+            ema = 0.5 * value + 0.5 * ema
+
+        assert stats.count == 6
+        assert math.isclose(stats.mean, statistics.mean(values))
+        assert math.isclose(stats.variance, statistics.variance(values))
+        assert math.isclose(stats.ema, ema)
+        assert (stats.min, stats.max) == (1.25, 9.0)
+        assert list(stats.recent) == [9.0, 4.0, 6.5]
+
+class TestTrendAggregator:
+
+    @pytest.fixture(autouse=True)
+    def setup_store(self, tmp_path):
+        self.db_path = str(tmp_path / 'history.db')
+        self.store = HistoryStore(self.db_path, pool_size=2)
+        yield
+        self.store.close()
+
+    def test_record_updates_summary(self):
+        """Each analysis is stored and folded into the per-metric statistics"""
+        aggregator = TrendAggregator(self.store, recent_size=2, baseline_size=2)
+        for i, score in enumerate([50.0, 60.0, 80.0, 90.0]):
+            aggregator.record('alice', _result(1000.0 + i, score, pelvic_tilt=10.0 + i))
+
+        summary = aggregator.summary('alice')
+
+        assert self.store.count('alice') == 4
+        assert summary['count'] == 4
+        assert summary['metrics']['overall_score']['mean'] == 70.0
+        assert summary['metrics']['pelvic_tilt']['min'] == 10.0
+        assert summary['metrics']['pelvic_tilt']['max'] == 13.0
+        assert summary['trend_data']['overall_score'] == [80.0, 90.0]
+        # EMA (alpha 0.2) of the scores minus the mean of the first two
+        assert summary['improvement_score'] == pytest.approx(64.08 - 55.0)
+
+    def test_state_survives_restart_without_history_scan(self):
+        """A new aggregator resumes from the saved state instead of rescanning history"""
+        aggregator = TrendAggregator(self.store)
+        for i in range(5):
+            aggregator.record('alice', _result(1000.0 + i, 50.0 + i))
+        expected = aggregator.summary('alice')
+
+        restarted = TrendAggregator(self.store)
+        restarted.history.series = None  # 履歴を走査すると失敗する
+
+        assert restarted.summary('alice') == expected
+        restarted.record('alice', _result(1005.0, 55.0))
+        assert restarted.summary('alice')['count'] == 6
+        assert restarted.rebuilds == 0
+
+    def test_rebuilds_from_existing_history(self):
+        """History recorded before trend state existed is aggregated once"""
+        for i in range(3):
+            self.store.add('bob', _result(1000.0 + i, 60.0 + i))
+
+        aggregator = TrendAggregator(self.store)
+
+        assert aggregator.summary('bob')['metrics']['overall_score']['mean'] == 61.0
+        assert aggregator.rebuilds == 1
+        assert self.store.trend_state('bob') is not None
+
+    def test_duplicate_analysis_is_counted_once(self):
+        """Recording an analysis_id that is already stored leaves the statistics unchanged"""
+        aggregator = TrendAggregator(self.store)
+        aggregator.record('alice', _result(1000.0, 50.0), analysis_id='a1')
+        expected = aggregator.summary('alice')
+
+        assert aggregator.record('alice', _result(1000.0, 50.0), analysis_id='a1') == 'a1'
+
+        assert aggregator.summary('alice') == expected
+        assert TrendAggregator(self.store).summary('alice') == expected
+        assert self.store.count('alice') == 1
+
+    def test_failed_write_keeps_cached_summary(self, monkeypatch):
+        """The cached statistics only change once the history write has committed"""
+        aggregator = TrendAggregator(self.store)
+        aggregator.record('alice', _result(1000.0, 50.0))
+        expected = aggregator.summary('alice')
+
+        def failing_add(*args, **kwargs):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(self.store, 'add', failing_add)
+        with pytest.raises(RuntimeError):
+            aggregator.record('alice', _result(1001.0, 90.0))
+
+        assert aggregator.summary('alice') == expected
+
+    def test_delete_user_clears_state(self):
+        """Deleting a user's history also drops the trend state"""
+        aggregator = TrendAggregator(self.store)
+        aggregator.record('alice', _result(1000.0, 50.0))
+
+        self.store.delete_user('alice')
+        aggregator.forget('alice')
+
+        assert self.store.trend_state('alice') is None
+        assert aggregator.summary('alice')['count'] == 0
@@ -2,50 +2,58 @@ import numpy as np
 import math
 from typing import Dict, Tuple, List
 
+from backend.app.utils.landmark_array import LandmarkArray, LANDMARK_INDEX, NUM_LANDMARKS, point_coords
+
 class AngleCalculator:
     """Utility class for calculating posture-related angles and measurements"""
     
+    # Points may be landmark dicts ({'x', 'y', ...}) or LandmarkArray rows / (x, y) pairs
+    
     def calculate_angle(self, point1: Dict, point2: Dict, point3: Dict) -> float:
         """Calculate angle between three points"""
-        # Convert to numpy arrays
-        p1 = np.array([point1['x'], point1['y']])
-        p2 = np.array([point2['x'], point2['y']])
-        p3 = np.array([point3['x'], point3['y']])
+        x1, y1 = point_coords(point1)
+        x2, y2 = point_coords(point2)
+        x3, y3 = point_coords(point3)
         
         # Calculate vectors
-        v1 = p1 - p2
-        v2 = p3 - p2
+        v1x, v1y = x1 - x2, y1 - y2
+        v2x, v2y = x3 - x2, y3 - y2
         
         # Handle edge case where vectors are zero
-        norm_v1 = np.linalg.norm(v1)
-        norm_v2 = np.linalg.norm(v2)
+        norm_v1 = math.hypot(v1x, v1y)
+        norm_v2 = math.hypot(v2x, v2y)
         
         if norm_v1 == 0 or norm_v2 == 0:
             return 0.0  # Return 0 for degenerate cases
         
         # Calculate angle
-        cos_angle = np.dot(v1, v2) / (norm_v1 * norm_v2)
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)  # Prevent numerical errors
-        angle = np.arccos(cos_angle)
+        cos_angle = (v1x * v2x + v1y * v2y) / (norm_v1 * norm_v2)
+        cos_angle = max(-1.0, min(1.0, cos_angle))  # Prevent numerical errors
         
-        return math.degrees(angle)
+        return math.degrees(math.acos(cos_angle))
     
     def calculate_distance(self, point1: Dict, point2: Dict) -> float:
         """Calculate Euclidean distance between two points"""
-        return math.sqrt((point1['x'] - point2['x'])**2 + (point1['y'] - point2['y'])**2)
+        x1, y1 = point_coords(point1)
+        x2, y2 = point_coords(point2)
+        return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
     
     def calculate_midpoint(self, point1: Dict, point2: Dict) -> Dict:
         """Calculate midpoint between two points"""
+        x1, y1 = point_coords(point1)
+        x2, y2 = point_coords(point2)
         return {
-            'x': (point1['x'] + point2['x']) / 2,
-            'y': (point1['y'] + point2['y']) / 2
+            'x': (x1 + x2) / 2,
+            'y': (y1 + y2) / 2
         }
     
     def calculate_pelvic_tilt(self, left_hip: Dict, right_hip: Dict) -> float:
         """Calculate pelvic tilt angle"""
         # Calculate angle of hip line relative to horizontal
-        dx = right_hip['x'] - left_hip['x']
-        dy = right_hip['y'] - left_hip['y']
+        lx, ly = point_coords(left_hip)
+        rx, ry = point_coords(right_hip)
+        dx = rx - lx
+        dy = ry - ly
         
         angle_rad = math.atan2(dy, dx)
         angle_deg = math.degrees(angle_rad)
@@ -82,7 +90,8 @@ class AngleCalculator:
         shoulder_mid = self.calculate_midpoint(left_shoulder, right_shoulder)
         
         # Calculate head angle relative to shoulders
-        head_vector = {'x': nose['x'] - ear_mid['x'], 'y': nose['y'] - ear_mid['y']}
+        nose_x, nose_y = point_coords(nose)
+        head_vector = {'x': nose_x - ear_mid['x'], 'y': nose_y - ear_mid['y']}
         neck_vector = {'x': ear_mid['x'] - shoulder_mid['x'], 'y': ear_mid['y'] - shoulder_mid['y']}
         
         # Calculate angle between head and neck vectors
@@ -105,7 +114,7 @@ class AngleCalculator:
                                            image_size: Tuple[int, int]) -> float:
         """Calculate shoulder height difference in cm (estimated)"""
         # Calculate vertical difference (normalized coordinates are 0-1)
-        height_diff_normalized = abs(left_shoulder['y'] - right_shoulder['y'])
+        height_diff_normalized = abs(point_coords(left_shoulder)[1] - point_coords(right_shoulder)[1])
         
         # Convert to approximate cm (assuming average person height ~170cm)
         # Since coordinates are normalized, multiply by image height first
@@ -176,7 +185,7 @@ class AngleCalculator:
         hip_mid = self.calculate_midpoint(left_hip, right_hip)
         
         # Calculate horizontal deviation of head from hip center
-        lateral_deviation = abs(nose['x'] - hip_mid['x'])
+        lateral_deviation = abs(point_coords(nose)[0] - hip_mid['x'])
         
         # Convert to approximate cm
         deviation_cm = lateral_deviation * 100  # Scale factor
@@ -207,8 +216,8 @@ class AngleCalculator:
         # This is a simplified 2D calculation
         # In practice, you'd need more foot landmarks
         
-        left_arch = abs(left_foot_index['y'] - left_heel['y'])
-        right_arch = abs(right_foot_index['y'] - right_heel['y'])
+        left_arch = abs(point_coords(left_foot_index)[1] - point_coords(left_heel)[1])
+        right_arch = abs(point_coords(right_foot_index)[1] - point_coords(right_heel)[1])
         
         return {
             'left_arch_height': left_arch * 10,  # Scale to approximate cm
@@ -251,19 +260,23 @@ class AngleCalculator:
         # Q-angle is the angle between the quadriceps and patellar tendon
         # Simplified calculation using hip-knee-ankle alignment
         
+        hip_x, hip_y = point_coords(hip)
+        knee_x, knee_y = point_coords(knee)
+        ankle_x, ankle_y = point_coords(ankle)
+        
         # Calculate vectors
-        hip_to_knee = np.array([knee['x'] - hip['x'], knee['y'] - hip['y']])
-        knee_to_ankle = np.array([ankle['x'] - knee['x'], ankle['y'] - knee['y']])
+        hk_x, hk_y = knee_x - hip_x, knee_y - hip_y
+        ka_x, ka_y = ankle_x - knee_x, ankle_y - knee_y
         
         # Calculate angle between vectors
-        norm_hk = np.linalg.norm(hip_to_knee)
-        norm_ka = np.linalg.norm(knee_to_ankle)
+        norm_hk = math.hypot(hk_x, hk_y)
+        norm_ka = math.hypot(ka_x, ka_y)
         
         if norm_hk == 0 or norm_ka == 0:
             return 0.0
         
-        cos_angle = np.dot(hip_to_knee, knee_to_ankle) / (norm_hk * norm_ka)
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
+        cos_angle = (hk_x * ka_x + hk_y * ka_y) / (norm_hk * norm_ka)
+        cos_angle = max(-1.0, min(1.0, cos_angle))
         
         q_angle = math.degrees(math.acos(cos_angle))
         
@@ -292,7 +305,8 @@ class AngleCalculator:
         # Using heel-ankle-foot_index triangle
         
         # Create a horizontal reference line at heel level
-        heel_horizontal = {'x': heel['x'] + 0.1, 'y': heel['y']}
+        heel_x, heel_y = point_coords(heel)
+        heel_horizontal = (heel_x + 0.1, heel_y)
         
         # Calculate angle between heel-ankle line and horizontal
         heel_angle = self.calculate_angle(heel_horizontal, heel, ankle)
@@ -308,20 +322,22 @@ class AngleCalculator:
     def calculate_seated_posture_metrics(self, landmarks: Dict) -> Dict[str, float]:
         """Calculate posture metrics specifically for seated position"""
         
-        # Get key landmarks
-        nose = landmarks.get('nose')
-        left_ear = landmarks.get('left_ear')
-        right_ear = landmarks.get('right_ear')
-        left_shoulder = landmarks.get('left_shoulder')
-        right_shoulder = landmarks.get('right_shoulder')
-        left_hip = landmarks.get('left_hip')
-        right_hip = landmarks.get('right_hip')
-        
-        if not all([nose, left_shoulder, right_shoulder, left_hip, right_hip]):
+        landmarks = LandmarkArray.coerce(landmarks)
+        
+        if not landmarks.has('nose', 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'):
             return {}
         
+        # Get key landmarks
+        nose = landmarks.xy('nose')
+        left_shoulder = landmarks.xy('left_shoulder')
+        right_shoulder = landmarks.xy('right_shoulder')
+        left_hip = landmarks.xy('left_hip')
+        right_hip = landmarks.xy('right_hip')
+        
         # Calculate midpoints
-        ear_mid = self.calculate_midpoint(left_ear, right_ear) if left_ear and right_ear else None
+        ear_mid = None
+        if landmarks.has('left_ear', 'right_ear'):
+            ear_mid = self.calculate_midpoint(landmarks.xy('left_ear'), landmarks.xy('right_ear'))
         shoulder_mid = self.calculate_midpoint(left_shoulder, right_shoulder)
         hip_mid = self.calculate_midpoint(left_hip, right_hip)
         
@@ -373,7 +389,7 @@ class AngleCalculator:
         
         if not ear_mid:
             # Fallback: use nose-shoulder relationship
-            horizontal_offset = abs(nose['x'] - shoulder_mid['x'])
+            horizontal_offset = abs(point_coords(nose)[0] - shoulder_mid['x'])
             return horizontal_offset * 50  # Scale factor
         
         # Calculate head forward position relative to shoulders
@@ -413,7 +429,7 @@ class AngleCalculator:
         """Calculate lateral (side-to-side) lean in seated position"""
         
         # Calculate the alignment of head-shoulders-hips
-        head_shoulder_offset = abs(nose['x'] - shoulder_mid['x'])
+        head_shoulder_offset = abs(point_coords(nose)[0] - shoulder_mid['x'])
         shoulder_hip_offset = abs(shoulder_mid['x'] - hip_mid['x'])
         
         # Average lateral deviation
@@ -422,4 +438,248 @@ class AngleCalculator:
         # Convert to degrees (approximate)
         lateral_lean = lateral_deviation * 45  # Scale factor
         
-        return min(30, lateral_lean)  # Cap at 30 degrees for seated posture
\ No newline at end of file
+        return min(30, lateral_lean)  # Cap at 30 degrees for seated posture
+
+def _as_batch(landmarks: np.ndarray) -> np.ndarray:
+    """Normalize landmark tensors to float64 (N, 33, C) with C >= 2"""
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[np.newaxis]
+    if landmarks.ndim != 3 or landmarks.shape[1] != NUM_LANDMARKS or landmarks.shape[2] < 2:
+        raise ValueError(f"Expected landmarks of shape (N, {NUM_LANDMARKS}, 3), got {landmarks.shape}")
+    return landmarks
+
+
+class BatchAngleCalculator:
+    """Vectorized counterpart of AngleCalculator operating on (N, 33, 3) landmark tensors
+    
+    Every method returns (N,) arrays (or dicts of (N,) arrays) with the same formulas,
+    clamps and degenerate-case handling as the per-pose AngleCalculator. Rows with
+    undetected landmarks (NaN) produce NaN results.
+    """
+    
+    # === Primitive operations on (N, 2) point arrays ===
+    
+    @staticmethod
+    def point(landmarks: np.ndarray, name: str) -> np.ndarray:
+        """Select the (N, 2) x/y coordinates of one landmark"""
+        return landmarks[:, LANDMARK_INDEX[name], :2]
+    
+    @staticmethod
+    def midpoint(point1: np.ndarray, point2: np.ndarray) -> np.ndarray:
+        """Midpoints of two (N, 2) point arrays"""
+        return (point1 + point2) * 0.5
+    
+    @staticmethod
+    def distance(point1: np.ndarray, point2: np.ndarray) -> np.ndarray:
+        """Euclidean distances between two (..., 2) point arrays"""
+        delta = point1 - point2
+        return np.hypot(delta[..., 0], delta[..., 1])
+    
+    @staticmethod
+    def vector_angle(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+        """Angles in degrees between (..., 2) vectors (0 for zero-length vectors)"""
+        norm1 = np.hypot(v1[..., 0], v1[..., 1])
+        norm2 = np.hypot(v2[..., 0], v2[..., 1])
+        denom = norm1 * norm2
+        degenerate = denom == 0
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cos_angle = (v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]) / np.where(degenerate, 1.0, denom)
+        angle = np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+        
+        return np.where(degenerate, 0.0, angle)
+    
+    def angle(self, point1: np.ndarray, point2: np.ndarray, point3: np.ndarray) -> np.ndarray:
+        """Angles at point2 formed by point1-point2-point3"""
+        return self.vector_angle(point1 - point2, point3 - point2)
+    
+    @staticmethod
+    def trunk_angle(shoulder_mid: np.ndarray, hip_mid: np.ndarray) -> np.ndarray:
+        """Signed trunk angle from vertical (positive = forward)"""
+        return np.degrees(np.arctan2(shoulder_mid[:, 0] - hip_mid[:, 0],
+                                     hip_mid[:, 1] - shoulder_mid[:, 1]))
+    
+    def _mid(self, landmarks: np.ndarray, name1: str, name2: str) -> np.ndarray:
+        return self.midpoint(self.point(landmarks, name1), self.point(landmarks, name2))
+    
+    # === Standing posture metrics ===
+    
+    def calculate_pelvic_tilt(self, landmarks: np.ndarray) -> np.ndarray:
+        """Pelvic tilt angles"""
+        landmarks = _as_batch(landmarks)
+        delta = self.point(landmarks, 'right_hip') - self.point(landmarks, 'left_hip')
+        return np.abs(np.degrees(np.arctan2(delta[:, 1], delta[:, 0])))
+    
+    def calculate_thoracic_kyphosis(self, landmarks: np.ndarray) -> np.ndarray:
+        """Thoracic kyphosis angles"""
+        landmarks = _as_batch(landmarks)
+        delta = self._mid(landmarks, 'left_shoulder', 'right_shoulder') - self._mid(landmarks, 'left_hip', 'right_hip')
+        trunk_angle = np.degrees(np.arctan2(np.abs(delta[:, 0]), np.abs(delta[:, 1])))
+        return np.where(delta[:, 1] == 0, 0.0, np.clip(trunk_angle, 0, 60))
+    
+    def calculate_cervical_lordosis(self, landmarks: np.ndarray) -> np.ndarray:
+        """Cervical lordosis (head-neck alignment) angles"""
+        landmarks = _as_batch(landmarks)
+        ear_mid = self._mid(landmarks, 'left_ear', 'right_ear')
+        shoulder_mid = self._mid(landmarks, 'left_shoulder', 'right_shoulder')
+        return self.vector_angle(self.point(landmarks, 'nose') - ear_mid, ear_mid - shoulder_mid)
+    
+    def calculate_shoulder_height_difference(self, landmarks: np.ndarray,
+                                             image_size: Tuple[int, int]) -> np.ndarray:
+        """Shoulder height differences in cm (estimated)"""
+        landmarks = _as_batch(landmarks)
+        height_diff = np.abs(self.point(landmarks, 'left_shoulder')[:, 1] - self.point(landmarks, 'right_shoulder')[:, 1])
+        # Same pixel conversion as AngleCalculator (assuming ~170cm body height)
+        return (height_diff * image_size[1]) / (image_size[1] / 170)
+    
+    def calculate_head_forward_posture(self, landmarks: np.ndarray) -> np.ndarray:
+        """Head forward posture distances"""
+        landmarks = _as_batch(landmarks)
+        offset = self._mid(landmarks, 'left_ear', 'right_ear')[:, 0] - self._mid(landmarks, 'left_shoulder', 'right_shoulder')[:, 0]
+        return np.abs(offset) * 100
+    
+    def calculate_lumbar_lordosis(self, landmarks: np.ndarray) -> np.ndarray:
+        """Lumbar lordosis angles"""
+        landmarks = _as_batch(landmarks)
+        trunk_angle = self.trunk_angle(self._mid(landmarks, 'left_shoulder', 'right_shoulder'),
+                                        self._mid(landmarks, 'left_hip', 'right_hip'))
+        return np.abs(trunk_angle) + 30
+    
+    def calculate_scapular_protraction(self, landmarks: np.ndarray) -> np.ndarray:
+        """Scapular protraction estimates"""
+        landmarks = _as_batch(landmarks)
+        shoulder_width = self.distance(self.point(landmarks, 'left_shoulder'), self.point(landmarks, 'right_shoulder'))
+        elbow_width = self.distance(self.point(landmarks, 'left_elbow'), self.point(landmarks, 'right_elbow'))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            protraction = np.maximum(0, (elbow_width / shoulder_width - 0.8) * 10)
+        return np.where(shoulder_width == 0, 0.0, protraction)
+    
+    def calculate_trunk_lateral_deviation(self, landmarks: np.ndarray) -> np.ndarray:
+        """Trunk lateral deviations"""
+        landmarks = _as_batch(landmarks)
+        hip_mid = self._mid(landmarks, 'left_hip', 'right_hip')
+        return np.abs(self.point(landmarks, 'nose')[:, 0] - hip_mid[:, 0]) * 100
+    
+    # === Lower limb metrics ===
+    
+    def _knee_angles(self, landmarks: np.ndarray, side: str) -> np.ndarray:
+        return self.angle(self.point(landmarks, f'{side}_hip'),
+                          self.point(landmarks, f'{side}_knee'),
+                          self.point(landmarks, f'{side}_ankle'))
+    
+    def calculate_knee_valgus_varus(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """Knee valgus/varus angles"""
+        landmarks = _as_batch(landmarks)
+        return {
+            'left_knee_angle': np.abs(180 - self._knee_angles(landmarks, 'left')),
+            'right_knee_angle': np.abs(180 - self._knee_angles(landmarks, 'right'))
+        }
+    
+    def calculate_q_angle(self, landmarks: np.ndarray, side: str) -> np.ndarray:
+        """Q-angles (deviation from straight) for one leg"""
+        landmarks = _as_batch(landmarks)
+        hip = self.point(landmarks, f'{side}_hip')
+        knee = self.point(landmarks, f'{side}_knee')
+        ankle = self.point(landmarks, f'{side}_ankle')
+        return np.abs(180 - self.vector_angle(knee - hip, ankle - knee))
+    
+    def calculate_knee_valgus_varus_enhanced(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """Knee deviation, type and Q-angle for both legs"""
+        landmarks = _as_batch(landmarks)
+        left_deviation = 180 - self._knee_angles(landmarks, 'left')
+        right_deviation = 180 - self._knee_angles(landmarks, 'right')
+        
+        return {
+            'left_knee_deviation': np.abs(left_deviation),
+            'right_knee_deviation': np.abs(right_deviation),
+            'left_knee_type': np.where(left_deviation > 0, 'valgus', 'varus'),
+            'right_knee_type': np.where(right_deviation > 0, 'valgus', 'varus'),
+            'left_q_angle': self.calculate_q_angle(landmarks, 'left'),
+            'right_q_angle': self.calculate_q_angle(landmarks, 'right'),
+            'average_deviation': (np.abs(left_deviation) + np.abs(right_deviation)) / 2
+        }
+    
+    def calculate_foot_arch_height(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """Estimated foot arch heights"""
+        landmarks = _as_batch(landmarks)
+        return {
+            f'{side}_arch_height': np.abs(self.point(landmarks, f'{side}_foot_index')[:, 1]
+                                          - self.point(landmarks, f'{side}_heel')[:, 1]) * 10
+            for side in ('left', 'right')
+        }
+    
+    def single_heel_inclination(self, landmarks: np.ndarray, side: str) -> np.ndarray:
+        # Angle between the horizontal through the heel and the heel-ankle line
+        heel_to_ankle = self.point(landmarks, f'{side}_ankle') - self.point(landmarks, f'{side}_heel')
+        horizontal = np.broadcast_to(np.array([0.1, 0.0]), heel_to_ankle.shape)
+        heel_angle = self.vector_angle(horizontal, heel_to_ankle)
+        return np.minimum(45, np.abs(heel_angle - 90))
+    
+    def calculate_heel_inclination(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """Heel inclination angles"""
+        landmarks = _as_batch(landmarks)
+        left = self.single_heel_inclination(landmarks, 'left')
+        right = self.single_heel_inclination(landmarks, 'right')
+        
+        return {
+            'left_heel_inclination': left,
+            'right_heel_inclination': right,
+            'average_inclination': (left + right) / 2,
+            'inclination_difference': np.abs(left - right)
+        }
+    
+    # === Seated posture metrics ===
+    
+    def calculate_seated_posture_metrics(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """Seated posture metrics"""
+        landmarks = _as_batch(landmarks)
+        nose = self.point(landmarks, 'nose')
+        ear_mid = self._mid(landmarks, 'left_ear', 'right_ear')
+        shoulder_mid = self._mid(landmarks, 'left_shoulder', 'right_shoulder')
+        hip_mid = self._mid(landmarks, 'left_hip', 'right_hip')
+        
+        trunk_angle = self.trunk_angle(shoulder_mid, hip_mid)
+        
+        # Head-neck position, falling back to nose-shoulder offset when ears are missing
+        head_forward = np.abs(ear_mid[:, 0] - shoulder_mid[:, 0])
+        neck_angle = self.angle(shoulder_mid, ear_mid, nose)
+        head_neck_position = np.where(
+            np.isnan(ear_mid[:, 0]),
+            np.abs(nose[:, 0] - shoulder_mid[:, 0]) * 50,
+            np.minimum(20, head_forward * 30 + np.abs(neck_angle - 90) * 0.5)
+        )
+        
+        lateral_deviation = (np.abs(nose[:, 0] - shoulder_mid[:, 0]) + np.abs(shoulder_mid[:, 0] - hip_mid[:, 0])) / 2
+        
+        return {
+            'seated_pelvic_tilt': np.minimum(45, np.abs(trunk_angle)),
+            'head_neck_position': head_neck_position,
+            'trunk_forward_lean': np.minimum(45, np.where(trunk_angle > 0, np.abs(trunk_angle), 0.0)),
+            'trunk_backward_lean': np.minimum(30, np.where(trunk_angle > 0, 0.0, np.abs(trunk_angle))),
+            'lateral_lean': np.minimum(30, lateral_deviation * 45),
+            'shoulder_elevation': self.calculate_shoulder_height_difference(landmarks, (1, 1))
+        }
+    
+    def calculate_all(self, landmarks: np.ndarray, image_size: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        """Every standing, lower limb and seated metric as flat (N,) arrays"""
+        landmarks = _as_batch(landmarks)
+        
+        results = {
+            'pelvic_tilt': self.calculate_pelvic_tilt(landmarks),
+            'thoracic_kyphosis': self.calculate_thoracic_kyphosis(landmarks),
+            'cervical_lordosis': self.calculate_cervical_lordosis(landmarks),
+            'shoulder_height_difference': self.calculate_shoulder_height_difference(landmarks, image_size),
+            'head_forward_posture': self.calculate_head_forward_posture(landmarks),
+            'lumbar_lordosis': self.calculate_lumbar_lordosis(landmarks),
+            'scapular_protraction': self.calculate_scapular_protraction(landmarks),
+            'trunk_lateral_deviation': self.calculate_trunk_lateral_deviation(landmarks),
+        }
+        
+        knee = self.calculate_knee_valgus_varus_enhanced(landmarks)
+        results.update({key: value for key, value in knee.items() if not key.endswith('_type')})
+        results.update(self.calculate_heel_inclination(landmarks))
+        results.update(self.calculate_seated_posture_metrics(landmarks))
+        
+        return results
@@ -0,0 +1,392 @@
+"""
+分析結果バイナリ形式
+PostureAnalysisResult をモバイル回線向けのコンパクトなバイナリにエンコード・デコードする。
+ランドマークは int16 量子化、判定・姿勢タイプ・既知のキーは列挙コードで表現する
+"""
+
+import struct
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.app.models.posture_result import PostureAnalysisResult
+from backend.app.utils.landmark_array import NUM_LANDMARKS, LandmarkArray, VISIBILITY, X
+from backend.app.utils.metric_registry import METRIC_REGISTRY
+from backend.app.utils.pose_detector import ORIENTATION_CODE, ORIENTATION_CODES, SYMMETRY_PAIRS, VALIDATION_CHECKS
+from backend.app.utils.posture_classifier import (
+    METRIC_JUDGMENTS, NO_DATA_JUDGMENT, OVERALL_JUDGMENTS, POSTURE_TYPES
+)
+from backend.app.utils.suggestion_catalog import METRIC_SUGGESTIONS, TYPE_SUGGESTIONS, get_suggestion_catalog
+
+BINARY_MEDIA_TYPE = 'application/vnd.posture-result+binary'
+
+# === レイアウト（リトルエンディアン） ===
+#
+# ヘッダ (32 bytes)
+#   magic 'PSRB' | version u8 | orientation u8 (ORIENTATION_CODES) | flags u16 |
+#   image_width u32 | image_height u32 | overall_score f32 | confidence f32 |
+#   analysis_timestamp i64（1970-01-01 からのマイクロ秒、ローカル時刻のまま）
+# ランドマーク（FLAG_LANDMARKS 時のみ。fields で除外された場合は省略）
+#   存在マスク u64（bit i = LANDMARK_NAMES[i]）、検出点ごとに
+#   x, y, z int16（値 * LANDMARK_SCALE）| visibility u8（0..254、255 は未設定）
+# metrics
+#   基本8メトリクス f32（PostureMetrics のフィールド順、NaN 可）
+#   FLAG_ADDITIONAL 時: knee_valgus_varus, heel_inclination, seated_metrics の値
+#   FLAG_REGISTRY 時: registry_metrics（基本フィールド以外のレジストリメトリクス）の値
+# 以降 flags の順に: symmetry_scores, validation_results, posture_type,
+#   color_judgments, overall_color_judgment の値、
+#   improvement_suggestions（primary_type の文字列コード u8 + 要改善メトリクスのマスク u32、
+#   カタログと一致しない場合は TAG_LIST の値）
+#
+# 値 = タグ u8 + ペイロード
+#   TAG_NONE / TAG_FALSE / TAG_TRUE: なし | TAG_FLOAT: f32 |
+#   TAG_STR_CODE: u8（STRING_VALUES）| TAG_STR: u16 長 + UTF-8 |
+#   TAG_LIST: u16 件数 + 値... | TAG_MAP: u16 件数 + (キー, 値)... |
+#   TAG_JUDGMENT / TAG_OVERALL_JUDGMENT: u8（METRIC_JUDGMENTS / OVERALL_JUDGMENTS）| TAG_NO_DATA: なし
+# キー = u8（KEY_NAMES のコード）、255 の場合は u8 長 + UTF-8
+
+FORMAT_VERSION = 2
+MAGIC = b'PSRB'
+LANDMARK_SCALE = 10000.0    # 正規化座標 ±3.2767 まで、分解能 1e-4
+VISIBILITY_SCALE = 254.0
+VISIBILITY_UNSET = 255
+INLINE_KEY = 255
+
+FLAG_SEATED = 1 << 0
+FLAG_ADDITIONAL = 1 << 1
+FLAG_SYMMETRY = 1 << 2
+FLAG_VALIDATION = 1 << 3
+FLAG_CLASSIFICATION = 1 << 4
+FLAG_JUDGMENTS = 1 << 5
+FLAG_OVERALL_JUDGMENT = 1 << 6
+FLAG_SUGGESTIONS = 1 << 7
+FLAG_LANDMARKS = 1 << 8
+FLAG_REGISTRY = 1 << 9
+
+(TAG_NONE, TAG_FALSE, TAG_TRUE, TAG_FLOAT, TAG_STR_CODE, TAG_STR, TAG_LIST, TAG_MAP,
+ TAG_JUDGMENT, TAG_OVERALL_JUDGMENT, TAG_NO_DATA) = range(11)
+
+CORE_METRICS: Tuple[str, ...] = METRIC_REGISTRY.core_names
+ADDITIONAL_FIELDS = ('knee_valgus_varus', 'heel_inclination', 'seated_metrics')
+
+# 既知のキー（末尾への追加のみ可。レジストリの追加メトリクスは最後に続く）
+_FIXED_KEYS: Tuple[str, ...] = (
+    *CORE_METRICS, *ADDITIONAL_FIELDS,
+    'left_knee_deviation', 'right_knee_deviation', 'left_knee_type', 'right_knee_type',
+    'left_q_angle', 'right_q_angle', 'average_deviation',
+    'left_heel_inclination', 'right_heel_inclination', 'average_inclination', 'inclination_difference',
+    'seated_pelvic_tilt', 'head_neck_position', 'trunk_forward_lean', 'trunk_backward_lean',
+    'lateral_lean', 'shoulder_elevation',
+    *(f"{left}_{right}_symmetry" for left, right in SYMMETRY_PAIRS),
+    *VALIDATION_CHECKS,
+    'primary_type', 'classifications', 'description',
+)
+KEY_NAMES: Tuple[str, ...] = _FIXED_KEYS + tuple(name for name in METRIC_REGISTRY.names if name not in _FIXED_KEYS)
+
+# 既知の文字列値（姿勢タイプ・膝のタイプ）
+STRING_VALUES: Tuple[str, ...] = (*(t.value for t in POSTURE_TYPES), 'valgus', 'varus')
+
+_KEY_CODE = {name: code for code, name in enumerate(KEY_NAMES)}
+_STRING_CODE = {value: code for code, value in enumerate(STRING_VALUES)}
+_METRIC_JUDGMENT_CODE = {tuple(j.items()): code for code, j in enumerate(METRIC_JUDGMENTS)}
+_OVERALL_JUDGMENT_CODE = {tuple(j.items()): code for code, j in enumerate(OVERALL_JUDGMENTS)}
+_NO_DATA_KEY = tuple(NO_DATA_JUDGMENT.items())
+
+# コード・マスクの幅に収まることを確認（超える場合はレイアウトを変更して FORMAT_VERSION を上げる）
+_SUGGESTION_MASK_BITS = 32
+_MAX_COUNT = 0xFFFF
+assert len(KEY_NAMES) < INLINE_KEY, "KEY_NAMES must fit in a u8 key code"
+assert len(STRING_VALUES) < 255, "STRING_VALUES must fit in a u8 string code"
+assert len(METRIC_SUGGESTIONS) <= _SUGGESTION_MASK_BITS, "METRIC_SUGGESTIONS must fit in the u32 suggestion mask"
+
+_HEADER = struct.Struct('<4sBBHIIffq')
+_CORE = struct.Struct(f'<{len(CORE_METRICS)}f')
+_LANDMARK_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2'), ('z', '<i2'), ('visibility', 'u1')])
+_EPOCH = datetime(1970, 1, 1)
+
+
+# === エンコード ===
+
+def _write_key(out: bytearray, key: str):
+    code = _KEY_CODE.get(key)
+    if code is None:
+        raw = key.encode('utf-8')
+        if len(raw) > 255:
+            raise ValueError(f"Key too long for binary result: {key[:32]}...")
+        out += struct.pack('<BB', INLINE_KEY, len(raw)) + raw
+    else:
+        out.append(code)
+
+
+def _count(value) -> int:
+    if len(value) > _MAX_COUNT:
+        raise ValueError(f"Too many items for binary result ({len(value)})")
+    return len(value)
+
+
+def _write_value(out: bytearray, value: Any):
+    if value is None:
+        out.append(TAG_NONE)
+    elif isinstance(value, (bool, np.bool_)):
+        out.append(TAG_TRUE if value else TAG_FALSE)
+    elif isinstance(value, (int, float, np.number)):
+        out += struct.pack('<Bf', TAG_FLOAT, value)
+    elif isinstance(value, str):
+        code = _STRING_CODE.get(value)
+        if code is None:
+            raw = value.encode('utf-8')
+            if len(raw) > _MAX_COUNT:
+                raise ValueError(f"String too long for binary result ({len(raw)} bytes)")
+            out += struct.pack('<BH', TAG_STR, len(raw)) + raw
+        else:
+            out += struct.pack('<BB', TAG_STR_CODE, code)
+    elif isinstance(value, Mapping):
+        # カラー判定は共有テーブルのコードで表現
+        items = tuple(value.items()) if 'color_code' in value else None
+        if items in _METRIC_JUDGMENT_CODE:
+            out += struct.pack('<BB', TAG_JUDGMENT, _METRIC_JUDGMENT_CODE[items])
+        elif items in _OVERALL_JUDGMENT_CODE:
+            out += struct.pack('<BB', TAG_OVERALL_JUDGMENT, _OVERALL_JUDGMENT_CODE[items])
+        elif items == _NO_DATA_KEY:
+            out.append(TAG_NO_DATA)
+        else:
+            out += struct.pack('<BH', TAG_MAP, _count(value))
+            for key, item in value.items():
+                _write_key(out, key)
+                _write_value(out, item)
+    elif isinstance(value, (list, tuple)):
+        out += struct.pack('<BH', TAG_LIST, _count(value))
+        for item in value:
+            _write_value(out, item)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} in binary result")
+
+
+def _timestamp_us(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _encode_landmarks(out: bytearray, landmarks):
+    data = (LandmarkArray.empty() if landmarks is None else LandmarkArray.coerce(landmarks)).data
+    present = ~np.isnan(data[:, X])
+    rows = data[present].astype(np.float64)
+
+    packed = np.empty(len(rows), dtype=_LANDMARK_DTYPE)
+    for field, column in zip(('x', 'y', 'z'), rows[:, :VISIBILITY].T):
+        packed[field] = np.clip(np.rint(column * LANDMARK_SCALE), -32767, 32767)
+    visibility = rows[:, VISIBILITY]
+    packed['visibility'] = np.where(
+        np.isnan(visibility), VISIBILITY_UNSET, np.rint(np.clip(np.nan_to_num(visibility), 0, 1) * VISIBILITY_SCALE)
+    )
+
+    mask = sum(1 << int(i) for i in np.flatnonzero(present))
+    out += struct.pack('<Q', mask) + packed.tobytes()
+
+
+def _plain_suggestions(suggestions) -> list:
+    return [
+        {key: list(value) if isinstance(value, tuple) else value for key, value in s.items()} for s in suggestions
+    ]
+
+
+def _suggestion_signature(suggestions) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """改善提案がカタログのエントリと一致する場合、その (姿勢タイプ, シグネチャ) を取得"""
+    plain = _plain_suggestions(suggestions)
+    signature = tuple(s['target_metric'] for s in plain if 'target_metric' in s)
+    type_entries = [s for s in plain if 'target_metric' not in s]
+
+    primary_type = ''
+    if type_entries:
+        primary_type = next(
+            (name for name, s in TYPE_SUGGESTIONS.items() if _plain_suggestions([s])[0] == type_entries[0]), None
+        )
+    if primary_type is None or any(name not in METRIC_SUGGESTIONS for name in signature):
+        return None
+
+    entry = get_suggestion_catalog().lookup(primary_type, signature)
+    return (primary_type, signature) if _plain_suggestions(entry.suggestions) == plain else None
+
+
+def encode_result(result: PostureAnalysisResult) -> bytes:
+    """PostureAnalysisResult をバイナリ形式にエンコード"""
+    metrics = result.metrics
+    additional = [getattr(metrics, name) for name in ADDITIONAL_FIELDS]
+    sections = (
+        (FLAG_SYMMETRY, result.symmetry_scores),
+        (FLAG_VALIDATION, result.validation_results),
+        (FLAG_CLASSIFICATION, result.posture_type),
+        (FLAG_JUDGMENTS, result.color_judgments),
+        (FLAG_OVERALL_JUDGMENT, result.overall_color_judgment),
+    )
+
+    flags = FLAG_SEATED if result.is_seated_posture else 0
+    if result.landmarks is not None:
+        flags |= FLAG_LANDMARKS
+    if any(value is not None for value in additional):
+        flags |= FLAG_ADDITIONAL
+    if metrics.registry_metrics is not None:
+        flags |= FLAG_REGISTRY
+    for flag, value in sections:
+        if value is not None:
+            flags |= flag
+    if result.improvement_suggestions is not None:
+        flags |= FLAG_SUGGESTIONS
+
+    out = bytearray(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, ORIENTATION_CODE.get(result.pose_orientation, 0), flags,
+        result.image_width, result.image_height, result.overall_score, result.confidence,
+        _timestamp_us(result.analysis_timestamp)
+    ))
+    if flags & FLAG_LANDMARKS:
+        _encode_landmarks(out, result.landmarks)
+    out += _CORE.pack(*(getattr(metrics, name) for name in CORE_METRICS))
+
+    if flags & FLAG_ADDITIONAL:
+        for value in additional:
+            _write_value(out, value)
+    if flags & FLAG_REGISTRY:
+        _write_value(out, metrics.registry_metrics)
+    for flag, value in sections:
+        if flags & flag:
+            _write_value(out, value)
+
+    if flags & FLAG_SUGGESTIONS:
+        catalog_entry = _suggestion_signature(result.improvement_suggestions)
+        if catalog_entry is None:
+            _write_value(out, result.improvement_suggestions)
+        else:
+            primary_type, signature = catalog_entry
+            mask = sum(1 << i for i, name in enumerate(METRIC_SUGGESTIONS) if name in signature)
+            out += struct.pack('<BBI', TAG_STR_CODE, _STRING_CODE.get(primary_type, 255), mask)
+
+    return bytes(out)
+
+
+# === デコード ===
+
+class _Reader:
+    __slots__ = ('data', 'offset')
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct):
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def byte(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def raw(self, size: int) -> bytes:
+        value = bytes(self.data[self.offset:self.offset + size])
+        self.offset += size
+        return value
+
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_F32 = struct.Struct('<f')
+
+
+def _read_key(reader: _Reader) -> str:
+    code = reader.byte()
+    if code == INLINE_KEY:
+        return reader.raw(reader.byte()).decode('utf-8')
+    return KEY_NAMES[code]
+
+
+def _read_value(reader: _Reader) -> Any:
+    tag = reader.byte()
+    if tag == TAG_FLOAT:
+        return reader.unpack(_F32)[0]
+    if tag == TAG_NONE:
+        return None
+    if tag in (TAG_FALSE, TAG_TRUE):
+        return tag == TAG_TRUE
+    if tag == TAG_STR_CODE:
+        return STRING_VALUES[reader.byte()]
+    if tag == TAG_STR:
+        return reader.raw(reader.unpack(_U16)[0]).decode('utf-8')
+    if tag == TAG_LIST:
+        return [_read_value(reader) for _ in range(reader.unpack(_U16)[0])]
+    if tag == TAG_MAP:
+        return {_read_key(reader): _read_value(reader) for _ in range(reader.unpack(_U16)[0])}
+    if tag == TAG_JUDGMENT:
+        return dict(METRIC_JUDGMENTS[reader.byte()])
+    if tag == TAG_OVERALL_JUDGMENT:
+        return dict(OVERALL_JUDGMENTS[reader.byte()])
+    if tag == TAG_NO_DATA:
+        return dict(NO_DATA_JUDGMENT)
+    raise ValueError(f"Unknown value tag {tag} at offset {reader.offset - 1}")
+
+
+def _decode_landmarks(reader: _Reader, landmark_format: str):
+    mask = reader.unpack(_U64)[0]
+    indices = [i for i in range(NUM_LANDMARKS) if mask >> i & 1]
+    packed = np.frombuffer(reader.raw(len(indices) * _LANDMARK_DTYPE.itemsize), dtype=_LANDMARK_DTYPE)
+
+    data = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for column, field in enumerate(('x', 'y', 'z')):
+        data[indices, column] = packed[field] / LANDMARK_SCALE
+    visibility = packed['visibility'].astype(np.float32) / VISIBILITY_SCALE
+    data[indices, VISIBILITY] = np.where(packed['visibility'] == VISIBILITY_UNSET, np.nan, visibility)
+
+    landmarks = LandmarkArray(data)
+    return landmarks if landmark_format == 'array' else landmarks.to_dict()
+
+
+def decode_result(data: bytes, landmark_format: str = 'object') -> Dict[str, Any]:
+    """
+    バイナリ形式を PostureAnalysisResult と同じ構造の辞書にデコード
+    landmark_format='array' の場合、landmarks は LandmarkArray のまま返す
+    """
+    reader = _Reader(data)
+    (magic, version, orientation, flags, width, height,
+     overall_score, confidence, timestamp_us) = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("Not a binary posture result")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary result version {version}")
+
+    result = {
+        'landmarks': _decode_landmarks(reader, landmark_format) if flags & FLAG_LANDMARKS else None,
+        'metrics': dict(zip(CORE_METRICS, reader.unpack(_CORE))),
+        'overall_score': overall_score,
+        'image_width': width,
+        'image_height': height,
+        'confidence': confidence,
+        'pose_orientation': ORIENTATION_CODES[orientation],
+        'analysis_timestamp': _EPOCH + timedelta(microseconds=timestamp_us),
+        'is_seated_posture': bool(flags & FLAG_SEATED),
+    }
+    for name in ADDITIONAL_FIELDS:
+        result['metrics'][name] = _read_value(reader) if flags & FLAG_ADDITIONAL else None
+    result['metrics']['registry_metrics'] = _read_value(reader) if flags & FLAG_REGISTRY else None
+
+    for flag, name in ((FLAG_SYMMETRY, 'symmetry_scores'), (FLAG_VALIDATION, 'validation_results'),
+                       (FLAG_CLASSIFICATION, 'posture_type'), (FLAG_JUDGMENTS, 'color_judgments'),
+                       (FLAG_OVERALL_JUDGMENT, 'overall_color_judgment')):
+        result[name] = _read_value(reader) if flags & flag else None
+
+    result['improvement_suggestions'] = None
+    if flags & FLAG_SUGGESTIONS:
+        if reader.data[reader.offset] == TAG_STR_CODE:
+            reader.byte()
+            code, mask = reader.byte(), reader.unpack(_U32)[0]
+            primary_type = STRING_VALUES[code] if code < len(STRING_VALUES) else ''
+            signature = tuple(name for i, name in enumerate(METRIC_SUGGESTIONS) if mask >> i & 1)
+            entry = get_suggestion_catalog().lookup(primary_type, signature)
+            result['improvement_suggestions'] = _plain_suggestions(entry.suggestions)
+        else:
+            result['improvement_suggestions'] = _read_value(reader)
+
+    return result
@@ -0,0 +1,204 @@
+"""
+ランドマーク配列表現
+MediaPipeの33点ランドマークを (33, 4) float32 配列として保持し、
+名前→インデックス対応とAPIレスポンス用の辞書互換ビューを提供する
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+# MediaPipe Pose のランドマーク順序
+LANDMARK_NAMES: Tuple[str, ...] = (
+    'nose', 'left_eye_inner', 'left_eye', 'left_eye_outer',
+    'right_eye_inner', 'right_eye', 'right_eye_outer',
+    'left_ear', 'right_ear', 'mouth_left', 'mouth_right',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist', 'left_pinky', 'right_pinky',
+    'left_index', 'right_index', 'left_thumb', 'right_thumb',
+    'left_hip', 'right_hip', 'left_knee', 'right_knee',
+    'left_ankle', 'right_ankle', 'left_heel', 'right_heel',
+    'left_foot_index', 'right_foot_index'
+)
+
+LANDMARK_INDEX: Dict[str, int] = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+NUM_LANDMARKS = len(LANDMARK_NAMES)
+
+# 列インデックス
+FIELDS: Tuple[str, ...] = ('x', 'y', 'z', 'visibility')
+X, Y, Z, VISIBILITY = range(len(FIELDS))
+
+
+class LandmarkArray(Mapping):
+    """
+    (33, 4) float32 配列で保持するランドマーク集合
+
+    行は LANDMARK_NAMES の順、列は x, y, z, visibility。
+    検出されなかったランドマークは x が NaN の行として表現する。
+    Mapping として振る舞うため、既存の辞書ベースのコードからも
+    ``landmarks['nose']['x']`` の形でそのまま参照できる。
+    """
+
+    __slots__ = ('data',)
+
+    name_to_index = LANDMARK_INDEX
+
+    def __init__(self, data: np.ndarray):
+        if data.shape != (NUM_LANDMARKS, len(FIELDS)) or data.dtype != np.float32:
+            raise ValueError(
+                f"LandmarkArray requires a ({NUM_LANDMARKS}, {len(FIELDS)}) float32 array, "
+                f"got {data.shape} {data.dtype}"
+            )
+        self.data = data
+
+    # === 生成 ===
+
+    @classmethod
+    def empty(cls) -> 'LandmarkArray':
+        """全ランドマーク未検出の配列"""
+        data = np.full((NUM_LANDMARKS, len(FIELDS)), np.nan, dtype=np.float32)
+        return cls(data)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'LandmarkArray':
+        """既存配列から生成（float32 の (33, 4) 配列ならコピーしない）"""
+        return cls(np.asarray(array, dtype=np.float32))
+
+    @classmethod
+    def from_mediapipe(cls, pose_landmarks) -> 'LandmarkArray':
+        """MediaPipeの検出結果から中間辞書を作らずに一度で配列へ展開"""
+        landmarks = pose_landmarks.landmark[:NUM_LANDMARKS]
+        count = len(landmarks)
+        flat = np.fromiter(
+            (value for lm in landmarks for value in (lm.x, lm.y, lm.z, lm.visibility)),
+            dtype=np.float32,
+            count=count * len(FIELDS)
+        )
+        if count == NUM_LANDMARKS:
+            return cls(flat.reshape(NUM_LANDMARKS, len(FIELDS)))
+
+        result = cls.empty()
+        result.data[:count] = flat.reshape(count, len(FIELDS))
+        return result
+
+    @classmethod
+    def from_dict(cls, landmarks: Mapping) -> 'LandmarkArray':
+        """辞書形式 {name: {'x', 'y', 'z', 'visibility'}} から生成"""
+        result = cls.empty()
+        data = result.data
+        for name, landmark in landmarks.items():
+            idx = LANDMARK_INDEX.get(name)
+            if idx is None or not landmark:
+                continue
+            data[idx, X] = landmark['x']
+            data[idx, Y] = landmark['y']
+            data[idx, Z] = landmark.get('z', 0.0)
+            data[idx, VISIBILITY] = landmark.get('visibility', np.nan)
+        return result
+
+    @classmethod
+    def coerce(cls, landmarks) -> 'LandmarkArray':
+        """LandmarkArray ならそのまま、辞書なら変換して返す"""
+        if isinstance(landmarks, cls):
+            return landmarks
+        return cls.from_dict(landmarks)
+
+    @staticmethod
+    def stack(landmark_arrays: Iterable['LandmarkArray']) -> np.ndarray:
+        """複数ポーズを (N, 33, 4) テンソルにまとめる"""
+        return np.stack([lm.data for lm in landmark_arrays])
+
+    # === 配列アクセス ===
+
+    @property
+    def present(self) -> np.ndarray:
+        """検出済みランドマークのブールマスク (33,)"""
+        return ~np.isnan(self.data[:, X])
+
+    def has(self, *names: str) -> bool:
+        """指定ランドマークがすべて検出済みか"""
+        return not np.isnan(self.data[[LANDMARK_INDEX[name] for name in names], X]).any()
+
+    def row(self, name: str) -> np.ndarray:
+        """1ランドマークの行ビュー (4,)"""
+        return self.data[LANDMARK_INDEX[name]]
+
+    def xy(self, name: str) -> np.ndarray:
+        """1ランドマークの (x, y) ビュー"""
+        return self.data[LANDMARK_INDEX[name], :2]
+
+    def take(self, names: Sequence[str]) -> np.ndarray:
+        """複数ランドマークの行を (len(names), 4) で取得"""
+        return self.data[[LANDMARK_INDEX[name] for name in names]]
+
+    def midpoint(self, name1: str, name2: str) -> np.ndarray:
+        """2ランドマークの中点 (x, y) を float64 で取得"""
+        rows = self.data[[LANDMARK_INDEX[name1], LANDMARK_INDEX[name2]], :2]
+        return rows.mean(axis=0, dtype=np.float64)
+
+    def visibility(self, name: str, default: float = 0.0) -> float:
+        """可視性（未検出・未設定なら default）"""
+        value = self.data[LANDMARK_INDEX[name], VISIBILITY]
+        return default if np.isnan(value) else float(value)
+
+    # === 辞書互換ビュー ===
+
+    def _landmark_dict(self, idx: int) -> Dict[str, float]:
+        x, y, z, visibility = self.data[idx].tolist()
+        landmark = {'x': x, 'y': y, 'z': z}
+        if visibility == visibility:  # NaN は未設定扱い
+            landmark['visibility'] = visibility
+        return landmark
+
+    def __getitem__(self, name: str) -> Dict[str, float]:
+        idx = LANDMARK_INDEX.get(name)
+        if idx is None or np.isnan(self.data[idx, X]):
+            raise KeyError(name)
+        return self._landmark_dict(idx)
+
+    def __contains__(self, name) -> bool:
+        idx = LANDMARK_INDEX.get(name)
+        return idx is not None and not np.isnan(self.data[idx, X])
+
+    def __iter__(self) -> Iterator[str]:
+        present = self.present
+        return (name for name, ok in zip(LANDMARK_NAMES, present) if ok)
+
+    def __len__(self) -> int:
+        return int(self.present.sum())
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """APIレスポンス用の辞書形式に変換"""
+        return {name: self._landmark_dict(LANDMARK_INDEX[name]) for name in self}
+
+    def __repr__(self) -> str:
+        return f"LandmarkArray(detected={len(self)}/{NUM_LANDMARKS})"
+
+
+def point_coords(point) -> Tuple[float, float]:
+    """辞書・配列行・タプルいずれの点表現からも (x, y) を取り出す"""
+    if isinstance(point, Mapping):
+        return point['x'], point['y']
+    return float(point[0]), float(point[1])
+
+
+
+def landmark_tensor(landmarks) -> np.ndarray:
+    """
+    ランドマーク群を (N, 33, 4) float64 テンソルに正規化
+    (33, 4) / (N, 33, 4) 配列、LandmarkArray、辞書、およびそれらの列を受け付ける
+    """
+    if isinstance(landmarks, (LandmarkArray, Mapping)):
+        landmarks = LandmarkArray.coerce(landmarks).data
+    elif not isinstance(landmarks, np.ndarray):
+        landmarks = LandmarkArray.stack(LandmarkArray.coerce(lm) for lm in landmarks)
+
+    tensor = np.asarray(landmarks, dtype=np.float64)
+    if tensor.ndim == 2:
+        tensor = tensor[np.newaxis]
+    if tensor.ndim != 3 or tensor.shape[1:] != (NUM_LANDMARKS, len(FIELDS)):
+        raise ValueError(
+            f"Expected landmarks of shape (N, {NUM_LANDMARKS}, {len(FIELDS)}), got {tensor.shape}"
+        )
+    return tensor
@@ -7,6 +7,8 @@ from pathlib import Path
 import sys
 import os
 
+from backend.app.core.config import settings
+
 class PostureAnalysisLogger:
     """
     強力なロギングクラス - 姿勢分析アプリ専用
@@ -30,8 +32,8 @@ class PostureAnalysisLogger:
         self.logger.handlers.clear()
         
         # ログディレクトリ作成
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
+        log_dir = Path(settings.LOGS_DIR)
+        log_dir.mkdir(parents=True, exist_ok=True)
         
         # 詳細フォーマッター
         detailed_formatter = logging.Formatter(
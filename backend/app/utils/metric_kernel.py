@@ -0,0 +1,375 @@
+"""
+メトリクスカーネル
+姿勢ごとに共有される幾何プリミティブ（中点・関節角度・体幹角度）を一度だけ求め、
+矢状面・前額面・複合・追加メトリクス・座位メトリクスをすべてそこから評価する
+矢状面の基本メトリクスと拡張メトリクスは metric_registry の宣言的定義から一括評価する
+"""
+
+import math
+import time
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.app.models.posture_result import PostureMetrics
+from backend.app.utils.angle_calculator import BatchAngleCalculator
+from backend.app.utils.landmark_array import LandmarkArray, LANDMARK_INDEX
+from backend.app.utils.metric_registry import CompiledMetricRegistry, METRIC_REGISTRY
+
+# PostureMetrics の8項目（レジストリの基本メトリクス）
+POSTURE_METRIC_NAMES: Tuple[str, ...] = METRIC_REGISTRY.core_names
+
+_ORIENTATION_VIEWS = {
+    'sagittal': 'sagittal',
+    'frontal': 'frontal',
+    'posterior': 'frontal',
+}
+
+
+# 左右ペア（中点・検出マスクを一括で求める）
+_PAIR_NAMES: Tuple[str, ...] = ('shoulder', 'hip', 'ear', 'knee', 'ankle', 'heel', 'foot_index')
+_LEFT = np.array([LANDMARK_INDEX[f'left_{name}'] for name in _PAIR_NAMES])
+_RIGHT = np.array([LANDMARK_INDEX[f'right_{name}'] for name in _PAIR_NAMES])
+SHOULDER, HIP, EAR, KNEE, ANKLE, HEEL, FOOT_INDEX = range(len(_PAIR_NAMES))
+_NOSE = LANDMARK_INDEX['nose']
+
+# 踵傾斜の水平基準ベクトル
+_HEEL_HORIZONTAL = np.array([0.1, 0.0])
+
+
+class PosePrimitives:
+    """
+    (N, 33, C) ランドマークテンソルから一度だけ求める共有プリミティブ
+
+    点はすべて (N, 2)、角度・マスクは (N,)。未検出ランドマークは NaN のまま伝播し、
+    各メトリクスは has_* マスクで既定値に切り替える。
+    左右ペアの点・中点と全関節角度はそれぞれ1回の配列演算でまとめて求める。
+    """
+
+    def __init__(self, landmarks: np.ndarray, calc: BatchAngleCalculator):
+        xy = landmarks[..., :2]
+        left = xy[:, _LEFT]      # (N, P, 2)
+        right = xy[:, _RIGHT]    # (N, P, 2)
+        mids = calc.midpoint(left, right)
+
+        # 個別ランドマーク
+        self.nose = xy[:, _NOSE]
+        self.left_shoulder, self.right_shoulder = left[:, SHOULDER], right[:, SHOULDER]
+        self.left_hip, self.right_hip = left[:, HIP], right[:, HIP]
+
+        # 検出マスク
+        detected = ~np.isnan(landmarks[:, :, 0])
+        pair_detected = detected[:, _LEFT] & detected[:, _RIGHT]
+        self.has_nose = detected[:, _NOSE]
+        self.has_shoulders = pair_detected[:, SHOULDER]
+        self.has_hips = pair_detected[:, HIP]
+        self.has_ears = pair_detected[:, EAR]
+        self.has_knees = pair_detected[:, KNEE]
+        self.has_trunk = self.has_shoulders & self.has_hips
+        self.has_core = self.has_nose & self.has_trunk
+        self.has_head = self.has_nose & self.has_ears & self.has_shoulders
+        self.has_legs = self.has_hips & self.has_knees & pair_detected[:, ANKLE]
+        self.has_feet = pair_detected[:, ANKLE] & pair_detected[:, HEEL] & pair_detected[:, FOOT_INDEX]
+
+        # 中点
+        self.shoulder_mid = mids[:, SHOULDER]
+        self.hip_mid = mids[:, HIP]
+        self.ear_mid = mids[:, EAR]
+        self.knee_mid = mids[:, KNEE]
+
+        # 水平・垂直オフセット
+        self.shoulder_dy = np.abs(self.left_shoulder[:, 1] - self.right_shoulder[:, 1])
+        self.shoulder_dx = np.abs(self.left_shoulder[:, 0] - self.right_shoulder[:, 0])
+        self.nose_shoulder_dx = np.abs(self.nose[:, 0] - self.shoulder_mid[:, 0])
+        self.ear_shoulder_dx = np.abs(self.ear_mid[:, 0] - self.shoulder_mid[:, 0])
+        self.shoulder_hip_dx = np.abs(self.shoulder_mid[:, 0] - self.hip_mid[:, 0])
+
+        # 角度（頂点から見た2ベクトルを積み重ねて1回で計算）
+        left_knee, left_ankle, left_heel = left[:, KNEE], left[:, ANKLE], left[:, HEEL]
+        right_knee, right_ankle, right_heel = right[:, KNEE], right[:, ANKLE], right[:, HEEL]
+        vertices = np.stack([self.ear_mid, left_knee, right_knee, left_heel, right_heel], axis=1)
+        first = np.stack([self.shoulder_mid, self.left_hip, self.right_hip,
+                          left_heel + _HEEL_HORIZONTAL, right_heel + _HEEL_HORIZONTAL], axis=1)
+        second = np.stack([self.nose, left_ankle, right_ankle, left_ankle, right_ankle], axis=1)
+        angles = calc.vector_angle(first - vertices, second - vertices)
+
+        self.neck_angle, self.left_knee_angle, self.right_knee_angle = angles[:, :3].T
+        self.left_heel_inclination, self.right_heel_inclination = np.minimum(45, np.abs(angles[:, 3:] - 90)).T
+        self.trunk_angle = calc.trunk_angle(self.shoulder_mid, self.hip_mid)
+
+
+class KernelResult:
+    """
+    カーネル評価結果（各方向・各分岐のメトリクスを (N,) 配列で保持）
+
+    各分岐は初回アクセス時に一度だけ評価される。前額面のみの姿勢では矢状面の、
+    立位姿勢では座位の計算が走らない。
+    """
+
+    def __init__(self, kernel: 'MetricKernel', landmarks: np.ndarray, image_size: Tuple[int, int]):
+        self.kernel = kernel
+        self.landmarks = landmarks
+        self.image_size = image_size
+
+    def __len__(self) -> int:
+        return self.landmarks.shape[0]
+
+    @cached_property
+    def primitives(self) -> PosePrimitives:
+        return PosePrimitives(self.landmarks, self.kernel.calc)
+
+    @cached_property
+    def registry_metrics(self) -> Dict[str, np.ndarray]:
+        return self.kernel._registry_metrics(self.landmarks)
+
+    @cached_property
+    def sagittal(self) -> Dict[str, np.ndarray]:
+        return {name: self.registry_metrics[name] for name in POSTURE_METRIC_NAMES}
+
+    @cached_property
+    def frontal(self) -> Dict[str, np.ndarray]:
+        return self.kernel._frontal(self.primitives, self.image_size)
+
+    @cached_property
+    def combined(self) -> Dict[str, np.ndarray]:
+        return self.kernel._combined(self.sagittal, self.frontal)
+
+    @cached_property
+    def knee_valgus_varus(self) -> Dict[str, np.ndarray]:
+        return self.kernel._knee_valgus_varus(self.primitives)
+
+    @cached_property
+    def heel_inclination(self) -> Dict[str, np.ndarray]:
+        return self.kernel._heel_inclination(self.primitives)
+
+    @cached_property
+    def seated_metrics(self) -> Dict[str, np.ndarray]:
+        return self.kernel._seated(self.primitives)
+
+    @property
+    def has_legs(self) -> np.ndarray:
+        return self.primitives.has_legs
+
+    @property
+    def has_feet(self) -> np.ndarray:
+        return self.primitives.has_feet
+
+    @property
+    def has_seated(self) -> np.ndarray:
+        return self.primitives.has_core
+
+    def orientation_metrics(self, orientation: str) -> Dict[str, np.ndarray]:
+        """姿勢方向に対応するメトリクス配列（斜め・不明は複合）"""
+        return getattr(self, _ORIENTATION_VIEWS.get(orientation, 'combined'))
+
+    def posture_metrics(self, orientation: str, index: int = 0) -> PostureMetrics:
+        """
+        1姿勢分の PostureMetrics
+        既定値のないメトリクスの算出に必要なランドマークが未検出の場合は、
+        従来の計算と同様に KeyError（NaN をスコア・分類に渡さない）
+        """
+        values = self.orientation_metrics(orientation)
+        metrics = {name: float(values[name][index]) for name in POSTURE_METRIC_NAMES}
+        missing = [name for name, value in metrics.items() if math.isnan(value)]
+        if missing:
+            raise KeyError(f"Landmarks required for {', '.join(missing)} were not detected")
+        return PostureMetrics(**metrics, registry_metrics=self.extended_metrics(index))
+
+    def extended_metrics(self, index: int = 0) -> Optional[Dict[str, float]]:
+        """
+        1姿勢分の基本フィールド以外のレジストリメトリクス（定義がなければ None）
+        値が得られなかったメトリクスは含めない
+        """
+        names = self.kernel.registry.extended_names
+        if not names:
+            return None
+        values = {name: float(self.registry_metrics[name][index]) for name in names}
+        return {name: value for name, value in values.items() if not math.isnan(value)}
+
+    def additional_metrics(self, index: int = 0, seated: bool = True) -> Dict:
+        """1姿勢分の追加メトリクス（膝・踵・座位）を従来の辞書形式で取得"""
+        additional_metrics = {}
+
+        if self.has_legs[index]:
+            additional_metrics['knee_valgus_varus'] = _row(self.knee_valgus_varus, index)
+        if self.has_feet[index]:
+            additional_metrics['heel_inclination'] = _row(self.heel_inclination, index)
+        if seated and self.has_seated[index]:
+            additional_metrics['seated_metrics'] = _row(self.seated_metrics, index)
+
+        return additional_metrics
+
+
+def _row(metrics: Dict[str, np.ndarray], index: int) -> Dict:
+    return {key: values[index].item() for key, values in metrics.items()}
+
+
+class MetricKernel:
+    """全方向の姿勢メトリクスを共有プリミティブから一括評価するカーネル"""
+
+    def __init__(self, registry: CompiledMetricRegistry = METRIC_REGISTRY):
+        self.calc = BatchAngleCalculator()
+        self.registry = registry
+
+    @staticmethod
+    def _as_tensor(landmarks) -> np.ndarray:
+        if isinstance(landmarks, np.ndarray):
+            data = landmarks
+        else:
+            data = LandmarkArray.coerce(landmarks).data
+        data = np.asarray(data, dtype=np.float64)
+        return data[np.newaxis] if data.ndim == 2 else data
+
+    def primitives(self, landmarks) -> PosePrimitives:
+        """共有プリミティブの算出"""
+        return PosePrimitives(self._as_tensor(landmarks), self.calc)
+
+    def evaluate_registry(self, landmarks) -> np.ndarray:
+        """レジストリの全メトリクスを (N, M) 配列で評価"""
+        return self.registry.evaluate(self._as_tensor(landmarks))
+
+    def evaluate(self, landmarks, image_size: Tuple[int, int]) -> KernelResult:
+        """
+        ランドマーク（LandmarkArray・辞書・(33, C) / (N, 33, C) 配列）の評価結果を作成
+        （各メトリクスはアクセス時に遅延評価）
+        """
+        return KernelResult(self, self._as_tensor(landmarks), image_size)
+
+    # === 方向別メトリクス ===
+
+    @staticmethod
+    def _shoulder_height_difference(p: PosePrimitives, image_size: Tuple[int, int]) -> np.ndarray:
+        return (p.shoulder_dy * image_size[1]) / (image_size[1] / 170)
+
+    def _registry_metrics(self, landmarks: np.ndarray) -> Dict[str, np.ndarray]:
+        """レジストリ定義メトリクス（矢状面の基本8項目＋拡張メトリクス）"""
+        values = self.registry.evaluate(landmarks)
+        return {name: values[:, i] for i, name in enumerate(self.registry.names)}
+
+    def _frontal(self, p: PosePrimitives, image_size: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        """前額面（正面・後面）メトリクス"""
+        hip_dy = np.abs(p.left_hip[:, 1] - p.right_hip[:, 1])
+        hip_dx = np.abs(p.left_hip[:, 0] - p.right_hip[:, 0])
+        pelvic_alignment = np.where(p.has_hips, np.minimum(15.0, np.degrees(np.arctan2(hip_dy, hip_dx))), 5.0)
+
+        height_diff = np.where(p.has_shoulders, self._shoulder_height_difference(p, image_size), 1.0)
+        protraction = np.where(p.has_shoulders, np.maximum(0, (0.3 - p.shoulder_dx) * 10), 2.0)
+
+        spinal_alignment = np.where(
+            p.has_core, np.minimum(10.0, (p.nose_shoulder_dx + p.shoulder_hip_dx) * 50), 2.0
+        )
+
+        # 耳が見えていれば鼻と耳の偏位を平均
+        head_deviation = np.where(p.has_ears, (p.nose_shoulder_dx + p.ear_shoulder_dx) / 2, p.nose_shoulder_dx)
+        head_alignment = np.where(
+            p.has_nose & p.has_shoulders, np.minimum(8.0, head_deviation * 30), 2.0
+        )
+
+        return {
+            'pelvic_tilt': pelvic_alignment,
+            'thoracic_kyphosis': spinal_alignment,
+            'cervical_lordosis': head_alignment,
+            'shoulder_height_difference': height_diff,
+            'head_forward_posture': head_alignment,
+            'lumbar_lordosis': spinal_alignment,
+            'scapular_protraction': protraction,
+            'trunk_lateral_deviation': spinal_alignment
+        }
+
+    @staticmethod
+    def _combined(sagittal: Dict[str, np.ndarray], frontal: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """斜め・不明方向用の複合メトリクス（矢状面と前額面の結果を再利用）"""
+        combined = dict(sagittal)
+        combined['pelvic_tilt'] = (sagittal['pelvic_tilt'] + frontal['pelvic_tilt']) / 2
+        combined['shoulder_height_difference'] = frontal['shoulder_height_difference']
+        combined['trunk_lateral_deviation'] = frontal['trunk_lateral_deviation']
+        return combined
+
+    # === 追加メトリクス ===
+
+    @staticmethod
+    def _knee_valgus_varus(p: PosePrimitives) -> Dict[str, np.ndarray]:
+        """膝外反/内反（Q角は hip-knee-ankle 角と一致するため同じ角度を再利用）"""
+        left_deviation = 180 - p.left_knee_angle
+        right_deviation = 180 - p.right_knee_angle
+
+        return {
+            'left_knee_deviation': np.abs(left_deviation),
+            'right_knee_deviation': np.abs(right_deviation),
+            'left_knee_type': np.where(left_deviation > 0, 'valgus', 'varus'),
+            'right_knee_type': np.where(right_deviation > 0, 'valgus', 'varus'),
+            'left_q_angle': p.left_knee_angle,
+            'right_q_angle': p.right_knee_angle,
+            'average_deviation': (np.abs(left_deviation) + np.abs(right_deviation)) / 2
+        }
+
+    @staticmethod
+    def _heel_inclination(p: PosePrimitives) -> Dict[str, np.ndarray]:
+        """踵骨傾斜"""
+        left, right = p.left_heel_inclination, p.right_heel_inclination
+        return {
+            'left_heel_inclination': left,
+            'right_heel_inclination': right,
+            'average_inclination': (left + right) / 2,
+            'inclination_difference': np.abs(left - right)
+        }
+
+    def _seated(self, p: PosePrimitives) -> Dict[str, np.ndarray]:
+        """座位姿勢メトリクス"""
+        head_neck_position = np.where(
+            p.has_ears,
+            np.minimum(20, p.ear_shoulder_dx * 30 + np.abs(p.neck_angle - 90) * 0.5),
+            p.nose_shoulder_dx * 50
+        )
+        trunk_angle = p.trunk_angle
+
+        return {
+            'seated_pelvic_tilt': np.minimum(45, np.abs(trunk_angle)),
+            'head_neck_position': head_neck_position,
+            'trunk_forward_lean': np.minimum(45, np.where(trunk_angle > 0, np.abs(trunk_angle), 0.0)),
+            'trunk_backward_lean': np.minimum(30, np.where(trunk_angle > 0, 0.0, np.abs(trunk_angle))),
+            'lateral_lean': np.minimum(30, (p.nose_shoulder_dx + p.shoulder_hip_dx) / 2 * 45),
+            'shoulder_elevation': self._shoulder_height_difference(p, (1, 1))
+        }
+
+
+_metric_kernel: Optional[MetricKernel] = None
+
+
+def get_metric_kernel() -> MetricKernel:
+    """メトリクスカーネルのシングルトン取得"""
+    global _metric_kernel
+    if _metric_kernel is None:
+        _metric_kernel = MetricKernel()
+    return _metric_kernel
+
+
+def main():
+    """ベンチマーク実行（1姿勢ずつ評価した場合とバッチ評価の1姿勢あたりコスト）"""
+    print("🚀 メトリクスカーネル ベンチマーク")
+
+    kernel = MetricKernel()
+    rng = np.random.default_rng(0)
+    poses = rng.uniform(0.1, 0.9, size=(2000, len(LANDMARK_INDEX), 4)).astype(np.float32)
+    landmark_arrays = [LandmarkArray(pose) for pose in poses[:500]]
+    image_size = (640, 480)
+
+    start = time.perf_counter()
+    for landmarks in landmark_arrays:
+        result = kernel.evaluate(landmarks, image_size)
+        result.posture_metrics('oblique')
+        result.additional_metrics()
+    single = (time.perf_counter() - start) / len(landmark_arrays)
+
+    start = time.perf_counter()
+    result = kernel.evaluate(poses, image_size)
+    result.combined, result.knee_valgus_varus, result.heel_inclination, result.seated_metrics
+    batched = (time.perf_counter() - start) / len(poses)
+
+    print(f"📊 1姿勢評価: {single * 1e6:.1f}µs/姿勢")
+    print(f"📊 バッチ評価: {batched * 1e6:.2f}µs/姿勢 ({len(poses)}姿勢)")
+
+
+if __name__ == "__main__":
+    main()
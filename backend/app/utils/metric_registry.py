@@ -0,0 +1,262 @@
+"""
+姿勢メトリクス定義レジストリ
+各メトリクスをランドマーク・演算・スケール・クランプ・正常範囲で宣言的に定義し、
+インポート時にインデックス配列へコンパイルして (N, 33, C) テンソル上で一括評価する
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.app.utils.angle_calculator import BatchAngleCalculator
+from backend.app.utils.landmark_array import LANDMARK_INDEX, NUM_LANDMARKS
+
+# 点の指定: ランドマーク名、または2ランドマーク名のタプル（中点）
+PointSpec = Union[str, Tuple[str, str]]
+
+# 演算ごとの点の数
+OPERATIONS: Dict[str, int] = {
+    'angle': 3,           # 2点目を頂点とする角度（度）
+    'offset': 2,          # 2点間の x または y 方向の絶対差
+    'tilt': 2,            # 2点を結ぶ線の水平からの傾き（度）
+    'distance_ratio': 4,  # |p0 p1| / |p2 p3|
+}
+
+UNIT_SYMBOLS: Dict[str, str] = {'degrees': '°', 'cm': 'cm'}
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    """
+    メトリクス定義
+
+    値 = clamp(演算結果 * scale + bias)。必要なランドマークが未検出、
+    または値が定義できない場合（ゼロ除算など）は default を返す。
+    strict の場合、ランドマーク未検出時は default ではなく NaN を返す。
+    """
+    name: str
+    label: str
+    short_label: str
+    op: str
+    points: Tuple[PointSpec, ...]
+    normal_range: Tuple[float, float]
+    unit: str = 'degrees'
+    axis: int = 0                      # offset: 0 = x, 1 = y
+    undirected: bool = False           # tilt: 点の順序に依存しない線の傾き (0-90度)
+    scale: float = 1.0
+    bias: float = 0.0
+    clamp: Tuple[Optional[float], Optional[float]] = (None, None)
+    default: float = float('nan')
+    requires: Tuple[str, ...] = ()     # points 以外に検出が必要なランドマーク
+    strict: bool = False               # ランドマーク未検出時は NaN（default は値が定義できない場合のみ）
+    core: bool = False                 # PostureMetrics の基本フィールド（それ以外は registry_metrics に格納）
+    in_report: bool = False            # PDFレポートの測定値テーブルに表示
+    in_chart: bool = False             # レーダーチャートに表示
+
+    @property
+    def unit_symbol(self) -> str:
+        return UNIT_SYMBOLS.get(self.unit, self.unit)
+
+    @property
+    def landmarks(self) -> Tuple[str, ...]:
+        """評価に必要なランドマーク名"""
+        names = []
+        for point in self.points:
+            names.extend((point,) if isinstance(point, str) else point)
+        names.extend(self.requires)
+        return tuple(dict.fromkeys(names))
+
+
+SHOULDER_MID = ('left_shoulder', 'right_shoulder')
+HIP_MID = ('left_hip', 'right_hip')
+EAR_MID = ('left_ear', 'right_ear')
+KNEE_MID = ('left_knee', 'right_knee')
+
+METRIC_DEFINITIONS: Tuple[MetricDefinition, ...] = (
+    # === 基本メトリクス（矢状面） ===
+    MetricDefinition(
+        name='pelvic_tilt', label='骨盤傾斜角', short_label='骨盤傾斜',
+        op='tilt', points=('left_hip', 'right_hip'),
+        normal_range=(5, 15), core=True, in_report=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='thoracic_kyphosis', label='胸椎後弯角', short_label='胸椎後弯',
+        op='angle', points=(HIP_MID, SHOULDER_MID, 'nose'),
+        scale=-1.0, bias=180.0, clamp=(0, 60), default=35.0,
+        normal_range=(25, 45), core=True, in_report=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='cervical_lordosis', label='頸椎前弯角', short_label='頸椎前弯',
+        op='angle', points=(SHOULDER_MID, EAR_MID, 'nose'),
+        clamp=(0, 50), default=25.0,
+        normal_range=(15, 35), core=True, in_report=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='shoulder_height_difference', label='肩の高さの差', short_label='肩の高さ',
+        op='offset', points=('left_shoulder', 'right_shoulder'), axis=1,
+        scale=170.0,  # 身長 ~170cm 想定の正規化座標→cm 換算
+        normal_range=(0, 1.5), unit='cm', core=True, in_report=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='head_forward_posture', label='頭部前方偏位', short_label='頭部前方',
+        op='offset', points=(EAR_MID, SHOULDER_MID),
+        scale=50.0, clamp=(None, 15.0), default=2.0, requires=('nose',),
+        normal_range=(0, 2.5), unit='cm', core=True, in_report=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='lumbar_lordosis', label='腰椎前弯角', short_label='腰椎前弯',
+        op='angle', points=(KNEE_MID, HIP_MID, SHOULDER_MID),
+        clamp=(20, 60), default=40.0,
+        normal_range=(30, 50), core=True, in_chart=True
+    ),
+    MetricDefinition(
+        name='scapular_protraction', label='肩甲骨前方突出', short_label='肩甲骨',
+        op='distance_ratio', points=('left_elbow', 'right_elbow', 'left_shoulder', 'right_shoulder'),
+        scale=10.0, bias=-8.0, clamp=(0, None), default=0.0, strict=True,
+        normal_range=(0, 2), unit='cm', core=True
+    ),
+    MetricDefinition(
+        name='trunk_lateral_deviation', label='体幹側方偏位', short_label='体幹側方',
+        op='offset', points=('nose', HIP_MID),
+        scale=100.0,
+        normal_range=(0, 1), unit='cm', core=True
+    ),
+)
+
+
+class CompiledMetricRegistry:
+    """
+    メトリクス定義をインデックス配列にコンパイルしたもの
+
+    全メトリクスで使う点（中点を含む）を1回の gather で求め、演算種別ごとに
+    まとめてベクトル化評価した後、スケール・クランプ・既定値を列方向に一括適用する。
+    """
+
+    def __init__(self, definitions: Sequence[MetricDefinition]):
+        self.definitions: Tuple[MetricDefinition, ...] = tuple(definitions)
+        self.names: Tuple[str, ...] = tuple(d.name for d in self.definitions)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.by_name: Dict[str, MetricDefinition] = {d.name: d for d in self.definitions}
+
+        if len(self.index) != len(self.definitions):
+            raise ValueError("Duplicate metric names in registry")
+
+        # 点 → (landmark_a, landmark_b) の一意なテーブル
+        point_table: Dict[Tuple[int, int], int] = {}
+
+        def point_id(point: PointSpec) -> int:
+            a, b = (point, point) if isinstance(point, str) else point
+            key = (LANDMARK_INDEX[a], LANDMARK_INDEX[b])
+            return point_table.setdefault(key, len(point_table))
+
+        op_columns: Dict[str, list] = {op: [] for op in OPERATIONS}
+        op_points: Dict[str, list] = {op: [] for op in OPERATIONS}
+
+        for column, definition in enumerate(self.definitions):
+            if definition.op not in OPERATIONS:
+                raise ValueError(f"Unknown metric operation '{definition.op}' for {definition.name}")
+            if len(definition.points) != OPERATIONS[definition.op]:
+                raise ValueError(
+                    f"Metric {definition.name}: '{definition.op}' needs "
+                    f"{OPERATIONS[definition.op]} points, got {len(definition.points)}"
+                )
+            op_columns[definition.op].append(column)
+            op_points[definition.op].append([point_id(p) for p in definition.points])
+
+        pairs = np.array(list(point_table), dtype=np.intp).reshape(-1, 2)
+        self._point_a, self._point_b = pairs[:, 0], pairs[:, 1]
+
+        self._columns = {op: np.array(cols, dtype=np.intp) for op, cols in op_columns.items() if cols}
+        self._points = {
+            op: np.array(op_points[op], dtype=np.intp).reshape(-1, OPERATIONS[op])
+            for op in self._columns
+        }
+        self._offset_axis = np.array(
+            [self.definitions[c].axis for c in op_columns['offset']], dtype=np.intp
+        )
+        self._tilt_undirected = np.array(
+            [self.definitions[c].undirected for c in op_columns['tilt']], dtype=bool
+        )
+
+        self.scale = np.array([d.scale for d in self.definitions])
+        self.bias = np.array([d.bias for d in self.definitions])
+        self.lower = np.array([-np.inf if d.clamp[0] is None else d.clamp[0] for d in self.definitions])
+        self.upper = np.array([np.inf if d.clamp[1] is None else d.clamp[1] for d in self.definitions])
+        self.default = np.array([d.default for d in self.definitions])
+        self.missing_value = np.array([np.nan if d.strict else d.default for d in self.definitions])
+        self.normal_ranges = np.array([d.normal_range for d in self.definitions], dtype=np.float64)
+
+        # (M, 33) 必要ランドマーク行列
+        self.required = np.zeros((len(self.definitions), NUM_LANDMARKS))
+        for column, definition in enumerate(self.definitions):
+            self.required[column, [LANDMARK_INDEX[name] for name in definition.landmarks]] = 1
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def evaluate(self, landmarks: np.ndarray) -> np.ndarray:
+        """(N, 33, C) float テンソルから全メトリクスを (N, M) で評価"""
+        xy = landmarks[..., :2]
+        points = (xy[:, self._point_a] + xy[:, self._point_b]) * 0.5   # (N, P, 2)
+        values = np.empty((landmarks.shape[0], len(self.definitions)))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if 'angle' in self._columns:
+                p = points[:, self._points['angle']]                     # (N, K, 3, 2)
+                values[:, self._columns['angle']] = BatchAngleCalculator.vector_angle(p[:, :, 0] - p[:, :, 1],
+                                                                                      p[:, :, 2] - p[:, :, 1])
+            if 'offset' in self._columns:
+                p = points[:, self._points['offset']]
+                delta = p[:, :, 0] - p[:, :, 1]                         # (N, K, 2)
+                axis = np.broadcast_to(self._offset_axis[None, :, None], delta.shape[:2] + (1,))
+                values[:, self._columns['offset']] = np.abs(np.take_along_axis(delta, axis, axis=2)[..., 0])
+            if 'tilt' in self._columns:
+                p = points[:, self._points['tilt']]
+                delta = p[:, :, 1] - p[:, :, 0]
+                delta = np.where(self._tilt_undirected[None, :, None], np.abs(delta), delta)
+                values[:, self._columns['tilt']] = np.abs(np.degrees(np.arctan2(delta[..., 1], delta[..., 0])))
+            if 'distance_ratio' in self._columns:
+                p = points[:, self._points['distance_ratio']]
+                numerator = np.hypot(*np.moveaxis(p[:, :, 0] - p[:, :, 1], -1, 0))
+                denominator = np.hypot(*np.moveaxis(p[:, :, 2] - p[:, :, 3], -1, 0))
+                values[:, self._columns['distance_ratio']] = numerator / denominator
+
+            values = np.minimum(np.maximum(values * self.scale + self.bias, self.lower), self.upper)
+
+        missing = np.isnan(landmarks[:, :, 0]) @ self.required.T > 0
+        values = np.where(np.isfinite(values), values, self.default)
+        return np.where(missing, self.missing_value, values)
+
+    def ranges(self, names: Optional[Sequence[str]] = None) -> Dict[str, Tuple[float, float]]:
+        """メトリクス名 → 正常範囲"""
+        names = self.names if names is None else names
+        return {name: self.by_name[name].normal_range for name in names}
+
+    @property
+    def core_names(self) -> Tuple[str, ...]:
+        return tuple(d.name for d in self.definitions if d.core)
+
+    @property
+    def extended_names(self) -> Tuple[str, ...]:
+        """基本フィールド以外のメトリクス（PostureMetrics.registry_metrics に格納）"""
+        return tuple(d.name for d in self.definitions if not d.core)
+
+    @property
+    def report_metrics(self) -> Tuple[MetricDefinition, ...]:
+        return tuple(d for d in self.definitions if d.in_report)
+
+    @property
+    def chart_metrics(self) -> Tuple[MetricDefinition, ...]:
+        return tuple(d for d in self.definitions if d.in_chart)
+
+
+def metric_value(metrics, name: str) -> Optional[float]:
+    """PostureMetrics からメトリクスの値を名前で取得（基本フィールド以外は registry_metrics から）"""
+    value = getattr(metrics, name, None)
+    if value is None:
+        value = (getattr(metrics, 'registry_metrics', None) or {}).get(name)
+    return value
+
+
+METRIC_REGISTRY = CompiledMetricRegistry(METRIC_DEFINITIONS)
@@ -3,10 +3,61 @@ import math
 from typing import Dict, List, Tuple, Optional
 import logging
 
+from backend.app.utils.landmark_array import (
+    LandmarkArray, LANDMARK_INDEX, X, Y, Z, VISIBILITY, landmark_tensor
+)
+
 logger = logging.getLogger(__name__)
 
+# Integer codes returned by the batch orientation detector
+ORIENTATION_CODES = ('unknown', 'sagittal', 'frontal', 'posterior', 'oblique')
+ORIENTATION_CODE = {name: code for code, name in enumerate(ORIENTATION_CODES)}
+
+# Bit order of the batch validation masks
+VALIDATION_CHECKS = (
+    'head_above_shoulders', 'shoulders_above_hips', 'hips_above_knees', 'knees_above_ankles'
+)
+
+# Column order of the batch symmetry matrix
+SYMMETRY_PAIRS = (
+    ('left_shoulder', 'right_shoulder'),
+    ('left_hip', 'right_hip'),
+    ('left_knee', 'right_knee'),
+    ('left_ankle', 'right_ankle'),
+    ('left_elbow', 'right_elbow'),
+    ('left_wrist', 'right_wrist')
+)
+
+_QUALITY_KEY_LANDMARKS = [
+    'nose', 'left_shoulder', 'right_shoulder',
+    'left_hip', 'right_hip', 'left_knee', 'right_knee'
+]
+
+
+def _index(*names: str) -> List[int]:
+    return [LANDMARK_INDEX[name] for name in names]
+
+
+_TORSO = _index('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip')
+_EARS = _index('left_ear', 'right_ear')
+_NOSE = LANDMARK_INDEX['nose']
+# Vertical ordering checks: (upper landmarks, lower landmarks) per VALIDATION_CHECKS entry
+_VALIDATION_LEVELS = (
+    (_index('nose'), _index('left_shoulder', 'right_shoulder')),
+    (_index('left_shoulder', 'right_shoulder'), _index('left_hip', 'right_hip')),
+    (_index('left_hip', 'right_hip'), _index('left_knee', 'right_knee')),
+    (_index('left_knee', 'right_knee'), _index('left_ankle', 'right_ankle')),
+)
+_SYMMETRY_LEFT = _index(*(left for left, _ in SYMMETRY_PAIRS))
+_SYMMETRY_RIGHT = _index(*(right for _, right in SYMMETRY_PAIRS))
+
+
 class PoseDetector:
-    """Advanced pose detection and orientation analysis"""
+    """Advanced pose detection and orientation analysis
+    
+    The ``*_batch`` methods evaluate the same checks over (N, 33, 4) landmark
+    tensors and return arrays, for gating many frames at once.
+    """
     
     def __init__(self):
         self.pose_orientations = {
@@ -22,38 +73,39 @@ class PoseDetector:
         Based on shoulder and hip visibility and positioning
         """
         try:
+            landmarks = LandmarkArray.coerce(landmarks)
+            
             # Key landmarks for orientation detection
-            left_shoulder = landmarks.get('left_shoulder')
-            right_shoulder = landmarks.get('right_shoulder')
-            left_hip = landmarks.get('left_hip')
-            right_hip = landmarks.get('right_hip')
-            nose = landmarks.get('nose')
-            left_ear = landmarks.get('left_ear')
-            right_ear = landmarks.get('right_ear')
-            
-            if not all([left_shoulder, right_shoulder, left_hip, right_hip]):
+            if not landmarks.has('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'):
                 return 'unknown'
             
+            left_shoulder, right_shoulder, left_hip, right_hip = landmarks.take(
+                ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip']
+            ).tolist()
+            
             # Calculate visibility scores
-            shoulder_visibility = (left_shoulder['visibility'] + right_shoulder['visibility']) / 2
-            hip_visibility = (left_hip['visibility'] + right_hip['visibility']) / 2
+            shoulder_visibility = (left_shoulder[VISIBILITY] + right_shoulder[VISIBILITY]) / 2
+            hip_visibility = (left_hip[VISIBILITY] + right_hip[VISIBILITY]) / 2
             
             # Calculate shoulder width (normalized)
-            shoulder_width = abs(left_shoulder['x'] - right_shoulder['x'])
-            hip_width = abs(left_hip['x'] - right_hip['x'])
+            shoulder_width = abs(left_shoulder[X] - right_shoulder[X])
+            hip_width = abs(left_hip[X] - right_hip[X])
             
             # Calculate depth indicators
-            shoulder_z_diff = abs(left_shoulder.get('z', 0) - right_shoulder.get('z', 0))
-            hip_z_diff = abs(left_hip.get('z', 0) - right_hip.get('z', 0))
+            shoulder_z_diff = abs(left_shoulder[Z] - right_shoulder[Z])
+            hip_z_diff = abs(left_hip[Z] - right_hip[Z])
             
             # Ear visibility for head orientation
             ear_visibility_diff = 0
-            if left_ear and right_ear:
-                ear_visibility_diff = abs(left_ear['visibility'] - right_ear['visibility'])
+            if landmarks.has('left_ear', 'right_ear'):
+                ear_visibility_diff = abs(
+                    landmarks.visibility('left_ear') - landmarks.visibility('right_ear')
+                )
             
-            logger.info(f"Pose analysis - Shoulder width: {shoulder_width:.3f}, Hip width: {hip_width:.3f}")
-            logger.info(f"Visibility - Shoulders: {shoulder_visibility:.3f}, Hips: {hip_visibility:.3f}")
-            logger.info(f"Z-diff - Shoulders: {shoulder_z_diff:.3f}, Hips: {hip_z_diff:.3f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Pose analysis - Shoulder width: {shoulder_width:.3f}, Hip width: {hip_width:.3f}")
+                logger.debug(f"Visibility - Shoulders: {shoulder_visibility:.3f}, Hips: {hip_visibility:.3f}")
+                logger.debug(f"Z-diff - Shoulders: {shoulder_z_diff:.3f}, Hips: {hip_z_diff:.3f}")
             
             # Decision logic based on multiple factors
             if shoulder_width < 0.1 and hip_width < 0.1:
@@ -65,7 +117,7 @@ class PoseDetector:
                     return 'oblique'
                 else:
                     # Check if it's front or back based on nose visibility
-                    if nose and nose['visibility'] > 0.7:
+                    if 'nose' in landmarks and landmarks.visibility('nose') > 0.7:
                         return 'frontal'
                     else:
                         return 'posterior'
@@ -84,35 +136,21 @@ class PoseDetector:
         Calculate overall pose quality score based on landmark visibility and positioning
         """
         try:
-            key_landmarks = [
-                'nose', 'left_shoulder', 'right_shoulder',
-                'left_hip', 'right_hip', 'left_knee', 'right_knee'
-            ]
-            
-            total_visibility = 0
-            valid_landmarks = 0
+            landmarks = LandmarkArray.coerce(landmarks)
             
-            for landmark_name in key_landmarks:
-                landmark = landmarks.get(landmark_name)
-                if landmark:
-                    total_visibility += landmark['visibility']
-                    valid_landmarks += 1
+            key_rows = landmarks.take(_QUALITY_KEY_LANDMARKS)
+            detected = ~np.isnan(key_rows[:, X])
             
-            if valid_landmarks == 0:
+            if not detected.any():
                 return 0.0
             
-            base_score = total_visibility / valid_landmarks
+            base_score = float(np.nan_to_num(key_rows[detected, VISIBILITY]).mean(dtype=np.float64))
             
             # Bonus for symmetry in frontal/posterior views
-            left_shoulder = landmarks.get('left_shoulder')
-            right_shoulder = landmarks.get('right_shoulder')
-            left_hip = landmarks.get('left_hip')
-            right_hip = landmarks.get('right_hip')
-            
             symmetry_bonus = 0
-            if all([left_shoulder, right_shoulder, left_hip, right_hip]):
-                shoulder_symmetry = 1 - abs(left_shoulder['visibility'] - right_shoulder['visibility'])
-                hip_symmetry = 1 - abs(left_hip['visibility'] - right_hip['visibility'])
+            if landmarks.has('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'):
+                shoulder_symmetry = 1 - abs(landmarks.visibility('left_shoulder') - landmarks.visibility('right_shoulder'))
+                hip_symmetry = 1 - abs(landmarks.visibility('left_hip') - landmarks.visibility('right_hip'))
                 symmetry_bonus = (shoulder_symmetry + hip_symmetry) / 20  # Small bonus
             
             return min(1.0, base_score + symmetry_bonus)
@@ -155,45 +193,34 @@ class PoseDetector:
         validation_results = {}
         
         try:
-            # Check head-shoulder relationship
-            nose = landmarks.get('nose')
-            left_shoulder = landmarks.get('left_shoulder')
-            right_shoulder = landmarks.get('right_shoulder')
+            landmarks = LandmarkArray.coerce(landmarks)
             
-            if all([nose, left_shoulder, right_shoulder]):
+            # Check head-shoulder relationship
+            if landmarks.has('nose', 'left_shoulder', 'right_shoulder'):
                 # Head should be above shoulders
-                avg_shoulder_y = (left_shoulder['y'] + right_shoulder['y']) / 2
-                validation_results['head_above_shoulders'] = nose['y'] < avg_shoulder_y
+                avg_shoulder_y = landmarks.midpoint('left_shoulder', 'right_shoulder')[1]
+                validation_results['head_above_shoulders'] = bool(landmarks.xy('nose')[1] < avg_shoulder_y)
             
             # Check shoulder-hip relationship
-            left_hip = landmarks.get('left_hip')
-            right_hip = landmarks.get('right_hip')
-            
-            if all([left_shoulder, right_shoulder, left_hip, right_hip]):
+            if landmarks.has('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'):
                 # Shoulders should be above hips
-                avg_shoulder_y = (left_shoulder['y'] + right_shoulder['y']) / 2
-                avg_hip_y = (left_hip['y'] + right_hip['y']) / 2
-                validation_results['shoulders_above_hips'] = avg_shoulder_y < avg_hip_y
+                avg_shoulder_y = landmarks.midpoint('left_shoulder', 'right_shoulder')[1]
+                avg_hip_y = landmarks.midpoint('left_hip', 'right_hip')[1]
+                validation_results['shoulders_above_hips'] = bool(avg_shoulder_y < avg_hip_y)
             
             # Check hip-knee relationship
-            left_knee = landmarks.get('left_knee')
-            right_knee = landmarks.get('right_knee')
-            
-            if all([left_hip, right_hip, left_knee, right_knee]):
+            if landmarks.has('left_hip', 'right_hip', 'left_knee', 'right_knee'):
                 # Hips should be above knees
-                avg_hip_y = (left_hip['y'] + right_hip['y']) / 2
-                avg_knee_y = (left_knee['y'] + right_knee['y']) / 2
-                validation_results['hips_above_knees'] = avg_hip_y < avg_knee_y
+                avg_hip_y = landmarks.midpoint('left_hip', 'right_hip')[1]
+                avg_knee_y = landmarks.midpoint('left_knee', 'right_knee')[1]
+                validation_results['hips_above_knees'] = bool(avg_hip_y < avg_knee_y)
             
             # Check knee-ankle relationship
-            left_ankle = landmarks.get('left_ankle')
-            right_ankle = landmarks.get('right_ankle')
-            
-            if all([left_knee, right_knee, left_ankle, right_ankle]):
+            if landmarks.has('left_knee', 'right_knee', 'left_ankle', 'right_ankle'):
                 # Knees should be above ankles
-                avg_knee_y = (left_knee['y'] + right_knee['y']) / 2
-                avg_ankle_y = (left_ankle['y'] + right_ankle['y']) / 2
-                validation_results['knees_above_ankles'] = avg_knee_y < avg_ankle_y
+                avg_knee_y = landmarks.midpoint('left_knee', 'right_knee')[1]
+                avg_ankle_y = landmarks.midpoint('left_ankle', 'right_ankle')[1]
+                validation_results['knees_above_ankles'] = bool(avg_knee_y < avg_ankle_y)
             
             return validation_results
             
@@ -207,26 +234,19 @@ class PoseDetector:
         """
         symmetry_scores = {}
         
-        pairs = [
-            ('left_shoulder', 'right_shoulder'),
-            ('left_hip', 'right_hip'),
-            ('left_knee', 'right_knee'),
-            ('left_ankle', 'right_ankle'),
-            ('left_elbow', 'right_elbow'),
-            ('left_wrist', 'right_wrist')
-        ]
-        
         try:
-            for left_name, right_name in pairs:
-                left_landmark = landmarks.get(left_name)
-                right_landmark = landmarks.get(right_name)
-                
-                if left_landmark and right_landmark:
+            landmarks = LandmarkArray.coerce(landmarks)
+            
+            for left_name, right_name in SYMMETRY_PAIRS:
+                if landmarks.has(left_name, right_name):
+                    left_landmark = landmarks.row(left_name)
+                    right_landmark = landmarks.row(right_name)
+                    
                     # Calculate height difference (y-coordinate)
-                    height_diff = abs(left_landmark['y'] - right_landmark['y'])
+                    height_diff = abs(float(left_landmark[Y]) - float(right_landmark[Y]))
                     
                     # Calculate visibility difference
-                    visibility_diff = abs(left_landmark['visibility'] - right_landmark['visibility'])
+                    visibility_diff = abs(float(left_landmark[VISIBILITY]) - float(right_landmark[VISIBILITY]))
                     
                     # Combined symmetry score (0 = perfect symmetry, 1 = maximum asymmetry)
                     symmetry_score = 1 - ((height_diff + visibility_diff) / 2)
@@ -236,4 +256,96 @@ class PoseDetector:
             
         except Exception as e:
             logger.error(f"Error calculating bilateral symmetry: {str(e)}")
-            return {}
\ No newline at end of file
+            return {}
+    
+    # === Batch variants over (N, 33, 4) landmark tensors ===
+    
+    def detect_pose_orientation_batch(self, landmarks) -> np.ndarray:
+        """
+        Detect pose orientation for every pose in a batch
+        Returns (N,) int8 codes indexing ORIENTATION_CODES
+        """
+        landmarks = landmark_tensor(landmarks)
+        torso = landmarks[:, _TORSO]
+        
+        shoulder_width = np.abs(torso[:, 0, X] - torso[:, 1, X])
+        hip_width = np.abs(torso[:, 2, X] - torso[:, 3, X])
+        
+        ears = landmarks[:, _EARS]
+        ears_detected = ~np.isnan(ears[:, :, X]).any(axis=1)
+        ear_visibility = np.nan_to_num(ears[:, :, VISIBILITY])
+        ear_visibility_diff = np.where(ears_detected, np.abs(ear_visibility[:, 0] - ear_visibility[:, 1]), 0.0)
+        
+        nose = landmarks[:, _NOSE]
+        nose_visible = ~np.isnan(nose[:, X]) & (np.nan_to_num(nose[:, VISIBILITY]) > 0.7)
+        
+        narrow = (shoulder_width < 0.1) & (hip_width < 0.1)
+        wide = (shoulder_width > 0.3) & (hip_width > 0.2)
+        medium = (shoulder_width >= 0.1) & (shoulder_width <= 0.3)
+        
+        wide_codes = np.where(
+            ear_visibility_diff > 0.3, ORIENTATION_CODE['oblique'],
+            np.where(nose_visible, ORIENTATION_CODE['frontal'], ORIENTATION_CODE['posterior'])
+        )
+        codes = np.select(
+            [np.isnan(torso[:, :, X]).any(axis=1), narrow, wide, medium],
+            [ORIENTATION_CODE['unknown'], ORIENTATION_CODE['sagittal'], wide_codes, ORIENTATION_CODE['oblique']],
+            default=ORIENTATION_CODE['frontal']
+        )
+        return codes.astype(np.int8)
+    
+    def calculate_pose_quality_score_batch(self, landmarks) -> np.ndarray:
+        """Calculate pose quality scores for every pose in a batch as an (N,) array"""
+        landmarks = landmark_tensor(landmarks)
+        
+        key_rows = landmarks[:, _index(*_QUALITY_KEY_LANDMARKS)]
+        detected = ~np.isnan(key_rows[:, :, X])
+        count = detected.sum(axis=1)
+        visibility_sum = np.where(detected, np.nan_to_num(key_rows[:, :, VISIBILITY]), 0.0).sum(axis=1)
+        base_score = visibility_sum / np.maximum(count, 1)
+        
+        torso = landmarks[:, _TORSO]
+        torso_visibility = np.nan_to_num(torso[:, :, VISIBILITY])
+        shoulder_symmetry = 1 - np.abs(torso_visibility[:, 0] - torso_visibility[:, 1])
+        hip_symmetry = 1 - np.abs(torso_visibility[:, 2] - torso_visibility[:, 3])
+        symmetry_bonus = np.where(
+            np.isnan(torso[:, :, X]).any(axis=1), 0.0, (shoulder_symmetry + hip_symmetry) / 20
+        )
+        
+        return np.where(count > 0, np.minimum(1.0, base_score + symmetry_bonus), 0.0)
+    
+    def validate_landmark_consistency_batch(self, landmarks) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Validate anatomical ordering for every pose in a batch
+        Returns (checked, passed) uint8 bitmasks over VALIDATION_CHECKS; a check
+        is only evaluated (bit set in checked) when all of its landmarks are detected
+        """
+        landmarks = landmark_tensor(landmarks)
+        checked = np.zeros(landmarks.shape[0], dtype=np.uint8)
+        passed = np.zeros(landmarks.shape[0], dtype=np.uint8)
+        
+        for bit, (upper, lower) in enumerate(_VALIDATION_LEVELS):
+            rows = landmarks[:, upper + lower]
+            available = ~np.isnan(rows[:, :, X]).any(axis=1)
+            ok = available & (rows[:, :len(upper), Y].mean(axis=1) < rows[:, len(upper):, Y].mean(axis=1))
+            checked |= available.astype(np.uint8) << bit
+            passed |= ok.astype(np.uint8) << bit
+        
+        return checked, passed
+    
+    def calculate_bilateral_symmetry_batch(self, landmarks) -> np.ndarray:
+        """
+        Calculate bilateral symmetry scores for every pose in a batch
+        Returns an (N, len(SYMMETRY_PAIRS)) matrix, NaN where a pair is not detected
+        """
+        landmarks = landmark_tensor(landmarks)
+        left = landmarks[:, _SYMMETRY_LEFT]
+        right = landmarks[:, _SYMMETRY_RIGHT]
+        
+        height_diff = np.abs(left[:, :, Y] - right[:, :, Y])
+        visibility_diff = np.abs(left[:, :, VISIBILITY] - right[:, :, VISIBILITY])
+        # Unset visibility scores 0, matching max(0, nan) in the per-pose method
+        scores = np.fmax(1 - (height_diff + visibility_diff) / 2, 0.0)
+        
+        detected = ~(np.isnan(left[:, :, X]) | np.isnan(right[:, :, X]))
+        return np.where(detected, scores, np.nan)
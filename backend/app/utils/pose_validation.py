@@ -2,8 +2,23 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 import logging
 
+from backend.app.utils.landmark_array import LandmarkArray, LANDMARK_INDEX, X, Y, VISIBILITY, landmark_tensor
+
 logger = logging.getLogger(__name__)
 
+# Column order of check_pose_quality_batch (NaN where a score does not apply)
+QUALITY_COLUMNS = ('shoulder_symmetry', 'hip_symmetry', 'average_visibility', 'overall')
+
+# Bit order of check_measurement_consistency_batch
+CONSISTENCY_ISSUES = (
+    "Subject may not be facing the camera directly",
+    "Unusual shoulder to hip width ratio detected",
+)
+
+_TORSO = [LANDMARK_INDEX[name] for name in ('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip')]
+_FACE = [LANDMARK_INDEX[name] for name in ('nose', 'left_ear', 'right_ear')]
+
+
 class PoseValidation:
     """Validation utilities for pose landmarks and measurements"""
     
@@ -51,15 +66,21 @@ class PoseValidation:
             quality_scores['hip_symmetry'] = max(0, 1 - hip_diff * 2)
         
         # Visibility scores
-        total_visibility = 0
-        count = 0
-        for landmark_name, landmark in landmarks.items():
-            if 'visibility' in landmark:
-                total_visibility += landmark['visibility']
-                count += 1
-        
-        if count > 0:
-            quality_scores['average_visibility'] = total_visibility / count
+        if isinstance(landmarks, LandmarkArray):
+            visibilities = landmarks.data[:, VISIBILITY]
+            visibilities = visibilities[~np.isnan(visibilities)]
+            if visibilities.size > 0:
+                quality_scores['average_visibility'] = float(visibilities.mean(dtype=np.float64))
+        else:
+            total_visibility = 0
+            count = 0
+            for landmark_name, landmark in landmarks.items():
+                if 'visibility' in landmark:
+                    total_visibility += landmark['visibility']
+                    count += 1
+            
+            if count > 0:
+                quality_scores['average_visibility'] = total_visibility / count
         
         # Overall quality score
         if quality_scores:
@@ -130,6 +151,13 @@ class PoseValidation:
                              min_visibility: float = 0.3) -> Dict[str, Dict[str, float]]:
         """Filter out landmarks with low visibility or confidence"""
         
+        if isinstance(landmarks, LandmarkArray):
+            # Return a new array with low-visibility rows marked as undetected (NaN)
+            filtered = landmarks.data.copy()
+            visibilities = np.nan_to_num(filtered[:, VISIBILITY])
+            filtered[visibilities < min_visibility] = np.nan
+            return LandmarkArray(filtered)
+        
         filtered_landmarks = {}
         
         for landmark_name, landmark in landmarks.items():
@@ -193,4 +221,63 @@ class PoseValidation:
                 # Unknown measurement, assume valid
                 validation_results[measurement_name] = True
         
-        return validation_results
\ No newline at end of file
+        return validation_results
+    
+    # === Batch variants over (N, 33, 4) landmark tensors ===
+    
+    @staticmethod
+    def check_pose_quality_batch(landmarks) -> np.ndarray:
+        """Assess pose quality for every pose in a batch as an (N, len(QUALITY_COLUMNS)) matrix"""
+        
+        landmarks = landmark_tensor(landmarks)
+        quality = np.full((landmarks.shape[0], len(QUALITY_COLUMNS)), np.nan)
+        
+        torso = landmarks[:, _TORSO]
+        torso_detected = ~np.isnan(torso[:, :, X]).any(axis=1, keepdims=True)
+        diffs = np.abs(torso[:, [0, 2], Y] - torso[:, [1, 3], Y])
+        quality[:, :2] = np.where(torso_detected, np.maximum(0, 1 - diffs * 2), np.nan)
+        
+        visibilities = landmarks[:, :, VISIBILITY]
+        has_visibility = ~np.isnan(visibilities)
+        count = has_visibility.sum(axis=1)
+        quality[:, 2] = np.where(
+            count > 0, np.nansum(visibilities, axis=1) / np.maximum(count, 1), np.nan
+        )
+        
+        # Overall quality is the mean of the applicable scores (0 when none apply)
+        scored = ~np.isnan(quality[:, :3])
+        quality[:, 3] = np.where(
+            scored.any(axis=1),
+            np.nansum(quality[:, :3], axis=1) / np.maximum(scored.sum(axis=1), 1),
+            0.0
+        )
+        return quality
+    
+    @staticmethod
+    def check_measurement_consistency_batch(landmarks) -> np.ndarray:
+        """Check consistency for every pose in a batch as (N,) uint8 bitmasks over CONSISTENCY_ISSUES"""
+        
+        landmarks = landmark_tensor(landmarks)
+        
+        face = landmarks[:, _FACE, X]
+        nose_x, left_ear_x, right_ear_x = face[:, 0], face[:, 1], face[:, 2]
+        not_facing = ~np.isnan(face).any(axis=1) & ~(
+            (np.minimum(left_ear_x, right_ear_x) <= nose_x) & (nose_x <= np.maximum(left_ear_x, right_ear_x))
+        )
+        
+        torso = landmarks[:, _TORSO, X]
+        shoulder_width = np.abs(torso[:, 0] - torso[:, 1])
+        hip_width = np.abs(torso[:, 2] - torso[:, 3])
+        measurable = ~np.isnan(torso).any(axis=1) & (shoulder_width > 0) & (hip_width > 0)
+        ratio = shoulder_width / np.where(measurable, hip_width, 1.0)
+        unusual_ratio = measurable & ((ratio < 0.7) | (ratio > 1.5))
+        
+        return not_facing.astype(np.uint8) | (unusual_ratio.astype(np.uint8) << 1)
+    
+    @staticmethod
+    def filter_noisy_landmarks_batch(landmarks, min_visibility: float = 0.3) -> np.ndarray:
+        """Return a copy of the batch with low-visibility landmarks set to undetected (NaN)"""
+        
+        filtered = landmark_tensor(landmarks).copy()
+        filtered[np.nan_to_num(filtered[:, :, VISIBILITY]) < min_visibility] = np.nan
+        return filtered
@@ -1,8 +1,14 @@
-from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
 from enum import Enum
+from types import MappingProxyType
 import math
+import numpy as np
 from backend.app.models.posture_result import PostureMetrics
 from backend.app.utils.logger import get_logger
+from backend.app.utils.metric_registry import CompiledMetricRegistry, METRIC_REGISTRY, metric_value
+from backend.app.utils.pose_detector import ORIENTATION_CODE, ORIENTATION_CODES
+from backend.app.utils.suggestion_catalog import METRIC_SUGGESTIONS, get_suggestion_catalog
 
 logger = get_logger("posture_classifier")
 
@@ -25,25 +31,302 @@ class PostureColorJudgment(Enum):
     POOR = "poor"  # オレンジ
     CRITICAL = "critical"  # 赤
 
+# === 判定テーブル ===
+
+# 正常範囲外の偏差率 (%) の帯域上限（GOOD / FAIR / POOR、超過は CRITICAL）
+DEVIATION_BANDS = np.array([20.0, 40.0, 60.0])
+
+# 全体判定の平均スコア下限（CRITICAL 未満 → POOR → FAIR → GOOD → EXCELLENT）
+OVERALL_SCORE_BANDS = np.array([1.5, 2.5, 3.5, 4.5])
+
+# 判定レベル 0..4（EXCELLENT..CRITICAL）ごとのスコア
+JUDGMENT_SCORES = np.array([5, 4, 3, 2, 1])
+
+# 判定結果は呼び出しごとに生成せず、共有の読み取り専用マッピングを返す（結果モデルに格納する際に dict へ変換する）
+METRIC_JUDGMENTS: Tuple[Mapping[str, str], ...] = tuple(MappingProxyType(judgment) for judgment in (
+    {'color': PostureColorJudgment.EXCELLENT.value, 'color_code': '#22c55e',  # 緑
+     'status': 'normal', 'message': '正常範囲内です'},
+    {'color': PostureColorJudgment.GOOD.value, 'color_code': '#84cc16',  # 黄緑
+     'status': 'slight_deviation', 'message': '軽度の偏差があります'},
+    {'color': PostureColorJudgment.FAIR.value, 'color_code': '#eab308',  # 黄
+     'status': 'moderate_deviation', 'message': '中程度の偏差があります'},
+    {'color': PostureColorJudgment.POOR.value, 'color_code': '#f97316',  # オレンジ
+     'status': 'significant_deviation', 'message': '大きな偏差があります'},
+    {'color': PostureColorJudgment.CRITICAL.value, 'color_code': '#ef4444',  # 赤
+     'status': 'critical_deviation', 'message': '要改善の状態です'},
+))
+
+OVERALL_JUDGMENTS: Tuple[Mapping[str, str], ...] = tuple(MappingProxyType(judgment) for judgment in (
+    {'color': PostureColorJudgment.EXCELLENT.value, 'color_code': '#22c55e', 'message': '全体的に良好な姿勢です'},
+    {'color': PostureColorJudgment.GOOD.value, 'color_code': '#84cc16', 'message': '概ね良好な姿勢です'},
+    {'color': PostureColorJudgment.FAIR.value, 'color_code': '#eab308', 'message': '改善の余地があります'},
+    {'color': PostureColorJudgment.POOR.value, 'color_code': '#f97316', 'message': '改善が必要です'},
+    {'color': PostureColorJudgment.CRITICAL.value, 'color_code': '#ef4444', 'message': '要改善の状態です'},
+))
+
+NO_DATA_JUDGMENT: Mapping[str, str] = MappingProxyType({
+    'color': PostureColorJudgment.FAIR.value,
+    'color_code': '#eab308',
+    'message': '判定に十分なデータがありません'
+})
+
+_COLOR_SCORES = {judgment['color']: int(score) for judgment, score in zip(METRIC_JUDGMENTS, JUDGMENT_SCORES)}
+
+# 辞書形式の追加メトリクスを判定する代表値
+ADDITIONAL_JUDGMENT_KEYS = {
+    'knee_valgus_varus': 'average_deviation',
+    'heel_inclination': 'average_inclination',
+}
+
+POSTURE_TYPES: Tuple[PostureType, ...] = tuple(PostureType)
+_POSTURE_TYPE_CODE = {posture_type: code for code, posture_type in enumerate(POSTURE_TYPES)}
+
+_SAGITTAL_VIEWS = ('sagittal', 'oblique')
+_FRONTAL_VIEWS = ('frontal', 'posterior', 'oblique')
+
+
+@dataclass(frozen=True)
+class ThresholdFlag:
+    """メトリクスの閾値判定（value > threshold または value < threshold）"""
+    name: str
+    metric: str
+    op: str
+    threshold: float
+
+
+@dataclass(frozen=True)
+class ClassificationRule:
+    """
+    姿勢タイプの分類ルール
+    all_of のフラグがすべて立ち、none_of のフラグがどれも立たず、
+    any_of（指定時）のいずれかが立つ場合に該当（views 外の姿勢方向では判定しない）
+    """
+    posture_type: PostureType
+    all_of: Tuple[str, ...] = ()
+    none_of: Tuple[str, ...] = ()
+    any_of: Tuple[str, ...] = ()
+    views: Optional[Tuple[str, ...]] = None  # None は全方向
+
+
+class CompiledRuleTable:
+    """
+    閾値フラグと分類ルールを数値テーブルにコンパイルし、(N, M) メトリクス行列に一括適用する
+
+    分類結果は priority 順で最初に該当したルールの姿勢タイプコード（なければ default）、
+    該当ルールの (N, R) マスク、理想姿勢マスク (N,) として返す。ideal_ranges の範囲内にある
+    メトリクスが ideal_ratio 以上の姿勢は ideal タイプとなり、該当ルールはクリアされる。
+    """
+
+    def __init__(self, metrics: Sequence[str], flags: Sequence[ThresholdFlag],
+                 rules: Sequence[ClassificationRule], priority: Sequence[PostureType],
+                 default: PostureType, ideal: PostureType,
+                 ideal_ranges: Dict[str, Tuple[float, float]], ideal_ratio: float = 0.8,
+                 missing_value: float = np.nan):
+        self.metrics = tuple(metrics)
+        self.rules = tuple(rules)
+        self.missing_value = missing_value
+        metric_index = {name: i for i, name in enumerate(self.metrics)}
+        flag_index = {flag.name: i for i, flag in enumerate(flags)}
+
+        for flag in flags:
+            if flag.op not in ('>', '<'):
+                raise ValueError(f"Unknown threshold operator '{flag.op}' for flag '{flag.name}'")
+        self._flag_columns = np.array([metric_index[flag.metric] for flag in flags], dtype=np.intp)
+        self._flag_sign = np.array([1.0 if flag.op == '>' else -1.0 for flag in flags])
+        self._flag_threshold = np.array([flag.threshold for flag in flags])
+
+        def flag_matrix(attr: str) -> np.ndarray:
+            matrix = np.zeros((len(self.rules), len(flags)), dtype=np.int32)
+            for r, rule in enumerate(self.rules):
+                for name in getattr(rule, attr):
+                    matrix[r, flag_index[name]] = 1
+            return matrix
+
+        self._all_of = flag_matrix('all_of')
+        self._none_of = flag_matrix('none_of')
+        self._any_of = flag_matrix('any_of')
+        self._all_count = self._all_of.sum(axis=1)
+        self._has_any = self._any_of.any(axis=1)
+
+        # 姿勢方向コード × ルール の適用可否
+        self._views = np.array([
+            [rule.views is None or orientation in rule.views for rule in self.rules]
+            for orientation in ORIENTATION_CODES
+        ])
+
+        rule_types = np.array([_POSTURE_TYPE_CODE[rule.posture_type] for rule in self.rules], dtype=np.int8)
+        self._priority = np.array(
+            [r for posture_type in priority for r, rule in enumerate(self.rules) if rule.posture_type == posture_type],
+            dtype=np.intp
+        )
+        self._priority_types = rule_types[self._priority]
+        self.default_code = _POSTURE_TYPE_CODE[default]
+        self.ideal_code = _POSTURE_TYPE_CODE[ideal]
+
+        self._ideal_columns = np.array([metric_index[name] for name in ideal_ranges], dtype=np.intp)
+        self._ideal_lower = np.array([lower for lower, _ in ideal_ranges.values()], dtype=np.float64)
+        self._ideal_upper = np.array([upper for _, upper in ideal_ranges.values()], dtype=np.float64)
+        self._ideal_required = len(ideal_ranges) * ideal_ratio
+
+    def matrix(self, values: Union[np.ndarray, Mapping[str, np.ndarray]]) -> np.ndarray:
+        """(N, M) 配列、またはメトリクス名 → (N,) 配列の辞書を (N, M) 行列に揃える"""
+        if isinstance(values, Mapping):
+            columns = [np.asarray(values[name], dtype=np.float64) if name in values else None
+                       for name in self.metrics]
+            n = next((len(np.atleast_1d(c)) for c in columns if c is not None), 1)
+            values = np.column_stack([
+                np.full(n, np.nan) if c is None else np.broadcast_to(c, (n,)) for c in columns
+            ])
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        if values.shape[1] != len(self.metrics):
+            raise ValueError(f"Expected {len(self.metrics)} metric columns, got {values.shape[1]}")
+        return np.where(np.isnan(values), self.missing_value, values)
+
+    def ideal(self, values) -> np.ndarray:
+        """理想姿勢マスク (N,)"""
+        ideal_values = self.matrix(values)[:, self._ideal_columns]
+        in_range = (ideal_values >= self._ideal_lower) & (ideal_values <= self._ideal_upper)
+        return in_range.sum(axis=1) >= self._ideal_required
+
+    def classify(self, values, orientation_codes: Optional[np.ndarray] = None
+                 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(姿勢タイプコード (N,), 該当ルールマスク (N, R), 理想姿勢マスク (N,)) を返す"""
+        values = self.matrix(values)
+        if orientation_codes is None:
+            orientation_codes = np.full(len(values), ORIENTATION_CODE['unknown'], dtype=np.intp)
+
+        flags = (self._flag_sign * (values[:, self._flag_columns] - self._flag_threshold) > 0).astype(np.int32)
+        matched = (
+            (flags @ self._all_of.T == self._all_count)
+            & (flags @ self._none_of.T == 0)
+            & (~self._has_any | (flags @ self._any_of.T > 0))
+            & self._views[orientation_codes]
+        )
+
+        by_priority = matched[:, self._priority]
+        primary = np.where(
+            by_priority.any(axis=1), self._priority_types[by_priority.argmax(axis=1)], self.default_code
+        ).astype(np.int8)
+
+        ideal = self.ideal(values)
+        primary[ideal] = self.ideal_code
+        matched[ideal] = False
+
+        return primary, matched, ideal
+
+
+STANDING_RULES = CompiledRuleTable(
+    metrics=METRIC_REGISTRY.core_names,
+    flags=(
+        ThresholdFlag('forward_head', 'head_forward_posture', '>', 5),
+        ThresholdFlag('thoracic_excessive', 'thoracic_kyphosis', '>', 50),
+        ThresholdFlag('lumbar_excessive', 'lumbar_lordosis', '>', 55),
+        ThresholdFlag('thoracic_reduced', 'thoracic_kyphosis', '<', 20),
+        ThresholdFlag('lumbar_reduced', 'lumbar_lordosis', '<', 25),
+        ThresholdFlag('shoulder_asymmetry', 'shoulder_height_difference', '>', 2),
+        ThresholdFlag('trunk_shift', 'trunk_lateral_deviation', '>', 2),
+    ),
+    # classifications の並び順
+    rules=(
+        ClassificationRule(PostureType.FORWARD_HEAD, all_of=('forward_head',), views=_SAGITTAL_VIEWS),
+        ClassificationRule(PostureType.KYPHOSIS_LORDOSIS, all_of=('thoracic_excessive', 'lumbar_excessive'),
+                           views=_SAGITTAL_VIEWS),
+        ClassificationRule(PostureType.FLAT_BACK, all_of=('thoracic_reduced', 'lumbar_reduced'),
+                           views=_SAGITTAL_VIEWS),
+        ClassificationRule(PostureType.SWAY_BACK, all_of=('lumbar_excessive',), none_of=('thoracic_excessive',),
+                           views=_SAGITTAL_VIEWS),
+        ClassificationRule(PostureType.LATERAL_DEVIATION, any_of=('shoulder_asymmetry', 'trunk_shift'),
+                           views=_FRONTAL_VIEWS),
+    ),
+    # 主タイプの優先順（脊柱カーブ > 頭部前方偏位 > 左右偏位）
+    priority=(PostureType.KYPHOSIS_LORDOSIS, PostureType.FLAT_BACK, PostureType.SWAY_BACK,
+              PostureType.FORWARD_HEAD, PostureType.LATERAL_DEVIATION),
+    default=PostureType.IDEAL,
+    ideal=PostureType.IDEAL,
+    ideal_ranges=METRIC_REGISTRY.ranges(METRIC_REGISTRY.core_names),
+)
+
+SEATED_RULES = CompiledRuleTable(
+    metrics=('seated_pelvic_tilt', 'head_neck_position', 'trunk_forward_lean',
+             'trunk_backward_lean', 'lateral_lean', 'shoulder_elevation'),
+    flags=(
+        ThresholdFlag('trunk_slumped', 'trunk_forward_lean', '>', 30),
+        ThresholdFlag('head_slumped', 'head_neck_position', '>', 8),
+        ThresholdFlag('lateral_lean', 'lateral_lean', '>', 15),
+    ),
+    rules=(
+        ClassificationRule(PostureType.SEATED_SLUMPED, any_of=('trunk_slumped', 'head_slumped')),
+        ClassificationRule(PostureType.LATERAL_DEVIATION, all_of=('lateral_lean',)),
+    ),
+    # 座位での左右偏位は主タイプを変えない
+    priority=(PostureType.SEATED_SLUMPED,),
+    default=PostureType.SEATED_UPRIGHT,
+    ideal=PostureType.SEATED_UPRIGHT,
+    # 座位の理想判定は上限のみ
+    ideal_ranges={
+        'seated_pelvic_tilt': (-np.inf, 15),
+        'head_neck_position': (-np.inf, 5),
+        'trunk_forward_lean': (-np.inf, 20),
+        'trunk_backward_lean': (-np.inf, 10),
+        'lateral_lean': (-np.inf, 10),
+        'shoulder_elevation': (-np.inf, 1.5),
+    },
+    # 未計測の座位メトリクスは 0 とみなす
+    missing_value=0.0,
+)
+
+
+def orientation_codes(orientations) -> np.ndarray:
+    """姿勢方向（文字列の列または ORIENTATION_CODES のコード配列）を (N,) コード配列に変換"""
+    orientations = np.atleast_1d(np.asarray(orientations))
+    if orientations.dtype.kind in 'iu':
+        return orientations.astype(np.intp)
+    unknown = ORIENTATION_CODE['unknown']
+    return np.array([ORIENTATION_CODE.get(o, unknown) for o in orientations.tolist()], dtype=np.intp)
+
+
+def judgment_levels(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    正常範囲に対する判定レベル 0..4（METRIC_JUDGMENTS のインデックス）を一括算出
+    値が NaN（未計測）の要素は -1
+    """
+    values = np.asarray(values, dtype=np.float64)
+    below = values < lower
+    above = values > upper
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deviation_percent = np.where(below, (lower - values) / lower, (values - upper) / upper) * 100
+    # 正常範囲の境界が 0 の場合の偏差率は無限大（CRITICAL）
+    deviation_percent = np.where(np.isnan(deviation_percent), np.inf, deviation_percent)
+
+    levels = np.where(below | above, np.searchsorted(DEVIATION_BANDS, deviation_percent, side='left') + 1, 0)
+    return np.where(np.isnan(values), -1, levels).astype(np.int8)
+
+
+def overall_judgment_levels(levels: np.ndarray) -> np.ndarray:
+    """(N, M) の判定レベル行列から全体判定レベル (N,) を算出（判定項目なしは -1）"""
+    levels = np.atleast_2d(levels)
+    judged = levels >= 0
+    count = judged.sum(axis=1)
+    scores = np.where(judged, JUDGMENT_SCORES[np.clip(levels, 0, None)], 0).sum(axis=1)
+    average = scores / np.maximum(count, 1)
+    overall = len(OVERALL_SCORE_BANDS) - np.searchsorted(OVERALL_SCORE_BANDS, average, side='right')
+    return np.where(count > 0, overall, -1).astype(np.int8)
+
+
 class PostureClassifier:
     """Posture classification and color judgment system"""
     
-    def __init__(self):
+    def __init__(self, registry: CompiledMetricRegistry = METRIC_REGISTRY):
         self.logger = logger
+        self.registry = registry
         
-        # 正常範囲の定義
-        self.normal_ranges = {
-            'pelvic_tilt': (5, 15),  # 度
-            'thoracic_kyphosis': (25, 45),  # 度
-            'cervical_lordosis': (15, 35),  # 度
-            'shoulder_height_difference': (0, 1.5),  # cm
-            'head_forward_posture': (0, 2.5),  # cm
-            'lumbar_lordosis': (30, 50),  # 度
-            'scapular_protraction': (0, 2),  # cm
-            'trunk_lateral_deviation': (0, 1),  # cm
+        # 正常範囲の定義（レジストリ定義メトリクス＋下肢メトリクス）
+        self.normal_ranges = registry.ranges()
+        self.normal_ranges.update({
             'knee_valgus_varus': (0, 10),  # 度
             'heel_inclination': (0, 5),  # 度
-        }
+        })
         
         # 座位姿勢の正常範囲
         self.seated_normal_ranges = {
@@ -54,62 +337,55 @@ class PostureClassifier:
             'lateral_lean': (0, 10),  # 度
             'shoulder_elevation': (0, 1.5),  # cm
         }
+        
+        # 判定対象メトリクスの範囲テーブル
+        self.judgment_ranges = {**self.seated_normal_ranges, **self.normal_ranges}
+        
+        self.suggestion_catalog = get_suggestion_catalog()
+    
+    def range_table(self, names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """メトリクス名の並びに対応する正常範囲の (下限, 上限) 配列"""
+        ranges = np.array([self.judgment_ranges[name] for name in names], dtype=np.float64).reshape(-1, 2)
+        return ranges[:, 0], ranges[:, 1]
     
     def classify_posture_type(self, metrics: PostureMetrics, pose_orientation: str, 
                             additional_metrics: Optional[Dict] = None) -> Dict[str, str]:
         """姿勢タイプを自動分類"""
         
-        # 座位姿勢の場合
-        if additional_metrics and 'seated_pelvic_tilt' in additional_metrics:
-            return self._classify_seated_posture(additional_metrics)
+        # 座位姿勢の場合（座位メトリクスは additional_metrics['seated_metrics'] に格納される）
+        seated_metrics = self._seated_metrics(additional_metrics)
+        if seated_metrics and 'seated_pelvic_tilt' in seated_metrics:
+            return self._classify_seated_posture(seated_metrics)
         
         # 立位姿勢の分類
         return self._classify_standing_posture(metrics, pose_orientation)
     
+    @staticmethod
+    def _seated_metrics(additional_metrics: Optional[Dict]) -> Optional[Dict]:
+        """座位メトリクス（入れ子の seated_metrics、なければ追加メトリクス自体）"""
+        if not additional_metrics:
+            return None
+        return additional_metrics.get('seated_metrics') or additional_metrics
+    
+    def classify_posture_type_batch(self, metrics, pose_orientations) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        立位姿勢の一括分類
+        metrics は (N, 基本メトリクス数) 配列またはメトリクス名 → (N,) 配列の辞書。
+        (POSTURE_TYPES のコード (N,), STANDING_RULES.rules に対する該当マスク (N, R),
+        理想姿勢マスク (N,)) を返す
+        """
+        return STANDING_RULES.classify(metrics, orientation_codes(pose_orientations))
+    
+    def classify_seated_posture_batch(self, seated_metrics) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """座位姿勢の一括分類（戻り値は classify_posture_type_batch と同形式）"""
+        return SEATED_RULES.classify(seated_metrics)
+    
     def _classify_standing_posture(self, metrics: PostureMetrics, pose_orientation: str) -> Dict[str, str]:
         """立位姿勢の分類"""
         
-        classifications = []
-        primary_type = PostureType.IDEAL
-        
-        # 前後方向の分析（矢状面）
-        if pose_orientation in ['sagittal', 'oblique']:
-            
-            # 頭部前方偏位が強い場合
-            if metrics.head_forward_posture > 5:
-                classifications.append("forward_head")
-                primary_type = PostureType.FORWARD_HEAD
-            
-            # 胸椎後弯と腰椎前弯の組み合わせ分析
-            thoracic_excessive = metrics.thoracic_kyphosis > 50
-            lumbar_excessive = metrics.lumbar_lordosis > 55
-            thoracic_reduced = metrics.thoracic_kyphosis < 20
-            lumbar_reduced = metrics.lumbar_lordosis < 25
-            
-            if thoracic_excessive and lumbar_excessive:
-                classifications.append("kyphosis_lordosis")
-                primary_type = PostureType.KYPHOSIS_LORDOSIS
-            elif thoracic_reduced and lumbar_reduced:
-                classifications.append("flat_back")
-                primary_type = PostureType.FLAT_BACK
-            elif lumbar_excessive and not thoracic_excessive:
-                classifications.append("sway_back")
-                primary_type = PostureType.SWAY_BACK
-        
-        # 左右方向の分析（前額面）
-        if pose_orientation in ['frontal', 'posterior', 'oblique']:
-            
-            # 左右の偏位が強い場合
-            if (metrics.shoulder_height_difference > 2 or 
-                metrics.trunk_lateral_deviation > 2):
-                classifications.append("lateral_deviation")
-                if primary_type == PostureType.IDEAL:
-                    primary_type = PostureType.LATERAL_DEVIATION
-        
-        # 理想的な姿勢かチェック
-        if self._is_ideal_posture(metrics):
-            primary_type = PostureType.IDEAL
-            classifications = ["ideal"]
+        values = [[getattr(metrics, name) for name in STANDING_RULES.metrics]]
+        primary, matched, ideal = self.classify_posture_type_batch(values, [pose_orientation])
+        primary_type, classifications = self._classification(STANDING_RULES, primary[0], matched[0], ideal[0])
         
         return {
             'primary_type': primary_type.value,
@@ -120,23 +396,8 @@ class PostureClassifier:
     def _classify_seated_posture(self, seated_metrics: Dict) -> Dict[str, str]:
         """座位姿勢の分類"""
         
-        classifications = []
-        primary_type = PostureType.SEATED_UPRIGHT
-        
-        # 座位猫背の判定
-        if (seated_metrics.get('trunk_forward_lean', 0) > 30 or
-            seated_metrics.get('head_neck_position', 0) > 8):
-            classifications.append("seated_slumped")
-            primary_type = PostureType.SEATED_SLUMPED
-        
-        # 座位での左右偏位
-        if seated_metrics.get('lateral_lean', 0) > 15:
-            classifications.append("lateral_deviation")
-        
-        # 理想的な座位姿勢かチェック
-        if self._is_ideal_seated_posture(seated_metrics):
-            primary_type = PostureType.SEATED_UPRIGHT
-            classifications = ["seated_upright"]
+        primary, matched, ideal = self.classify_seated_posture_batch(seated_metrics)
+        primary_type, classifications = self._classification(SEATED_RULES, primary[0], matched[0], ideal[0])
         
         return {
             'primary_type': primary_type.value,
@@ -144,184 +405,87 @@ class PostureClassifier:
             'description': self._get_seated_posture_description(primary_type, classifications)
         }
     
+    @staticmethod
+    def _classification(table: CompiledRuleTable, primary: int, matched: np.ndarray,
+                        ideal: bool) -> Tuple[PostureType, List[str]]:
+        primary_type = POSTURE_TYPES[primary]
+        if ideal:
+            return primary_type, [primary_type.value]
+        return primary_type, [table.rules[r].posture_type.value for r in np.flatnonzero(matched)]
+    
     def _is_ideal_posture(self, metrics: PostureMetrics) -> bool:
         """理想的な姿勢かどうか判定"""
         
-        checks = [
-            5 <= metrics.pelvic_tilt <= 15,
-            25 <= metrics.thoracic_kyphosis <= 45,
-            15 <= metrics.cervical_lordosis <= 35,
-            metrics.shoulder_height_difference <= 1.5,
-            metrics.head_forward_posture <= 2.5,
-            30 <= metrics.lumbar_lordosis <= 50,
-            metrics.scapular_protraction <= 2,
-            metrics.trunk_lateral_deviation <= 1
-        ]
-        
-        # 80%以上の指標が正常範囲内にある場合
-        return sum(checks) >= len(checks) * 0.8
+        return bool(STANDING_RULES.ideal([[getattr(metrics, name) for name in STANDING_RULES.metrics]])[0])
     
     def _is_ideal_seated_posture(self, seated_metrics: Dict) -> bool:
         """理想的な座位姿勢かどうか判定"""
         
-        checks = [
-            seated_metrics.get('seated_pelvic_tilt', 0) <= 15,
-            seated_metrics.get('head_neck_position', 0) <= 5,
-            seated_metrics.get('trunk_forward_lean', 0) <= 20,
-            seated_metrics.get('trunk_backward_lean', 0) <= 10,
-            seated_metrics.get('lateral_lean', 0) <= 10,
-            seated_metrics.get('shoulder_elevation', 0) <= 1.5
-        ]
+        return bool(SEATED_RULES.ideal(seated_metrics)[0])
+    
+    def _judgment_values(self, metrics: PostureMetrics, additional_metrics: Optional[Dict]) -> Dict[str, float]:
+        """判定対象のメトリクス名 → 数値"""
+        
+        # レジストリ定義メトリクス（基本＋registry_metrics）
+        values = {name: metric_value(metrics, name) for name in self.registry.names}
+        
+        # 追加メトリクス（膝・踵は代表値、座位は各項目）
+        for metric_name, value in (additional_metrics or {}).items():
+            if metric_name == 'seated_metrics':
+                values.update(value or {})
+            elif isinstance(value, Mapping):
+                key = ADDITIONAL_JUDGMENT_KEYS.get(metric_name)
+                values[metric_name] = value.get(key) if key else None
+            else:
+                values[metric_name] = value
         
-        return sum(checks) >= len(checks) * 0.8
+        return {
+            name: value for name, value in values.items()
+            if name in self.judgment_ranges and isinstance(value, (int, float))
+        }
     
     def calculate_color_judgment(self, metrics: PostureMetrics, 
-                               additional_metrics: Optional[Dict] = None) -> Dict[str, Dict]:
-        """各メトリクスのカラー判定"""
+                               additional_metrics: Optional[Dict] = None) -> Dict[str, Mapping[str, str]]:
+        """各メトリクスのカラー判定（METRIC_JUDGMENTS の読み取り専用マッピング）"""
         
-        color_judgments = {}
+        values = self._judgment_values(metrics, additional_metrics)
+        names = list(values)
+        levels = self.calculate_color_judgment_batch([list(values.values())], names)[0]
         
-        # 基本メトリクスの判定
-        basic_metrics = {
-            'pelvic_tilt': metrics.pelvic_tilt,
-            'thoracic_kyphosis': metrics.thoracic_kyphosis,
-            'cervical_lordosis': metrics.cervical_lordosis,
-            'shoulder_height_difference': metrics.shoulder_height_difference,
-            'head_forward_posture': metrics.head_forward_posture,
-            'lumbar_lordosis': metrics.lumbar_lordosis,
-            'scapular_protraction': metrics.scapular_protraction,
-            'trunk_lateral_deviation': metrics.trunk_lateral_deviation
+        return {
+            name: METRIC_JUDGMENTS[level] for name, level in zip(names, levels.tolist()) if level >= 0
         }
-        
-        for metric_name, value in basic_metrics.items():
-            if metric_name in self.normal_ranges:
-                color_judgments[metric_name] = self._judge_metric_color(
-                    value, self.normal_ranges[metric_name], metric_name
-                )
-        
-        # 追加メトリクスの判定
-        if additional_metrics:
-            for metric_name, value in additional_metrics.items():
-                if metric_name in self.normal_ranges:
-                    color_judgments[metric_name] = self._judge_metric_color(
-                        value, self.normal_ranges[metric_name], metric_name
-                    )
-                elif metric_name in self.seated_normal_ranges:
-                    color_judgments[metric_name] = self._judge_metric_color(
-                        value, self.seated_normal_ranges[metric_name], metric_name
-                    )
-        
-        return color_judgments
+    
+    def calculate_color_judgment_batch(self, values, names: Sequence[str]) -> np.ndarray:
+        """
+        (N, M) メトリクス行列の一括カラー判定
+        METRIC_JUDGMENTS のインデックス（NaN は -1）を (N, M) int8 配列で返す
+        """
+        lower, upper = self.range_table(names)
+        return judgment_levels(np.asarray(values, dtype=np.float64).reshape(-1, len(names)), lower, upper)
     
     def _judge_metric_color(self, value: float, normal_range: Tuple[float, float], 
-                          metric_name: str) -> Dict:
+                          metric_name: str) -> Mapping[str, str]:
         """個別メトリクスのカラー判定"""
         
-        min_normal, max_normal = normal_range
-        
-        # 正常範囲内
-        if min_normal <= value <= max_normal:
-            return {
-                'color': PostureColorJudgment.EXCELLENT.value,
-                'color_code': '#22c55e',  # 緑
-                'status': 'normal',
-                'message': '正常範囲内です'
-            }
-        
-        # 偏差の計算
-        if value < min_normal:
-            deviation = min_normal - value
-            deviation_percent = (deviation / min_normal) * 100
-        else:
-            deviation = value - max_normal
-            deviation_percent = (deviation / max_normal) * 100
-        
-        # 偏差に基づく色判定
-        if deviation_percent <= 20:
-            return {
-                'color': PostureColorJudgment.GOOD.value,
-                'color_code': '#84cc16',  # 黄緑
-                'status': 'slight_deviation',
-                'message': '軽度の偏差があります'
-            }
-        elif deviation_percent <= 40:
-            return {
-                'color': PostureColorJudgment.FAIR.value,
-                'color_code': '#eab308',  # 黄
-                'status': 'moderate_deviation',
-                'message': '中程度の偏差があります'
-            }
-        elif deviation_percent <= 60:
-            return {
-                'color': PostureColorJudgment.POOR.value,
-                'color_code': '#f97316',  # オレンジ
-                'status': 'significant_deviation',
-                'message': '大きな偏差があります'
-            }
-        else:
-            return {
-                'color': PostureColorJudgment.CRITICAL.value,
-                'color_code': '#ef4444',  # 赤
-                'status': 'critical_deviation',
-                'message': '要改善の状態です'
-            }
+        level = judgment_levels(value, *normal_range)
+        return METRIC_JUDGMENTS[level] if level >= 0 else METRIC_JUDGMENTS[-1]
     
-    def get_overall_color_judgment(self, color_judgments: Dict) -> Dict:
+    def get_overall_color_judgment(self, color_judgments: Dict) -> Mapping[str, str]:
         """全体的なカラー判定"""
         
         if not color_judgments:
-            return {
-                'color': PostureColorJudgment.FAIR.value,
-                'color_code': '#eab308',
-                'message': '判定に十分なデータがありません'
-            }
+            return NO_DATA_JUDGMENT
         
         # 各判定のスコア化
-        color_scores = {
-            'excellent': 5,
-            'good': 4,
-            'fair': 3,
-            'poor': 2,
-            'critical': 1
-        }
-        
-        scores = []
-        for judgment in color_judgments.values():
-            scores.append(color_scores.get(judgment['color'], 3))
+        scores = [_COLOR_SCORES.get(judgment['color'], 3) for judgment in color_judgments.values()]
+        levels = len(JUDGMENT_SCORES) - np.array(scores)
         
-        average_score = sum(scores) / len(scores)
-        
-        # 平均スコアに基づく全体判定
-        if average_score >= 4.5:
-            return {
-                'color': PostureColorJudgment.EXCELLENT.value,
-                'color_code': '#22c55e',
-                'message': '全体的に良好な姿勢です'
-            }
-        elif average_score >= 3.5:
-            return {
-                'color': PostureColorJudgment.GOOD.value,
-                'color_code': '#84cc16',
-                'message': '概ね良好な姿勢です'
-            }
-        elif average_score >= 2.5:
-            return {
-                'color': PostureColorJudgment.FAIR.value,
-                'color_code': '#eab308',
-                'message': '改善の余地があります'
-            }
-        elif average_score >= 1.5:
-            return {
-                'color': PostureColorJudgment.POOR.value,
-                'color_code': '#f97316',
-                'message': '改善が必要です'
-            }
-        else:
-            return {
-                'color': PostureColorJudgment.CRITICAL.value,
-                'color_code': '#ef4444',
-                'message': '要改善の状態です'
-            }
+        return OVERALL_JUDGMENTS[overall_judgment_levels(levels)[0]]
+    
+    def get_overall_color_judgment_batch(self, levels: np.ndarray) -> np.ndarray:
+        """(N, M) 判定レベル行列から OVERALL_JUDGMENTS のインデックス (N,)（判定項目なしは -1）"""
+        return overall_judgment_levels(levels)
     
     def _get_posture_description(self, primary_type: PostureType, 
                                classifications: List[str]) -> str:
@@ -351,67 +515,11 @@ class PostureClassifier:
     
     def generate_improvement_suggestions(self, posture_type: str, 
                                        color_judgments: Dict) -> List[Dict]:
-        """姿勢改善の提案を生成"""
-        
-        suggestions = []
-        
-        # 姿勢タイプ別の基本提案
-        type_suggestions = {
-            'forward_head': {
-                'title': '頭部前方偏位の改善',
-                'description': '顎を引き、頭を後方に位置させる意識を持ちましょう。',
-                'exercises': ['チンタック運動', '首のストレッチ', '肩甲骨の引き寄せ']
-            },
-            'kyphosis_lordosis': {
-                'title': 'S字型姿勢の改善',
-                'description': '胸椎の伸展と腰椎の安定化を図りましょう。',
-                'exercises': ['キャット&カウ', '胸椎伸展運動', '腹筋強化']
-            },
-            'sway_back': {
-                'title': '反り腰の改善',
-                'description': '腰椎の前弯を適正化し、腹筋を強化しましょう。',
-                'exercises': ['骨盤傾斜運動', '腹筋強化', '股関節屈筋ストレッチ']
-            },
-            'seated_slumped': {
-                'title': '座位猫背の改善',
-                'description': '背筋を伸ばし、正しい座位姿勢を意識しましょう。',
-                'exercises': ['椅子の調整', '背筋伸展運動', '肩甲骨の引き寄せ']
-            }
-        }
+        """姿勢改善の提案を生成（姿勢タイプと要改善メトリクスでカタログを参照）"""
         
-        if posture_type in type_suggestions:
-            suggestions.append(type_suggestions[posture_type])
-        
-        # 色判定が悪い項目への個別提案
-        critical_items = [
-            name for name, judgment in color_judgments.items() 
-            if judgment['color'] in ['poor', 'critical']
-        ]
-        
-        for item in critical_items:
-            if item not in [s.get('target_metric') for s in suggestions]:
-                item_suggestion = self._get_metric_specific_suggestion(item)
-                if item_suggestion:
-                    suggestions.append(item_suggestion)
-        
-        return suggestions
+        return self.suggestion_catalog.suggestions_for(posture_type, color_judgments).as_list()
     
     def _get_metric_specific_suggestion(self, metric_name: str) -> Optional[Dict]:
         """メトリクス別の改善提案"""
         
-        suggestions = {
-            'shoulder_height_difference': {
-                'title': '肩の高さ差の改善',
-                'description': '左右の肩の高さを揃えるよう意識しましょう。',
-                'exercises': ['肩のストレッチ', '肩甲骨の調整', '姿勢鏡での確認'],
-                'target_metric': 'shoulder_height_difference'
-            },
-            'trunk_lateral_deviation': {
-                'title': '体幹の左右偏位の改善',
-                'description': '体幹の中心線を意識し、左右対称を保ちましょう。',
-                'exercises': ['体幹ストレッチ', '側弯改善運動', '姿勢調整'],
-                'target_metric': 'trunk_lateral_deviation'
-            }
-        }
-        
-        return suggestions.get(metric_name)
\ No newline at end of file
+        return METRIC_SUGGESTIONS.get(metric_name)
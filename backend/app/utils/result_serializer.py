@@ -0,0 +1,234 @@
+"""
+分析結果シリアライザ
+内部で構築した PostureAnalysisResult を再検証せずに JSON バイト列へ直接エンコードする。
+orjson が利用可能ならそれを使い、無ければ標準 json にフォールバックする。
+カタログ由来の改善提案は事前エンコード済みの JSON 断片をそのまま埋め込む。
+Accept ヘッダでバイナリ形式（binary_result）が要求された場合はそちらでエンコードする
+"""
+
+import json
+import math
+import time
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from backend.app.models.posture_result import PostureAnalysisResult, PostureMetrics
+from backend.app.utils.binary_result import BINARY_MEDIA_TYPE, encode_result
+from backend.app.utils.landmark_array import FIELDS, LandmarkArray
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ランドマークのエンコード形式
+#   object : {"nose": {"x": .., "y": .., "z": .., "visibility": ..}, ...}（従来形式）
+#   compact: {"fields": ["x","y","z","visibility"], "names": [...], "values": [[x,y,z,v], ...]}
+LANDMARK_FORMATS = ('object', 'compact')
+
+JSON_MEDIA_TYPE = 'application/json'
+RESULT_MEDIA_TYPES = (JSON_MEDIA_TYPE, BINARY_MEDIA_TYPE)
+
+RESULT_FIELDS = tuple(PostureAnalysisResult.model_fields)
+METRIC_FIELDS = tuple(PostureMetrics.model_fields)
+
+
+def compact_landmarks(landmarks) -> Dict[str, list]:
+    """ランドマークを名前の並びと値の2次元配列に変換（visibility 未設定は null）"""
+    if isinstance(landmarks, LandmarkArray):
+        names = list(landmarks)
+        rows = landmarks.data[landmarks.present].astype(np.float64)
+        values = [[None if v != v else v for v in row] for row in rows.tolist()]
+    else:
+        names = list(landmarks)
+        values = [[landmarks[name].get(field) for field in FIELDS] for name in names]
+    return {'fields': list(FIELDS), 'names': names, 'values': values}
+
+
+def result_payload(result: PostureAnalysisResult, landmark_format: str = 'object',
+                   fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    PostureAnalysisResult をエンコード用の辞書に変換
+    モデルの検証・ダンプ処理を通さず属性を直接参照する（値は内部で構築済みのため）。
+    fields 指定時はそのフィールドのみを含める
+    """
+    if landmark_format not in LANDMARK_FORMATS:
+        raise ValueError(f"Unknown landmark format '{landmark_format}'. Valid formats: {', '.join(LANDMARK_FORMATS)}")
+
+    names = RESULT_FIELDS if fields is None else [name for name in RESULT_FIELDS if name in fields]
+    payload = {name: getattr(result, name) for name in names}
+    if 'metrics' in payload:
+        metrics = result.metrics
+        payload['metrics'] = {name: getattr(metrics, name) for name in METRIC_FIELDS}
+    if landmark_format == 'compact' and 'landmarks' in payload:
+        payload['landmarks'] = compact_landmarks(result.landmarks)
+    return payload
+
+
+def _orjson_default(obj):
+    # dict 以外のマッピング（MappingProxyType など）
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _plain(obj):
+    """標準 json 用に変換（NaN / inf は orjson と同じく null）"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, Mapping):
+        return {key: _plain(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(value) for value in obj]
+    if isinstance(obj, np.generic):
+        return _plain(obj.item())
+    if isinstance(obj, np.ndarray):
+        return _plain(obj.tolist())
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return obj
+
+
+def encode_json(obj) -> bytes:
+    """JSON バイト列にエンコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_plain(obj), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+_SUGGESTIONS_KEY = b'"improvement_suggestions":'
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    result_payload の辞書を JSON バイト列にエンコード
+    改善提案が JSON 断片付き（SuggestionList）の場合は再エンコードせず断片を埋め込む
+    """
+    fragment = getattr(payload.get('improvement_suggestions'), 'json', None)
+    if fragment is None:
+        return encode_json(payload)
+    # 文字列中の引用符はエスケープされるため、一致するのはキーとしての出現のみ
+    body = encode_json({**payload, 'improvement_suggestions': None})
+    return body.replace(_SUGGESTIONS_KEY + b'null', _SUGGESTIONS_KEY + fragment, 1)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Accept ヘッダから応答形式を選択
+    バイナリ形式は明示的に要求された場合のみ（ワイルドカードや該当なしは JSON）
+    """
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for part in (accept or '').split(','):
+        media_type, *params = [token.strip() for token in part.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type == BINARY_MEDIA_TYPE and q > best_q:
+            best, best_q = BINARY_MEDIA_TYPE, q
+        elif media_type in (JSON_MEDIA_TYPE, 'application/*', '*/*') and q >= best_q and q > 0:
+            best, best_q = JSON_MEDIA_TYPE, q
+    return best
+
+
+class SerializationStats:
+    """直近のシリアライズ時間とペイロードサイズの統計"""
+
+    def __init__(self, max_history_size: int = 1000):
+        self.durations = deque(maxlen=max_history_size)
+        self.sizes = deque(maxlen=max_history_size)
+
+    def record(self, duration: float, size: int):
+        self.durations.append(duration)
+        self.sizes.append(size)
+
+    def summary(self) -> Dict[str, Any]:
+        """p50 / p95 のシリアライズ時間（ms）とペイロードサイズ（bytes）"""
+        if not self.durations:
+            return {'count': 0, 'encoder': 'orjson' if ORJSON_AVAILABLE else 'json'}
+
+        durations = np.array(self.durations) * 1000
+        sizes = np.array(self.sizes)
+        return {
+            'count': len(durations),
+            'encoder': 'orjson' if ORJSON_AVAILABLE else 'json',
+            'p50_ms': round(float(np.percentile(durations, 50)), 3),
+            'p95_ms': round(float(np.percentile(durations, 95)), 3),
+            'p50_bytes': int(np.percentile(sizes, 50)),
+            'p95_bytes': int(np.percentile(sizes, 95)),
+        }
+
+    def clear(self):
+        self.durations.clear()
+        self.sizes.clear()
+
+
+class ResultSerializer:
+    """PostureAnalysisResult の高速シリアライザ"""
+
+    def __init__(self):
+        self.stats = SerializationStats()
+        self.binary_stats = SerializationStats()
+        self._schema_validated = False
+
+    def validate_schema(self, result: PostureAnalysisResult):
+        """
+        検証なしで構築された結果がモデルのスキーマに適合することを確認
+        プロセス内で最初の1件のみ実施し、以降は構築処理を信頼する
+        """
+        if self._schema_validated:
+            return
+        PostureAnalysisResult.model_validate(result_payload(result))
+        self._schema_validated = True
+
+    def serialize(self, result: PostureAnalysisResult, landmark_format: str = 'object',
+                  media_type: str = JSON_MEDIA_TYPE, fields: Optional[Iterable[str]] = None,
+                  analysis_id: Optional[str] = None) -> bytes:
+        """
+        結果を media_type の形式のバイト列に変換し、時間とサイズを記録
+        バイナリ形式のランドマークは常に量子化配列のため landmark_format は無視される。
+        fields は JSON では返却フィールドを選択し、バイナリ形式では固定部以外の
+        未選択セクションが省略される（to_result で評価されないため）。
+        analysis_id は JSON の先頭に含める（バイナリ形式では応答ヘッダで返す）
+        """
+        if fields is None:
+            self.validate_schema(result)
+
+        start = time.perf_counter()
+        if media_type == BINARY_MEDIA_TYPE:
+            body = encode_result(result)
+            stats = self.binary_stats
+        else:
+            payload = result_payload(result, landmark_format, fields)
+            if analysis_id is not None:
+                payload = {'analysis_id': analysis_id, **payload}
+            body = encode_payload(payload)
+            stats = self.stats
+        stats.record(time.perf_counter() - start, len(body))
+        return body
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON のシリアライズ統計（binary にバイナリ形式の統計）"""
+        return {**self.stats.summary(), 'binary': self.binary_stats.summary()}
+
+
+_result_serializer: Optional[ResultSerializer] = None
+
+
+def get_result_serializer() -> ResultSerializer:
+    """結果シリアライザのシングルトン取得"""
+    global _result_serializer
+    if _result_serializer is None:
+        _result_serializer = ResultSerializer()
+    return _result_serializer
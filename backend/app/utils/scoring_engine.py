@@ -0,0 +1,245 @@
+"""
+姿勢スコアリングエンジン
+メトリクスの重みと正常範囲を配列として保持し、(N, メトリクス数) 行列を一括でスコア化する。
+重みプロファイル（年齢層別など）は実行時に差し替え可能で、保存済み結果の一括再スコアにも使用する
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.utils.metric_registry import CompiledMetricRegistry, METRIC_REGISTRY, metric_value
+from backend.app.utils.pose_detector import SYMMETRY_PAIRS
+
+# PostureMetrics のフィールド名 → settings.REFERENCE_VALUES のキー
+REFERENCE_KEYS: Mapping[str, str] = MappingProxyType({
+    'pelvic_tilt': 'pelvic_tilt',
+    'thoracic_kyphosis': 'thoracic_kyphosis',
+    'cervical_lordosis': 'cervical_lordosis',
+    'shoulder_height_difference': 'shoulder_height_diff',
+    'head_forward_posture': 'head_forward_posture',
+    'lumbar_lordosis': 'lumbar_lordosis',
+    'scapular_protraction': 'scapular_protraction',
+    'trunk_lateral_deviation': 'trunk_lateral_deviation',
+})
+
+# 標準の重み（合計 1.0）
+DEFAULT_WEIGHTS: Mapping[str, float] = MappingProxyType({
+    'pelvic_tilt': 0.15,
+    'thoracic_kyphosis': 0.20,
+    'cervical_lordosis': 0.15,
+    'shoulder_height_difference': 0.15,
+    'head_forward_posture': 0.20,
+    'lumbar_lordosis': 0.15,
+})
+
+# 対称性スコア行列の列（PoseDetector.calculate_bilateral_symmetry のキー順）
+SYMMETRY_KEYS: Tuple[str, ...] = tuple(f"{left}_{right}_symmetry" for left, right in SYMMETRY_PAIRS)
+
+
+@dataclass(frozen=True)
+class WeightProfile:
+    """
+    スコアの重みプロファイル
+
+    各メトリクスのスコア = 100 - min(100, 正常範囲からの偏差 * penalty_per_unit)
+    基本スコア = Σ 重み * メトリクススコア
+    """
+    name: str
+    weights: Mapping[str, float] = field(default_factory=lambda: DEFAULT_WEIGHTS)
+    penalty_per_unit: float = 5.0   # 偏差1単位あたりの減点
+    symmetry_bonus: float = 5.0     # 平均対称性 1.0 のときの加点
+
+
+DEFAULT_PROFILE = WeightProfile('standard')
+
+
+def age_group_profiles(age_groups: Optional[Dict] = None) -> Dict[str, WeightProfile]:
+    """
+    settings.AGE_GROUPS から年齢層別プロファイルを作成
+    scaling_factor が大きい年齢層ほど偏差あたりの減点を緩やかにする
+    """
+    age_groups = settings.AGE_GROUPS if age_groups is None else age_groups
+    return {
+        name: WeightProfile(name, penalty_per_unit=DEFAULT_PROFILE.penalty_per_unit / group['scaling_factor'])
+        for name, group in age_groups.items()
+    }
+
+
+def age_group_for(age: int, age_groups: Optional[Dict] = None) -> Optional[str]:
+    """年齢に該当する年齢層名（該当なしは None）"""
+    age_groups = settings.AGE_GROUPS if age_groups is None else age_groups
+    for name, group in age_groups.items():
+        if group['min'] <= age <= group['max']:
+            return name
+    return None
+
+
+@dataclass(frozen=True)
+class _CompiledProfile:
+    profile: WeightProfile
+    columns: np.ndarray
+    weights: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+class ScoringEngine:
+    """重み付き姿勢スコアを (N, M) 行列で一括計算するエンジン"""
+
+    def __init__(self, profile: WeightProfile = DEFAULT_PROFILE,
+                 reference_values: Optional[Dict] = None,
+                 profiles: Optional[Dict[str, WeightProfile]] = None,
+                 registry: CompiledMetricRegistry = METRIC_REGISTRY):
+        self.reference_values = settings.REFERENCE_VALUES if reference_values is None else reference_values
+        self.registry = registry
+        # 基本8項目の後にレジストリの拡張メトリクス（重みを与えたプロファイルでのみスコアに反映）
+        self.metric_names: Tuple[str, ...] = tuple(REFERENCE_KEYS) + registry.extended_names
+        self.profiles: Dict[str, WeightProfile] = {DEFAULT_PROFILE.name: DEFAULT_PROFILE}
+        self.profiles.update(age_group_profiles() if profiles is None else profiles)
+        self._compiled = self._compile(profile)
+
+    def _compile(self, profile: WeightProfile) -> _CompiledProfile:
+        unknown = set(profile.weights) - set(self.metric_names)
+        if unknown:
+            raise ValueError(f"Unknown metrics in weight profile '{profile.name}': {sorted(unknown)}")
+
+        names = [name for name in self.metric_names if name in profile.weights]
+        ranges = np.array([self.normal_range(name) for name in names], dtype=np.float64)
+        return _CompiledProfile(
+            profile=profile,
+            columns=np.array([self.metric_names.index(name) for name in names], dtype=np.intp),
+            weights=np.array([profile.weights[name] for name in names], dtype=np.float64),
+            lower=ranges[:, 0],
+            upper=ranges[:, 1],
+        )
+
+    def normal_range(self, name: str) -> Tuple[float, float]:
+        """正常範囲（基本メトリクスは参照値、拡張メトリクスはレジストリ定義）"""
+        if name in REFERENCE_KEYS:
+            return self.reference_values[REFERENCE_KEYS[name]]['normal']
+        return self.registry.by_name[name].normal_range
+
+    # === プロファイル ===
+
+    @property
+    def profile(self) -> WeightProfile:
+        return self._compiled.profile
+
+    def set_profile(self, profile: Union[str, WeightProfile]) -> WeightProfile:
+        """重みプロファイルを差し替え（名前指定は登録済みプロファイルから選択）"""
+        if isinstance(profile, str):
+            if profile not in self.profiles:
+                raise ValueError(f"Unknown weight profile '{profile}'. Available: {', '.join(self.profiles)}")
+            profile = self.profiles[profile]
+        # コンパイル済み配列は一度に差し替える（評価中の呼び出しは旧プロファイルのまま完了）
+        self._compiled = self._compile(profile)
+        return profile
+
+    def profile_for_age(self, age: int) -> WeightProfile:
+        """年齢に該当するプロファイル（該当なしは標準）"""
+        return self.profiles.get(age_group_for(age), DEFAULT_PROFILE)
+
+    # === スコア計算 ===
+
+    def metric_matrix(self, metrics: Union[np.ndarray, Sequence]) -> np.ndarray:
+        """PostureMetrics の列、または (N, M) 配列を metric_names 順の (N, M) 行列に変換"""
+        if isinstance(metrics, np.ndarray):
+            matrix = np.atleast_2d(metrics.astype(np.float64, copy=False))
+        else:
+            matrix = np.array(
+                [[_as_float(metric_value(m, name)) for name in self.metric_names] for m in metrics], dtype=np.float64
+            ).reshape(-1, len(self.metric_names))
+        if matrix.shape[1] != len(self.metric_names):
+            raise ValueError(f"Expected {len(self.metric_names)} metric columns, got {matrix.shape[1]}")
+        return matrix
+
+    @staticmethod
+    def metric_scores(values: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                      penalty_per_unit: float = DEFAULT_PROFILE.penalty_per_unit) -> np.ndarray:
+        """正常範囲からの偏差に応じたメトリクススコア (0-100)（NaN は 0 点）"""
+        deviation = np.maximum(lower - values, 0) + np.maximum(values - upper, 0)
+        # fmin は NaN を無視するため、未計測値は最大減点になる
+        return np.maximum(0.0, 100.0 - np.fmin(100.0, deviation * penalty_per_unit))
+
+    def base_scores(self, metrics) -> np.ndarray:
+        """重み付き基本スコア (N,)"""
+        compiled = self._compiled
+        values = self.metric_matrix(metrics)[:, compiled.columns]
+        scores = self.metric_scores(values, compiled.lower, compiled.upper, compiled.profile.penalty_per_unit)
+        return scores @ compiled.weights
+
+    def score_components(self, metrics, pose_quality=None, symmetry=None
+                         ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (基本スコア, 対称性ボーナス, 総合スコア) を (N,) 配列で取得
+        pose_quality は (N,) の品質スコア、symmetry は (N, K) の対称性スコア（未検出は NaN）
+        """
+        compiled = self._compiled
+        base = self.base_scores(metrics)
+
+        weighted = base if pose_quality is None else base * np.asarray(pose_quality, dtype=np.float64)
+
+        bonus = np.zeros_like(base)
+        if symmetry is not None:
+            symmetry = np.atleast_2d(np.asarray(symmetry, dtype=np.float64))
+            present = ~np.isnan(symmetry)
+            count = present.sum(axis=1)
+            average = np.where(present, symmetry, 0.0).sum(axis=1) / np.maximum(count, 1)
+            bonus = np.where(count > 0, average * compiled.profile.symmetry_bonus, 0.0)
+
+        return base, bonus, np.clip(weighted + bonus, 0.0, 100.0)
+
+    def score(self, metrics, pose_quality=None, symmetry=None) -> np.ndarray:
+        """総合スコア (N,)（0-100）"""
+        return self.score_components(metrics, pose_quality, symmetry)[2]
+
+    def score_metrics(self, metrics, pose_quality: Optional[float] = None,
+                      symmetry_scores: Optional[Dict[str, float]] = None) -> float:
+        """1件の PostureMetrics の総合スコア"""
+        symmetry = None
+        if symmetry_scores:
+            symmetry = [list(symmetry_scores.values())]
+        quality = None if pose_quality is None else [pose_quality]
+        return float(self.score([metrics], quality, symmetry)[0])
+
+    @staticmethod
+    def symmetry_matrix(symmetry_scores: Iterable[Optional[Dict[str, float]]]) -> np.ndarray:
+        """対称性スコア辞書の列を (N, len(SYMMETRY_KEYS)) 行列に変換（欠損は NaN）"""
+        return np.array([
+            [(scores or {}).get(key, np.nan) for key in SYMMETRY_KEYS] for scores in symmetry_scores
+        ], dtype=np.float64).reshape(-1, len(SYMMETRY_KEYS))
+
+    def rescore(self, results: Sequence, profile: Optional[Union[str, WeightProfile]] = None) -> np.ndarray:
+        """
+        保存済みの PostureAnalysisResult 群を一括再スコア
+        profile 指定時はそのプロファイルで計算する（エンジンの現在のプロファイルは変更しない）
+        """
+        engine = self
+        if profile is not None:
+            engine = ScoringEngine(self.profile, self.reference_values, self.profiles, self.registry)
+            engine.set_profile(profile)
+
+        return engine.score(
+            [result.metrics for result in results],
+            np.array([result.confidence for result in results], dtype=np.float64),
+            self.symmetry_matrix(result.symmetry_scores for result in results),
+        )
+
+
+def _as_float(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+_scoring_engine: Optional[ScoringEngine] = None
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """スコアリングエンジンのシングルトン取得"""
+    global _scoring_engine
+    if _scoring_engine is None:
+        _scoring_engine = ScoringEngine()
+    return _scoring_engine
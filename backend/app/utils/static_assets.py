@@ -0,0 +1,314 @@
+"""
+静的アセット配信
+Flutter ビルド成果物をビルド時に gzip / brotli で事前圧縮し、Accept-Encoding に応じて選択して配信する。
+強い ETag と Cache-Control を付与して If-None-Match には 304 を返す。
+HTML ページはメモリに保持し、JSON API 応答は一定サイズ以上で動的に gzip 圧縮する
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.app.utils.logger import get_logger
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = get_logger("static_assets")
+
+# エンコーディング → 事前圧縮ファイルの拡張子（優先順）
+ENCODING_SUFFIXES: Dict[str, str] = {'br': '.br', 'gzip': '.gz'}
+
+# 事前圧縮の対象（画像・フォントなど圧縮済み形式は対象外）
+COMPRESSIBLE_EXTENSIONS = frozenset({
+    '.html', '.js', '.mjs', '.css', '.json', '.wasm', '.svg', '.txt', '.map', '.symbols', '.otf', '.ttf'
+})
+
+# 常に再検証させるエントリポイント（ビルドごとに同じ名前で内容が変わる）
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+mimetypes.add_type('application/wasm', '.wasm')
+mimetypes.add_type('application/javascript', '.mjs')
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding をエンコーディング → q 値に変換"""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        coding, *params = [token.strip() for token in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+    return weights
+
+
+def _choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """利用可能なバリアントから q 値が最も高いものを選択（同値は ENCODING_SUFFIXES の順）"""
+    weights = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in ENCODING_SUFFIXES:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if coding in available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _etag(digest: str, encoding: Optional[str]) -> str:
+    return f'"{digest}-{ENCODING_SUFFIXES[encoding][1:]}"' if encoding else f'"{digest}"'
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match が選択した表現の ETag と一致するか（比較は弱い比較）"""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+# === ビルド時の事前圧縮 ===
+
+def precompress_directory(root: str, min_size: int = 1024) -> Dict[str, int]:
+    """
+    root 以下の圧縮対象ファイルに .gz（brotli が利用可能なら .br も）を作成
+    元ファイルより新しい圧縮ファイルが既にあればスキップする
+    """
+    stats = {'files': 0, 'written': 0, 'original_bytes': 0, 'compressed_bytes': 0}
+
+    for path in _iter_files(root):
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS or os.path.getsize(path) < min_size:
+            continue
+        stats['files'] += 1
+        mtime = os.path.getmtime(path)
+        data = None
+
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding == 'br' and not BROTLI_AVAILABLE:
+                continue
+            target = path + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                continue
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            compressed = brotli.compress(data, quality=11) if encoding == 'br' else gzip.compress(data, 9, mtime=0)
+            # 圧縮で小さくならないファイルは元のまま配信する
+            if len(compressed) >= len(data):
+                continue
+            with open(target, 'wb') as f:
+                f.write(compressed)
+            stats['written'] += 1
+            stats['original_bytes'] += len(data)
+            stats['compressed_bytes'] += len(compressed)
+
+    return stats
+
+
+def _iter_files(root: str):
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(tuple(ENCODING_SUFFIXES.values())):
+                yield os.path.join(directory, filename)
+
+
+# === 静的アセット ===
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """配信可能なアセット（元ファイルと事前圧縮バリアント）"""
+    path: str
+    media_type: str
+    digest: str
+    cache_control: str
+    variants: Dict[str, str] = field(default_factory=dict)
+
+
+class StaticAssetStore:
+    """
+    静的ディレクトリのアセット索引
+    起動時に内容ハッシュ（強い ETag）と事前圧縮バリアントを収集し、索引にあるファイルのみを配信する
+    """
+
+    def __init__(self, root: str, immutable_prefixes: Sequence[str] = (), max_age: int = 31536000):
+        self.root = root
+        self.immutable_cache_control = f'public, max-age={max_age}, immutable'
+        self.immutable_prefixes = tuple(immutable_prefixes)
+        self.assets: Dict[str, StaticAsset] = {}
+        if os.path.isdir(root):
+            self._build_index()
+
+    def _build_index(self):
+        for path in _iter_files(self.root):
+            relative = os.path.relpath(path, self.root).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            variants = {
+                encoding: path + suffix for encoding, suffix in ENCODING_SUFFIXES.items()
+                if os.path.exists(path + suffix)
+            }
+            self.assets[relative] = StaticAsset(
+                path=path,
+                media_type=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                digest=digest,
+                cache_control=(self.immutable_cache_control if relative.startswith(self.immutable_prefixes)
+                               else REVALIDATE_CACHE_CONTROL),
+                variants=variants,
+            )
+        logger.info("静的アセット索引作成完了", root=self.root, assets=len(self.assets),
+                    precompressed=sum(1 for asset in self.assets.values() if asset.variants))
+
+    def __contains__(self, relative_path: str) -> bool:
+        return relative_path in self.assets
+
+    def response(self, request_headers: Headers, relative_path: str) -> Optional[Response]:
+        """アセットの応答（索引にないパスは None）"""
+        asset = self.assets.get(relative_path)
+        if asset is None:
+            return None
+
+        encoding = _choose_encoding(request_headers.get('accept-encoding'), asset.variants)
+        headers = {
+            'ETag': _etag(asset.digest, encoding),
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if _not_modified(request_headers.get('if-none-match'), headers['ETag']):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
+        headers['Content-Encoding'] = encoding
+        return FileResponse(asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
+# === HTML ページ ===
+
+@dataclass(frozen=True)
+class CachedPage:
+    """メモリに保持した HTML ページ"""
+    body: bytes
+    gzip_body: bytes
+    digest: str
+
+
+class HtmlPageCache:
+    """HTML ページを初回読み込み後メモリから配信するキャッシュ"""
+
+    def __init__(self):
+        self.pages: Dict[str, Optional[CachedPage]] = {}
+
+    def get(self, path: str) -> Optional[CachedPage]:
+        """ページを取得（存在しない場合は None、結果はどちらもキャッシュする）"""
+        if path not in self.pages:
+            try:
+                with open(path, 'rb') as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self.pages[path] = None
+            else:
+                digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+                self.pages[path] = CachedPage(body, gzip.compress(body, 9, mtime=0), digest)
+        return self.pages[path]
+
+    def response(self, request_headers: Headers, *paths: str) -> Optional[Response]:
+        """最初に見つかったページの応答（どれも無い場合は None）"""
+        for path in paths:
+            page = self.get(path)
+            if page is not None:
+                return self._page_response(request_headers, page)
+        return None
+
+    @staticmethod
+    def _page_response(request_headers: Headers, page: CachedPage) -> Response:
+        use_gzip = _choose_encoding(request_headers.get('accept-encoding'), ('gzip',)) == 'gzip'
+        headers = {
+            'ETag': _etag(page.digest, 'gzip' if use_gzip else None),
+            'Cache-Control': REVALIDATE_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+        if _not_modified(request_headers.get('if-none-match'), headers['ETag']):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return Response(page.gzip_body, media_type='text/html; charset=utf-8', headers=headers)
+        return Response(page.body, media_type='text/html; charset=utf-8', headers=headers)
+
+
+# === JSON API 応答の動的圧縮 ===
+
+class APICompressionMiddleware:
+    """
+    media_types（既定は JSON）の応答を minimum_size 以上で gzip 圧縮するミドルウェア
+    静的アセットや既に Content-Encoding が付いた応答、ストリーミング応答はそのまま通す
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 6,
+                 media_types: Sequence[str] = ('application/json',)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.media_types = frozenset(media_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or _choose_encoding(Headers(scope=scope).get('accept-encoding'), ('gzip',)) is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                media_type = headers.get('content-type', '').split(';')[0].strip()
+                if media_type in self.media_types and 'content-encoding' not in headers:
+                    start_message = message  # 本文を見てから送信する
+                    return
+            elif message['type'] == 'http.response.body' and start_message is not None:
+                initial, start_message = start_message, None
+                body = message.get('body', b'')
+                if not message.get('more_body', False) and len(body) >= self.minimum_size:
+                    body = gzip.compress(body, self.compresslevel)
+                    headers = MutableHeaders(raw=initial['headers'])
+                    headers['Content-Encoding'] = 'gzip'
+                    headers['Content-Length'] = str(len(body))
+                    headers.add_vary_header('Accept-Encoding')
+                    message = {**message, 'body': body}
+                await send(initial)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def main():
+    """ビルド時の事前圧縮: python -m backend.app.utils.static_assets <dir> [<dir> ...]"""
+    for root in sys.argv[1:] or ['backend/static']:
+        if not os.path.isdir(root):
+            print(f"skip: {root} (not found)")
+            continue
+        stats = precompress_directory(root)
+        saved = stats['original_bytes'] - stats['compressed_bytes']
+        print(f"{root}: {stats['files']} files, {stats['written']} variants written, "
+              f"{saved / 1024:.0f} KB saved (brotli: {'yes' if BROTLI_AVAILABLE else 'no'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+改善提案カタログ
+改善提案は姿勢タイプと要改善（poor / critical）メトリクスの組み合わせだけで決まるため、
+起動時に全組み合わせを共有の提案とJSON断片として構築し、以降は参照のみで返す。
+API結果には提案のコピーを JSON 断片付きのリストで渡し、レスポンス作成時は断片をそのまま埋め込む
+"""
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from backend.app.models.posture_result import PostureRecommendation
+
+
+def _copy(suggestion: Dict) -> Dict:
+    return {key: list(value) if isinstance(value, list) else value for key, value in suggestion.items()}
+
+
+# 姿勢タイプ別の基本提案
+TYPE_SUGGESTIONS: Mapping[str, Dict] = MappingProxyType({
+    'forward_head': {
+        'title': '頭部前方偏位の改善',
+        'description': '顎を引き、頭を後方に位置させる意識を持ちましょう。',
+        'exercises': ['チンタック運動', '首のストレッチ', '肩甲骨の引き寄せ']
+    },
+    'kyphosis_lordosis': {
+        'title': 'S字型姿勢の改善',
+        'description': '胸椎の伸展と腰椎の安定化を図りましょう。',
+        'exercises': ['キャット&カウ', '胸椎伸展運動', '腹筋強化']
+    },
+    'sway_back': {
+        'title': '反り腰の改善',
+        'description': '腰椎の前弯を適正化し、腹筋を強化しましょう。',
+        'exercises': ['骨盤傾斜運動', '腹筋強化', '股関節屈筋ストレッチ']
+    },
+    'seated_slumped': {
+        'title': '座位猫背の改善',
+        'description': '背筋を伸ばし、正しい座位姿勢を意識しましょう。',
+        'exercises': ['椅子の調整', '背筋伸展運動', '肩甲骨の引き寄せ']
+    },
+})
+
+# メトリクス別の改善提案（要改善と判定された場合）
+METRIC_SUGGESTIONS: Mapping[str, Dict] = MappingProxyType({
+    'shoulder_height_difference': {
+        'title': '肩の高さ差の改善',
+        'description': '左右の肩の高さを揃えるよう意識しましょう。',
+        'exercises': ['肩のストレッチ', '肩甲骨の調整', '姿勢鏡での確認'],
+        'target_metric': 'shoulder_height_difference'
+    },
+    'trunk_lateral_deviation': {
+        'title': '体幹の左右偏位の改善',
+        'description': '体幹の中心線を意識し、左右対称を保ちましょう。',
+        'exercises': ['体幹ストレッチ', '側弯改善運動', '姿勢調整'],
+        'target_metric': 'trunk_lateral_deviation'
+    },
+})
+
+# 要改善とみなすカラー判定
+ATTENTION_COLORS = frozenset({'poor', 'critical'})
+
+# PDFレポートの推奨エクササイズ（メトリクス, 閾値, 推奨）: 値が閾値を超えた場合に掲載
+REPORT_RECOMMENDATIONS: Tuple[Tuple[str, float, PostureRecommendation], ...] = (
+    ('pelvic_tilt', 15, PostureRecommendation(
+        category="骨盤矯正",
+        title="骨盤後傾エクササイズ",
+        description="仰向けで膝を立て、骨盤を床に押し付けるようにして腹筋を収縮させます。",
+        difficulty="初級",
+        duration="10回 × 3セット",
+        frequency="毎日"
+    )),
+    ('head_forward_posture', 2.5, PostureRecommendation(
+        category="首・肩矯正",
+        title="頭部後退エクササイズ",
+        description="顎を軽く引き、頭を後ろに押すように首の深部筋を鍛えます。",
+        difficulty="初級",
+        duration="10秒保持 × 10回",
+        frequency="1日3回"
+    )),
+    ('shoulder_height_difference', 1.5, PostureRecommendation(
+        category="肩バランス矯正",
+        title="肩甲骨安定化エクササイズ",
+        description="肩甲骨を寄せる動作で背中の筋肉を強化し、肩の位置を整えます。",
+        difficulty="中級",
+        duration="15回 × 3セット",
+        frequency="週3回"
+    )),
+)
+
+
+class SuggestionList(list):
+    """改善提案のリスト（カタログのJSON断片を保持し、レスポンス作成時にそのまま埋め込む）"""
+
+    def __init__(self, suggestions: Iterable[Dict] = (), json: Optional[bytes] = None):
+        super().__init__(suggestions)
+        self.json = json
+
+
+@dataclass(frozen=True)
+class SuggestionEntry:
+    """カタログの1エントリ（提案の並びとそのJSON断片）"""
+    suggestions: Tuple[Dict, ...]
+    json: bytes
+
+    def as_list(self) -> SuggestionList:
+        """API結果用のリスト（要素は共有の提案のコピー）"""
+        return SuggestionList([_copy(s) for s in self.suggestions], self.json)
+
+
+def judgment_signature(color_judgments: Mapping[str, Mapping]) -> Tuple[str, ...]:
+    """カラー判定から、提案に影響する要改善メトリクスの並び（カタログ順）を取得"""
+    return tuple(
+        name for name in METRIC_SUGGESTIONS
+        if name in color_judgments and color_judgments[name]['color'] in ATTENTION_COLORS
+    )
+
+
+class SuggestionCatalog:
+    """(姿勢タイプ, 判定シグネチャ) → 改善提案 のカタログ"""
+
+    def __init__(self):
+        # 既知の全組み合わせを構築しておく
+        for posture_type in (None, *TYPE_SUGGESTIONS):
+            for size in range(len(METRIC_SUGGESTIONS) + 1):
+                for signature in combinations(METRIC_SUGGESTIONS, size):
+                    self.lookup(posture_type or '', signature)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def lookup(primary_type: str, signature: Tuple[str, ...]) -> SuggestionEntry:
+        """姿勢タイプと判定シグネチャに対応するエントリ（メモ化）"""
+        suggestions = []
+        if primary_type in TYPE_SUGGESTIONS:
+            suggestions.append(TYPE_SUGGESTIONS[primary_type])
+        for name in signature:
+            if name in METRIC_SUGGESTIONS:
+                suggestions.append(METRIC_SUGGESTIONS[name])
+
+        fragment = json.dumps(suggestions, ensure_ascii=False, separators=(',', ':'))
+        return SuggestionEntry(suggestions=tuple(suggestions), json=fragment.encode('utf-8'))
+
+    def suggestions_for(self, primary_type: str, color_judgments: Mapping[str, Mapping]) -> SuggestionEntry:
+        """カラー判定から該当エントリを取得"""
+        return self.lookup(primary_type, judgment_signature(color_judgments))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def report_recommendations(signature: Tuple[bool, ...]) -> Tuple[PostureRecommendation, ...]:
+        """閾値超過フラグの並びに対応するPDFレポートの推奨（メモ化）"""
+        return tuple(rec for (_, _, rec), exceeded in zip(REPORT_RECOMMENDATIONS, signature) if exceeded)
+
+    def recommendations_for(self, metrics) -> Tuple[PostureRecommendation, ...]:
+        """PostureMetrics から該当する推奨を取得"""
+        return self.report_recommendations(tuple(
+            getattr(metrics, name) > threshold for name, threshold, _ in REPORT_RECOMMENDATIONS
+        ))
+
+
+_suggestion_catalog: Optional[SuggestionCatalog] = None
+
+
+def get_suggestion_catalog() -> SuggestionCatalog:
+    """改善提案カタログのシングルトン取得"""
+    global _suggestion_catalog
+    if _suggestion_catalog is None:
+        _suggestion_catalog = SuggestionCatalog()
+    return _suggestion_catalog
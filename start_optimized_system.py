@@ -128,7 +128,6 @@ pillow==10.1.0
 reportlab==4.0.7
 requests==2.31.0
 psutil==5.9.6
-matplotlib==3.9.4
 sounddevice==0.5.2"""
     
     with open("requirements.txt", "w") as f: